@@ -13,3 +13,13 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def ensure_indexes(bind):
+    """
+    Create model indexes missing from existing tables. create_all leaves a
+    table alone once it exists, so indexes added to the models later
+    (api_keys.key_hash, the sweeper's date columns) would never be built.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
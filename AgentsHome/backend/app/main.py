@@ -1,14 +1,48 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from service_kit.admin import admin_router
+from service_kit.instrumentation import InstrumentationMiddleware, install_db_hooks, metrics_endpoint
+from service_kit.load_shedding import LoadSheddingMiddleware
+from service_kit.middleware import CompressionMiddleware
 from app.config import get_settings
-from app.database import Base, engine
-from app.routes import auth, subscriptions, api_keys
+from app.database import Base, engine, ensure_indexes
+from app.rate_limit import RateLimitMiddleware
+from app.routes import account, auth, subscriptions, api_keys
+from app.services.sweeper import Sweeper
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_indexes(engine)
 
-app = FastAPI(title="AgentsHome API", version="1.0.0")
 settings = get_settings()
+app = FastAPI(
+    title="AgentsHome API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse if settings.fast_json else JSONResponse,
+)
+
+# Rate limiting (innermost, so 429s still get CORS headers)
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limits=settings.rate_limits,
+        redis_url=settings.rate_limit_redis_url,
+    )
+
+# Load shedding (outside rate limiting, whose tier lookup can hit the DB; inside CORS)
+if settings.load_shedding_enabled:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        retry_after=settings.load_shedding_retry_after_seconds,
+        critical_paths=settings.load_shedding_critical_paths,
+        auth_paths=settings.load_shedding_auth_paths,
+        auth_max_in_flight=settings.load_shedding_auth_max_in_flight,
+        low_priority_paths=settings.load_shedding_low_priority_paths,
+        target_lag=settings.load_shedding_target_lag_seconds,
+        max_in_flight=settings.load_shedding_max_in_flight,
+        min_in_flight=settings.load_shedding_min_in_flight,
+    )
 
 # CORS
 app.add_middleware(
@@ -17,12 +51,39 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_minimum_size)
+
+# Instrumentation (outermost, so timings include compression)
+if settings.metrics_enabled:
+    install_db_hooks(engine)
+    app.add_middleware(
+        InstrumentationMiddleware,
+        sample_rate=settings.instrumentation_sample_rate,
+        n_plus_one_threshold=settings.n_plus_one_threshold,
+    )
+    app.add_route("/metrics", metrics_endpoint(settings.metrics_token), include_in_schema=False)
 
 # Routes
 app.include_router(auth.router)
 app.include_router(subscriptions.router)
 app.include_router(api_keys.router)
+app.include_router(account.router)
+app.include_router(admin_router(lambda: get_settings().admin_token))
+
+# Renewals, expiries and last_used writes happen here, not in request handlers
+sweeper = Sweeper(settings.sweeper_interval_seconds)
+
+@app.on_event("startup")
+def start_sweeper():
+    if settings.sweeper_enabled:
+        sweeper.start()
+
+@app.on_event("shutdown")
+def stop_sweeper():
+    if settings.sweeper_enabled:
+        sweeper.stop()
 
 @app.get("/health")
 def health_check():
@@ -28,10 +28,10 @@ class Subscription(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     agent_id = Column(String, nullable=False)  # 'hunter', 'agent2', etc
     plan_tier = Column(String, default="free")  # 'free', 'pro', 'enterprise'
-    status = Column(String, default="active")  # 'active', 'suspended', 'cancelled'
+    status = Column(String, default="active")  # 'active', 'suspended', 'cancelled', 'expired'
     api_quota = Column(Integer, default=1000)  # Monthly API calls limit
     api_used = Column(Integer, default=0)  # API calls used this month
-    renewal_date = Column(DateTime, nullable=True)
+    renewal_date = Column(DateTime, nullable=True, index=True)  # range-scanned by the sweeper
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -44,11 +44,11 @@ class APIKey(Base):
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     agent_id = Column(String, nullable=False)  # Which agent this key is for
-    key_hash = Column(String, nullable=False)  # Hashed key
+    key_hash = Column(String, nullable=False, index=True)  # HMAC-SHA256 of the key (bcrypt for older keys)
     name = Column(String, default="API Key")
     is_active = Column(Boolean, default=True)
     last_used = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    expires_at = Column(DateTime, nullable=True)
+    expires_at = Column(DateTime, nullable=True, index=True)  # range-scanned by the sweeper
 
     user = relationship("User", back_populates="api_keys")
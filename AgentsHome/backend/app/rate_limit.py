@@ -0,0 +1,458 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.services.auth_service import hash_api_key, user_id_from_authorization
+
+TIER_ORDER = ("free", "pro", "enterprise")
+
+EXEMPT_PATHS = frozenset({"/", "/health", "/metrics", "/docs", "/redoc", "/openapi.json"})
+
+
+class Limit(NamedTuple):
+    per_minute: int
+    burst: int
+
+    @property
+    def emission_interval(self) -> float:
+        return 60.0 / self.per_minute
+
+    @property
+    def tolerance(self) -> float:
+        return self.emission_interval * self.burst
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_after: float  # seconds until the bucket is full again
+    retry_after: float  # seconds until the next request is allowed (0 when allowed)
+
+
+def gcra(tat: float, now: float, limit: Limit) -> Tuple[Decision, float]:
+    """
+    One GCRA step: (decision, new theoretical arrival time).
+
+    A bucket is a single float, so the check is O(1) with no per-request
+    history, and bursts up to `limit.burst` are allowed on an idle bucket.
+    """
+    interval, tolerance = limit.emission_interval, limit.tolerance
+    new_tat = max(tat, now) + interval
+    allow_at = new_tat - tolerance
+    if now < allow_at:
+        reset_after = max(tat, now) - now
+        return Decision(False, 0, reset_after, allow_at - now), tat
+    remaining = int((now - allow_at) / interval + 1e-9)
+    return Decision(True, remaining, new_tat - now, 0.0), new_tat
+
+
+# ============= BACKENDS =============
+
+class MemoryBackend:
+    """Per-process buckets; limits are per worker when running several workers"""
+
+    SWEEP_EVERY = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tats: Dict[str, float] = {}
+        self._calls = 0
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            decision, self._tats[key] = gcra(self._tats.get(key, now), now, limit)
+            self._calls += 1
+            if self._calls % self.SWEEP_EVERY == 0:
+                # A bucket whose TAT has passed is full again; dropping it changes nothing
+                self._tats = {k: t for k, t in self._tats.items() if t > now}
+        return decision
+
+
+# Same GCRA step, atomically in Redis using the server clock (shared by all workers)
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local tolerance = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - tolerance
+if now < allow_at then
+  return {0, 0, tostring(tat - now), tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - allow_at) / interval), tostring(new_tat - now), '0'}
+"""
+
+
+class RedisBackend:
+    """Buckets shared across workers and hosts; one round trip per request"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("rate_limit_redis_url is set but the redis package is not installed") from e
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_GCRA_SCRIPT)
+
+    async def hit(self, key: str, limit: Limit) -> Decision:
+        allowed, remaining, reset_after, retry_after = await self._script(
+            keys=[self.prefix + key], args=[limit.emission_interval, limit.tolerance]
+        )
+        return Decision(bool(allowed), int(remaining), float(reset_after), float(retry_after))
+
+
+# ============= TIER CACHE =============
+
+def _lookup_user_tier(user_id: str) -> str:
+    """Best plan tier among the user's active subscriptions"""
+    from app.database import SessionLocal
+    from app.models import Subscription
+
+    db = SessionLocal()
+    try:
+        tiers = {t for (t,) in db.query(Subscription.plan_tier).filter(
+            Subscription.user_id == user_id, Subscription.status == "active"
+        )}
+    finally:
+        db.close()
+    for tier in reversed(TIER_ORDER):
+        if tier in tiers:
+            return tier
+    return "free"
+
+
+class TierCache:
+    """
+    Plan tier per user, so the rate-limit check does not query the DB.
+
+    Subscription writes in this process invalidate their user. An upgrade or
+    cancellation handled by another worker applies here once the entry
+    expires, so for up to ttl_seconds the user keeps the old tier's limits.
+    At most `max_entries` users, least recently used first out.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, user_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] < time.monotonic():
+                return None
+            self._entries.move_to_end(user_id)
+        return entry[0]
+
+    def set(self, user_id: str, tier: str):
+        with self._lock:
+            self._entries[user_id] = (tier, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    async def resolve(self, user_id: str) -> str:
+        tier = self.get(user_id)
+        if tier is None:
+            tier = await run_in_threadpool(_lookup_user_tier, user_id)
+            self.set(user_id, tier)
+        return tier
+
+
+tier_cache = TierCache(ttl_seconds=get_settings().rate_limit_tier_cache_ttl_seconds)
+
+
+# ============= API KEYS AND QUOTA =============
+
+class KeyGrant(NamedTuple):
+    """A verified API key, with the quota of its owner's subscription to that agent"""
+    key_id: str
+    user_id: str
+    subscription_id: Optional[str]  # None: no active subscription, nothing to count against
+    api_quota: int
+    api_used: int  # Subscription.api_used when looked up
+    counted: int  # api_usage.counted(subscription_id) when looked up
+
+
+def _lookup_api_key(key_hash: str) -> Optional[tuple]:
+    """(key id, user id, subscription id, quota, used) of an active key with this hash, or None"""
+    from sqlalchemy import and_, or_
+
+    from app.database import SessionLocal
+    from app.models import APIKey, Subscription
+
+    db = SessionLocal()
+    try:
+        return db.query(
+            APIKey.id, APIKey.user_id, Subscription.id, Subscription.api_quota, Subscription.api_used
+        ).outerjoin(Subscription, and_(
+            Subscription.user_id == APIKey.user_id,
+            Subscription.agent_id == APIKey.agent_id,
+            Subscription.status == "active",
+        )).filter(
+            APIKey.key_hash == key_hash,
+            APIKey.is_active.is_(True),
+            or_(APIKey.expires_at.is_(None), APIKey.expires_at > datetime.utcnow()),
+        ).first()
+    finally:
+        db.close()
+
+
+class ApiUsage:
+    """
+    Verified API key calls per subscription, counted in memory and added to
+    Subscription.api_used by the sweeper in one batched UPDATE.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        self._counted: Dict[str, int] = {}  # ever counted by this process, flushed or not
+
+    def add(self, subscription_id: str):
+        with self._lock:
+            self._pending[subscription_id] = self._pending.get(subscription_id, 0) + 1
+            self._counted[subscription_id] = self._counted.get(subscription_id, 0) + 1
+
+    def counted(self, subscription_id: str) -> int:
+        return self._counted.get(subscription_id, 0)
+
+    def used(self, grant: KeyGrant) -> int:
+        """api_used as of the lookup plus what this process counted since"""
+        return grant.api_used + self.counted(grant.subscription_id) - grant.counted
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self, db) -> int:
+        from sqlalchemy import bindparam, update
+
+        from app.models import Subscription
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        table = Subscription.__table__  # a Core executemany: ORM bulk UPDATE only sets values by primary key
+        try:
+            db.execute(
+                update(table).where(table.c.id == bindparam("subscription_id"))
+                .values(api_used=table.c.api_used + bindparam("calls")),
+                [{"subscription_id": s, "calls": n} for s, n in pending.items()],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for subscription_id, calls in pending.items():
+                    self._pending[subscription_id] = self._pending.get(subscription_id, 0) + calls
+            raise
+        return len(pending)
+
+
+api_usage = ApiUsage()
+
+
+class LastUsedBuffer:
+    """
+    Latest use per verified API key, kept in memory and written to
+    APIKey.last_used by the sweeper in one batched UPDATE instead of one
+    write per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[str, datetime] = {}
+
+    def touch(self, key_id: str, when: Optional[datetime] = None):
+        when = when or datetime.utcnow()
+        with self._lock:
+            if self._pending.get(key_id, when) <= when:
+                self._pending[key_id] = when
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def flush(self, db) -> int:
+        from sqlalchemy import update
+
+        from app.models import APIKey
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            db.execute(update(APIKey), [{"id": k, "last_used": t} for k, t in pending.items()])
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                # Keep what failed unless a newer touch arrived meanwhile
+                for key_id, when in pending.items():
+                    if self._pending.get(key_id, when) <= when:
+                        self._pending[key_id] = when
+            raise
+        return len(pending)
+
+
+last_used_buffer = LastUsedBuffer()
+
+
+class APIKeyCache:
+    """
+    X-API-Key -> KeyGrant (or None for keys that don't verify), so the rate-limit
+    check only queries the DB once per key per TTL. Keyed by the key's HMAC;
+    at most `max_entries`, least recently used first out, so a flood of random
+    keys can't grow it.
+
+    Key and subscription writes in this process invalidate their user. The
+    grant also carries the key's quota counts, which are only reread on
+    expiry; a key revoked through another worker keeps passing this check
+    for up to ttl_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Optional[KeyGrant], float]]" = OrderedDict()
+
+    def get(self, key_hash: str) -> Tuple[bool, Optional[KeyGrant]]:
+        """(hit, grant)"""
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None or entry[1] < time.monotonic():
+                return False, None
+            self._entries.move_to_end(key_hash)
+        return True, entry[0]
+
+    def set(self, key_hash: str, grant: Optional[KeyGrant]):
+        with self._lock:
+            self._entries[key_hash] = (grant, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            for key_hash in [h for h, (g, _) in self._entries.items() if g is not None and g.user_id == user_id]:
+                del self._entries[key_hash]
+
+    async def resolve(self, api_key: str, key_hash: Optional[str] = None) -> Optional[KeyGrant]:
+        key_hash = key_hash or hash_api_key(api_key)
+        hit, grant = self.get(key_hash)
+        if not hit:
+            row = await run_in_threadpool(_lookup_api_key, key_hash)
+            if row is not None:
+                key_id, user_id, subscription_id, api_quota, api_used = row
+                grant = KeyGrant(key_id, user_id, subscription_id, api_quota or 0, api_used or 0,
+                                 api_usage.counted(subscription_id))
+            self.set(key_hash, grant)
+        return grant
+
+
+api_key_cache = APIKeyCache(ttl_seconds=get_settings().rate_limit_api_key_cache_ttl_seconds)
+
+
+# ============= MIDDLEWARE =============
+
+class RateLimitMiddleware:
+    """
+    GCRA rate limiting per caller, with limits by subscription tier.
+
+    Callers are identified by X-API-Key when it verifies against the key store
+    (bucketed per key at the owner's tier, and counted against the monthly
+    api_quota of the owner's subscription to the key's agent), else by the
+    bearer token's user (header or `authorization` query parameter), else by
+    client IP under the "anonymous" limit; an unknown key changes nothing.
+    A key that is not cached costs a DB lookup, so it is first charged to the
+    client IP's "key_lookup" bucket; once that is empty, uncached keys get 429
+    without reaching the DB. Every limited response carries X-RateLimit-Limit / -Remaining / -Reset;
+    rejections are 429 with Retry-After, or 429 once the quota is used up.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, Tuple[int, int]], redis_url: Optional[str] = None):
+        self.app = app
+        self.limits = {tier: Limit(*value) for tier, value in limits.items()}
+        self.limits.setdefault("key_lookup", self.limits["anonymous"])
+        self.backend = RedisBackend(redis_url) if redis_url else MemoryBackend()
+
+    async def identify(self, scope: Scope) -> Tuple[str, str, Optional[KeyGrant]]:
+        """(bucket key, tier, verified API key) for a request"""
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        api_key = headers.get("x-api-key")
+        if api_key:
+            key_hash = hash_api_key(api_key)
+            if not api_key_cache.get(key_hash)[0]:
+                lookup = await self.backend.hit("lookup:" + ip, self.limits["key_lookup"])
+                if not lookup.allowed:
+                    # Answered from the same empty bucket in __call__, without a DB query
+                    return "lookup:" + ip, "key_lookup", None
+            grant = await api_key_cache.resolve(api_key, key_hash)
+            if grant is not None:
+                return "key:" + grant.key_id, await tier_cache.resolve(grant.user_id), grant
+        authorization = headers.get("authorization")
+        if not authorization and scope.get("query_string"):
+            authorization = parse_qs(scope["query_string"].decode("latin-1")).get("authorization", [None])[0]
+        user_id = user_id_from_authorization(authorization)
+        if user_id:
+            return "user:" + user_id, await tier_cache.resolve(user_id), None
+        return "ip:" + ip, "anonymous", None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key, tier, grant = await self.identify(scope)
+        if grant is not None:
+            last_used_buffer.touch(grant.key_id)
+        limit = self.limits.get(tier) or self.limits["free"]
+        decision = await self.backend.hit(key, limit)
+        headers = {
+            "X-RateLimit-Limit": str(limit.per_minute),
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(math.ceil(decision.retry_after))
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=headers)
+            await response(scope, receive, send)
+            return
+        if grant is not None and grant.subscription_id:
+            if api_usage.used(grant) >= grant.api_quota:
+                response = JSONResponse({"detail": "Monthly API quota exceeded"}, status_code=429,
+                                        headers=headers)
+                await response(scope, receive, send)
+                return
+            api_usage.add(grant.subscription_id)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(raw=message["headers"]).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
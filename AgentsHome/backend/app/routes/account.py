@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from service_kit.http_cache import if_none_match, not_modified
+from service_kit.instrumentation import timed
+from app.database import get_db
+from app.schemas import AccountContextResponse
+from app.services.account_service import get_account_context
+from app.services.auth_service import user_id_from_authorization
+
+router = APIRouter(prefix="/api/account", tags=["account"])
+
+@router.get("/context", response_model=AccountContextResponse)
+def account_context(
+    request: Request,
+    authorization: str = None,
+    db: Session = Depends(get_db)
+):
+    """User, active subscriptions and active API keys for the dashboard, in one call"""
+    with timed("jwt"):
+        user_id = user_id_from_authorization(authorization)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    context = get_account_context(db, user_id)
+    if context is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    body, etag = context
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    return Response(body, media_type="application/json", headers={"ETag": etag})
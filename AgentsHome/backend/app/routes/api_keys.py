@@ -1,27 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
+from service_kit.http_cache import if_none_match, not_modified, version_etag, weak_etag
+from service_kit.instrumentation import timed
+from app.config import get_settings
 from app.database import get_db
 from app.models import User, APIKey
-from app.schemas import APIKeyResponse, APIKeyCreate, APIKeyCreateResponse
+from app.schemas import (
+    APIKeyResponse, APIKeyCreate, APIKeyCreateResponse,
+    APIKeyBulkCreate, APIKeyBulkIds, APIKeyBulkRevokeResponse
+)
+from app.rate_limit import api_key_cache
+from app.services.account_service import account_context_cache
+from app.serializers import list_response, serialize_api_key
 from app.services.auth_service import (
-    verify_token, generate_api_key, hash_api_key
+    verify_token, generate_api_key, hash_api_key, hash_api_keys
 )
-from typing import List
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+import orjson
 import uuid
 
 router = APIRouter(prefix="/api/api-keys", tags=["api-keys"])
 
+# APIKey has no updated_at; these are the columns a write can change
+VERSION_FIELDS = ("id", "name", "is_active", "expires_at")
+
 def get_current_user(authorization: str = None, db: Session = Depends(get_db)):
     """Extract and verify user from auth token"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     token = authorization.split(" ")[1]
-    user_id = verify_token(token)
+    with timed("jwt"):
+        user_id = verify_token(token)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    with timed("user_lookup"):
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -29,6 +47,8 @@ def get_current_user(authorization: str = None, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[APIKeyResponse])
 def list_api_keys(
+    request: Request,
+    response: Response,
     agent_id: str = None,
     authorization: str = None,
     db: Session = Depends(get_db)
@@ -39,8 +59,19 @@ def list_api_keys(
     query = db.query(APIKey).filter(APIKey.user_id == user.id)
     if agent_id:
         query = query.filter(APIKey.agent_id == agent_id)
+    query = query.order_by(APIKey.created_at, APIKey.id)
+    if request.headers.get("if-none-match"):
+        # Revalidation reads the version columns only, and skips building the full rows
+        etag = version_etag(query, APIKey, VERSION_FIELDS)
+        if if_none_match(request, etag):
+            return not_modified(etag)
     
     keys = query.all()
+    etag = weak_etag(keys, VERSION_FIELDS)
+    
+    response.headers["ETag"] = etag
+    if get_settings().fast_json:
+        return list_response(keys, serialize_api_key, headers={"ETag": etag})
     return keys
 
 @router.post("/", response_model=APIKeyCreateResponse)
@@ -67,6 +98,7 @@ def create_api_key(
     db.add(api_key)
     db.commit()
     db.refresh(api_key)
+    account_context_cache.invalidate(user.id)
     
     return APIKeyCreateResponse(
         id=api_key.id,
@@ -116,6 +148,8 @@ def revoke_api_key(
     
     api_key.is_active = False
     db.commit()
+    account_context_cache.invalidate(user.id)
+    api_key_cache.invalidate(user.id)
     
     return None
 
@@ -138,5 +172,107 @@ def delete_api_key(
     
     db.delete(api_key)
     db.commit()
+    account_context_cache.invalidate(user.id)
+    api_key_cache.invalidate(user.id)
     
     return None
+
+# ============= BULK OPERATIONS =============
+
+def _new_key_rows(user_id: str, specs: List[Tuple[str, str]]) -> Tuple[List[dict], List[str]]:
+    """Rows for new keys (agent_id, name) plus their plain values"""
+    plain_keys = [generate_api_key() for _ in specs]
+    with timed("hash"):
+        hashes = hash_api_keys(plain_keys)
+    now = datetime.utcnow()
+    rows = [
+        {"id": str(uuid.uuid4()), "user_id": user_id, "agent_id": agent_id, "key_hash": key_hash,
+         "name": name, "is_active": True, "created_at": now, "expires_at": None}
+        for (agent_id, name), key_hash in zip(specs, hashes)
+    ]
+    return rows, plain_keys
+
+def _stream_new_keys(rows: List[dict], plain_keys: List[str],
+                     rotated_from: Optional[List[str]] = None) -> Iterator[bytes]:
+    """One APIKeyCreateResponse per NDJSON line (plus rotated_from when rotating)"""
+    for i, row in enumerate(rows):
+        line = {field: row[field] for field in APIKeyResponse.model_fields}
+        line["key"] = plain_keys[i]
+        if rotated_from is not None:
+            line["rotated_from"] = rotated_from[i]
+        yield orjson.dumps(line) + b"\n"
+
+def _invalidate(user_id: str):
+    account_context_cache.invalidate(user_id)
+    api_key_cache.invalidate(user_id)
+
+@router.post("/bulk", response_class=StreamingResponse)
+def bulk_create_api_keys(
+    request: APIKeyBulkCreate,
+    authorization: str = None,
+    db: Session = Depends(get_db)
+):
+    """Create up to 1000 keys in one transaction; new keys stream back as NDJSON"""
+    user = get_current_user(authorization, db)
+    
+    rows, plain_keys = _new_key_rows(user.id, [(k.agent_id, k.name) for k in request.keys])
+    db.execute(insert(APIKey), rows)
+    db.commit()
+    _invalidate(user.id)
+    
+    return StreamingResponse(_stream_new_keys(rows, plain_keys), media_type="application/x-ndjson")
+
+@router.post("/bulk/rotate", response_class=StreamingResponse)
+def bulk_rotate_api_keys(
+    request: APIKeyBulkIds,
+    authorization: str = None,
+    db: Session = Depends(get_db)
+):
+    """Replace active keys with new ones (same agent and name) and revoke the old ones, all or nothing"""
+    user = get_current_user(authorization, db)
+    
+    key_ids = list(dict.fromkeys(request.key_ids))
+    old_keys = db.query(APIKey.id, APIKey.agent_id, APIKey.name).filter(
+        APIKey.user_id == user.id,
+        APIKey.id.in_(key_ids),
+        APIKey.is_active.is_(True)
+    ).all()
+    if len(old_keys) != len(key_ids):
+        found = {k.id for k in old_keys}
+        missing = [k for k in key_ids if k not in found]
+        raise HTTPException(status_code=404, detail=f"Active API keys not found: {missing[:20]}")
+    order = {key_id: i for i, key_id in enumerate(key_ids)}
+    old_keys.sort(key=lambda k: order[k.id])
+    
+    rows, plain_keys = _new_key_rows(user.id, [(k.agent_id, k.name) for k in old_keys])
+    db.execute(
+        update(APIKey).where(APIKey.id.in_(key_ids)).values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(insert(APIKey), rows)
+    db.commit()
+    _invalidate(user.id)
+    
+    return StreamingResponse(_stream_new_keys(rows, plain_keys, [k.id for k in old_keys]),
+                             media_type="application/x-ndjson")
+
+@router.post("/bulk/revoke", response_model=APIKeyBulkRevokeResponse)
+def bulk_revoke_api_keys(
+    request: APIKeyBulkIds,
+    authorization: str = None,
+    db: Session = Depends(get_db)
+):
+    """Revoke many keys with a single UPDATE"""
+    user = get_current_user(authorization, db)
+    
+    result = db.execute(
+        update(APIKey).where(
+            APIKey.user_id == user.id,
+            APIKey.id.in_(request.key_ids),
+            APIKey.is_active.is_(True)
+        ).values(is_active=False).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    _invalidate(user.id)
+    
+    return APIKeyBulkRevokeResponse(revoked=result.rowcount)
@@ -1,8 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
+from service_kit.http_cache import if_none_match, not_modified, version_etag, weak_etag
+from service_kit.instrumentation import timed
+from app.config import get_settings
 from app.database import get_db
 from app.models import User, Subscription
 from app.schemas import SubscriptionResponse, SubscriptionCreate
+from app.rate_limit import api_key_cache, tier_cache
+from app.services.account_service import account_context_cache
+from app.serializers import list_response, serialize_subscription
 from app.services.auth_service import verify_token
 from typing import List
 import uuid
@@ -10,17 +16,22 @@ from datetime import datetime, timedelta
 
 router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"])
 
+# Columns that change whenever a subscription row changes
+VERSION_FIELDS = ("id", "updated_at", "status", "plan_tier", "api_quota", "api_used", "renewal_date")
+
 def get_current_user(authorization: str = None, db: Session = Depends(get_db)):
     """Extract and verify user from auth token"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Not authenticated")
     
     token = authorization.split(" ")[1]
-    user_id = verify_token(token)
+    with timed("jwt"):
+        user_id = verify_token(token)
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
-    user = db.query(User).filter(User.id == user_id).first()
+    with timed("user_lookup"):
+        user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -28,16 +39,29 @@ def get_current_user(authorization: str = None, db: Session = Depends(get_db)):
 
 @router.get("/", response_model=List[SubscriptionResponse])
 def list_subscriptions(
+    request: Request,
+    response: Response,
     authorization: str = None,
     db: Session = Depends(get_db)
 ):
     """List all subscriptions for current user"""
     user = get_current_user(authorization, db)
     
-    subscriptions = db.query(Subscription).filter(
+    query = db.query(Subscription).filter(
         Subscription.user_id == user.id
-    ).all()
-    
+    ).order_by(Subscription.created_at, Subscription.id)
+    if request.headers.get("if-none-match"):
+        # Revalidation reads the version columns only, and skips building the full rows
+        etag = version_etag(query, Subscription, VERSION_FIELDS)
+        if if_none_match(request, etag):
+            return not_modified(etag)
+    
+    subscriptions = query.all()
+    etag = weak_etag(subscriptions, VERSION_FIELDS)
+    
+    response.headers["ETag"] = etag
+    if get_settings().fast_json:
+        return list_response(subscriptions, serialize_subscription, headers={"ETag": etag})
     return subscriptions
 
 @router.get("/{agent_id}", response_model=SubscriptionResponse)
@@ -82,12 +106,15 @@ def create_subscription(
         user_id=user.id,
         agent_id=request.agent_id,
         plan_tier=request.plan_tier,
-        renewal_date=datetime.utcnow() + timedelta(days=30)
+        renewal_date=datetime.utcnow() + timedelta(days=get_settings().subscription_period_days)
     )
     
     db.add(subscription)
     db.commit()
     db.refresh(subscription)
+    tier_cache.invalidate(user.id)
+    api_key_cache.invalidate(user.id)
+    account_context_cache.invalidate(user.id)
     
     return subscription
 
@@ -112,6 +139,9 @@ def update_subscription(
     subscription.plan_tier = request.plan_tier
     db.commit()
     db.refresh(subscription)
+    tier_cache.invalidate(user.id)
+    api_key_cache.invalidate(user.id)
+    account_context_cache.invalidate(user.id)
     
     return subscription
 
@@ -134,5 +164,8 @@ def cancel_subscription(
     
     subscription.status = "cancelled"
     db.commit()
+    tier_cache.invalidate(user.id)
+    api_key_cache.invalidate(user.id)
+    account_context_cache.invalidate(user.id)
     
     return None
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 # Auth
 class UserBase(BaseModel):
@@ -80,3 +80,19 @@ class APIKeyResponse(BaseModel):
 
 class APIKeyCreateResponse(APIKeyResponse):
     key: str  # Only returned on creation
+
+# Bulk API key operations
+class APIKeyBulkCreate(BaseModel):
+    keys: List[APIKeyCreate] = Field(..., min_length=1, max_length=1000)
+
+class APIKeyBulkIds(BaseModel):
+    key_ids: List[str] = Field(..., min_length=1, max_length=1000)
+
+class APIKeyBulkRevokeResponse(BaseModel):
+    revoked: int
+
+# Account context (dashboard)
+class AccountContextResponse(BaseModel):
+    user: UserResponse
+    subscriptions: List[SubscriptionResponse]  # active only
+    api_keys: List[APIKeyResponse]  # active only
@@ -0,0 +1,31 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.schemas import APIKeyResponse, SubscriptionResponse, UserResponse
+
+
+def row_serializer(schema: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Pre-built serializer copying a response schema's fields off a trusted ORM row.
+
+    Skips per-row Pydantic validation; orjson encodes datetimes natively.
+    """
+    fields = tuple(schema.model_fields)
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda row: {fields[0]: getter(row)}
+    return lambda row: dict(zip(fields, getter(row)))
+
+
+serialize_subscription = row_serializer(SubscriptionResponse)
+serialize_api_key = row_serializer(APIKeyResponse)
+serialize_user = row_serializer(UserResponse)
+
+
+def list_response(rows: Iterable[Any], serializer: Callable[[Any], Dict[str, Any]],
+                  headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    """Serialize ORM rows straight to JSON, bypassing response_model re-validation"""
+    return ORJSONResponse([serializer(row) for row in rows], headers=headers)
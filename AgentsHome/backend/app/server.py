@@ -0,0 +1,63 @@
+"""
+Production entry point: a pre-fork server (service_kit.server).
+
+    python -m app.server --workers 4 --port 8001
+
+The master imports the app and loads the heavy read-only state once
+(routes and schemas, ORM mappers, the bcrypt backend), then forks the
+workers, which share those pages copy-on-write, and logs their memory
+every server_memory_report_seconds.
+
+It runs one worker by default. Several workers are opt-in, because state
+kept in process memory is per worker: /metrics describes only the worker
+that answered the scrape, and the tier, API key and account-context caches
+only see writes made in their own worker. The rate limiter's buckets are
+shared only through rate_limit_redis_url, so with it set the default is one
+worker per available CPU, and without it (rate limiting on) more than one
+worker is refused. The sweeper's renewal and expiry pass runs in worker 0
+only (see app.services.sweeper).
+"""
+import argparse
+from typing import List, Optional
+
+from service_kit.server import available_cpus, serve
+
+from app.config import WORKER_INDEX_ENV, get_settings
+
+
+def preload():
+    """Import the app and build the state every worker reads; returns the ASGI app"""
+    from sqlalchemy.orm import configure_mappers
+
+    from app.database import engine
+    from app.main import app
+    from app.services.auth_service import pwd_context
+
+    configure_mappers()
+    pwd_context.handler("bcrypt").get_backend()  # imports and self-tests bcrypt once
+    engine.dispose()  # connections opened by create_all must not be shared by the workers
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Pre-fork server: preload once, fork workers that share it")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=settings.server_workers,
+                        help="default 1, or one per available CPU with rate_limit_redis_url; 0 = one per CPU")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    workers = args.workers
+    if workers is None:
+        workers = 0 if settings.rate_limit_redis_url else 1
+    workers = workers or available_cpus()
+    if workers > 1 and settings.rate_limit_enabled and not settings.rate_limit_redis_url:
+        parser.error(f"{workers} workers need rate_limit_redis_url: in-memory rate limits are per worker, "
+                     f"so a client would get up to {workers} times its limit")
+    serve(preload, args.host, args.port, workers, args.log_level,
+          settings.server_memory_report_seconds, WORKER_INDEX_ENV)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import orjson
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import get_settings
+from app.models import APIKey, Subscription, User
+from app.serializers import serialize_api_key, serialize_subscription, serialize_user
+
+
+def load_account(db: Session, user_id: str) -> Optional[User]:
+    """
+    User with active subscriptions and active API keys in two round trips:
+    subscriptions are joined onto the user row (a handful per user), keys are
+    fetched with one SELECT ... IN so the join does not multiply rows.
+    """
+    return db.query(User).options(
+        joinedload(User.subscriptions.and_(Subscription.status == "active")),
+        selectinload(User.api_keys.and_(APIKey.is_active.is_(True))),
+    ).filter(User.id == user_id).first()
+
+
+def render_account_context(user: User) -> bytes:
+    return orjson.dumps({
+        "user": serialize_user(user),
+        "subscriptions": [serialize_subscription(s) for s in user.subscriptions],
+        "api_keys": [serialize_api_key(k) for k in user.api_keys],
+    })
+
+
+class AccountContextCache:
+    """
+    Encoded account context and its ETag per user.
+
+    Subscription and API key writes in this process invalidate their user,
+    so /account reflects them at once here; the same body and ETag are
+    served by the other workers until their entry is ttl_seconds old.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[bytes, str, float]] = {}
+
+    def get(self, user_id: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[2] < time.monotonic():
+            return None
+        return entry[0], entry[1]
+
+    def set(self, user_id: str, body: bytes) -> str:
+        etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+        with self._lock:
+            self._entries[user_id] = (body, etag, time.monotonic() + self.ttl_seconds)
+        return etag
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+account_context_cache = AccountContextCache(ttl_seconds=get_settings().account_context_cache_ttl_seconds)
+
+
+def get_account_context(db: Session, user_id: str) -> Optional[Tuple[bytes, str]]:
+    """(JSON body, ETag) for a user's dashboard, or None if the user does not exist"""
+    cached = account_context_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = load_account(db, user_id)
+    if user is None:
+        return None
+    body = render_account_context(user)
+    return body, account_context_cache.set(user_id, body)
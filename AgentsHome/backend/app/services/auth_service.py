@@ -1,9 +1,11 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import List, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import get_settings
-import uuid
+import hashlib
+import hmac
+import secrets
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -42,14 +44,31 @@ def verify_token(token: str):
     except JWTError:
         return None
 
+def user_id_from_authorization(authorization: Optional[str]) -> Optional[str]:
+    """User id from a "Bearer <token>" value, checked without a DB lookup"""
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    return verify_token(authorization.split(" ")[1])
+
 def generate_api_key() -> str:
     """Generate a random API key"""
-    return f"sk_{uuid.uuid4().hex[:32]}"
+    return f"sk_{secrets.token_hex(16)}"
 
 def hash_api_key(key: str) -> str:
-    """Hash API key for storage"""
-    return pwd_context.hash(key)
+    """
+    HMAC-SHA256 of the key with the server-side pepper. API keys are 128 random
+    bits, so a slow hash adds nothing against guessing; a keyed fast hash keeps
+    a leaked table useless without the pepper and, being deterministic, lets
+    a key be looked up by its hash.
+    """
+    return hmac.new(settings.api_key_pepper.encode(), key.encode(), hashlib.sha256).hexdigest()
 
 def verify_api_key(plain_key: str, hashed_key: str) -> bool:
-    """Verify API key"""
-    return pwd_context.verify(plain_key, hashed_key)
+    """Verify API key (keys created before HMAC hashing still carry a bcrypt hash)"""
+    if hashed_key.startswith("$2"):
+        return pwd_context.verify(plain_key, hashed_key)
+    return hmac.compare_digest(hash_api_key(plain_key), hashed_key)
+
+def hash_api_keys(keys: List[str]) -> List[str]:
+    """Hash many API keys (same order as the input)"""
+    return [hash_api_key(key) for key in keys]
@@ -0,0 +1,211 @@
+"""
+Periodic sweeper for time-based subscription and API key state.
+
+Request handlers never check renewal or expiry dates; this sweeper does it
+in the background instead:
+- active subscriptions past renewal_date get api_used reset and roll forward a period
+- cancelled subscriptions past renewal_date become 'expired'
+- active API keys past expires_at are deactivated
+- buffered APIKey.last_used timestamps are written in one batch
+- API calls counted by the rate limiter are added to Subscription.api_used in one batch
+
+Each worker of the pre-fork server runs a sweeper and flushes its own
+buffers; the renewal and expiry steps run in one process at a time
+(sweep_lock).
+
+Each pass range-scans the indexed date columns in batches of
+`sweeper_batch_size`; every UPDATE moves its rows out of the scanned range,
+so a pass ends when a batch comes back empty.
+
+Usage:
+    python -m app.services.sweeper            # run forever
+    python -m app.services.sweeper --once     # one pass, print counts
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, Optional
+
+from sqlalchemy import text, update
+from sqlalchemy.orm import Session
+
+from app.config import WORKER_INDEX_ENV, get_settings
+from app.database import SessionLocal
+from app.models import APIKey, Subscription
+from app.rate_limit import api_key_cache, api_usage, last_used_buffer, tier_cache
+from app.services.account_service import account_context_cache
+
+logger = logging.getLogger(__name__)
+
+SWEEP_LOCK_ID = 0x53574545  # pg advisory lock key held during a renewal/expiry pass
+
+
+def _invalidate_user(user_id: str):
+    account_context_cache.invalidate(user_id)
+    tier_cache.invalidate(user_id)
+    api_key_cache.invalidate(user_id)
+
+
+def renew_subscriptions(db: Session, now: datetime, batch_size: int, period: timedelta) -> int:
+    """Reset usage and roll renewal_date forward for active subscriptions that reached it"""
+    renewed = 0
+    while True:
+        batch = db.query(Subscription.id, Subscription.user_id, Subscription.renewal_date).filter(
+            Subscription.renewal_date <= now,
+            Subscription.status == "active",
+        ).order_by(Subscription.renewal_date).limit(batch_size).all()
+        if not batch:
+            return renewed
+        rows = []
+        for sub_id, _, renewal_date in batch:
+            # A subscription missed for several periods renews once, into the current period
+            periods = (now - renewal_date) // period + 1
+            rows.append({"id": sub_id, "api_used": 0, "renewal_date": renewal_date + periods * period,
+                         "updated_at": now})
+        db.execute(update(Subscription), rows)
+        db.commit()
+        for user_id in {user_id for _, user_id, _ in batch}:
+            _invalidate_user(user_id)
+        renewed += len(batch)
+
+
+def expire_subscriptions(db: Session, now: datetime, batch_size: int) -> int:
+    """Cancelled subscriptions end at their renewal date"""
+    expired = 0
+    while True:
+        batch = db.query(Subscription.id, Subscription.user_id).filter(
+            Subscription.renewal_date <= now,
+            Subscription.status == "cancelled",
+        ).order_by(Subscription.renewal_date).limit(batch_size).all()
+        if not batch:
+            return expired
+        db.execute(
+            update(Subscription).where(Subscription.id.in_([s.id for s in batch]))
+            .values(status="expired", updated_at=now).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        for user_id in {s.user_id for s in batch}:
+            _invalidate_user(user_id)
+        expired += len(batch)
+
+
+def expire_api_keys(db: Session, now: datetime, batch_size: int) -> int:
+    """Deactivate active keys whose expires_at has passed"""
+    expired = 0
+    while True:
+        batch = db.query(APIKey.id, APIKey.user_id).filter(
+            APIKey.expires_at <= now,
+            APIKey.is_active.is_(True),
+        ).order_by(APIKey.expires_at).limit(batch_size).all()
+        if not batch:
+            return expired
+        db.execute(
+            update(APIKey).where(APIKey.id.in_([k.id for k in batch]))
+            .values(is_active=False).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        for user_id in {k.user_id for k in batch}:
+            _invalidate_user(user_id)
+        expired += len(batch)
+
+
+@contextmanager
+def sweep_lock(db: Session) -> Iterator[bool]:
+    """
+    Whether this process runs the renewal/expiry steps now. Every pre-fork
+    worker runs a Sweeper (each flushes its own last_used buffer), but those
+    steps must run once: on PostgreSQL whoever takes a session advisory lock,
+    which also covers several containers; elsewhere worker 0, or a process
+    not started by app.server.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        yield os.environ.get(WORKER_INDEX_ENV, "0") == "0"
+        return
+    with bind.connect() as conn:  # its own connection: db commits per batch and may hand its back
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": SWEEP_LOCK_ID}).scalar()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SWEEP_LOCK_ID})
+
+
+def sweep(db: Session, now: Optional[datetime] = None, batch_size: Optional[int] = None) -> Dict[str, int]:
+    """One full pass; returns how many rows each step changed"""
+    settings = get_settings()
+    now = now or datetime.utcnow()
+    batch_size = batch_size or settings.sweeper_batch_size
+    # Calls counted before a renewal belong to the period it resets
+    counts = {"api_usage_flushed": api_usage.flush(db)}
+    with sweep_lock(db) as leader:
+        if leader:
+            counts.update({
+                "renewed_subscriptions": renew_subscriptions(db, now, batch_size,
+                                                             timedelta(days=settings.subscription_period_days)),
+                "expired_subscriptions": expire_subscriptions(db, now, batch_size),
+                "expired_api_keys": expire_api_keys(db, now, batch_size),
+            })
+    counts["last_used_flushed"] = last_used_buffer.flush(db)
+    return counts
+
+
+class Sweeper:
+    """Runs sweep() every `interval` seconds on a daemon thread"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sweeper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.run_once()  # don't lose buffered last_used on shutdown
+
+    def run_once(self) -> Dict[str, int]:
+        db = SessionLocal()
+        try:
+            counts = sweep(db)
+        except Exception:
+            logger.exception("Sweeper pass failed")
+            return {}
+        finally:
+            db.close()
+        if any(counts.values()):
+            logger.info("Sweeper pass: %s", counts)
+        return counts
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Renew/expire subscriptions and expire API keys")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--interval", type=float, default=get_settings().sweeper_interval_seconds)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    sweeper = Sweeper(args.interval)
+    if args.once:
+        print(sweeper.run_once())
+        return 0
+    while True:
+        sweeper.run_once()
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
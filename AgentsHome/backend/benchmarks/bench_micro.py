@@ -0,0 +1,53 @@
+"""
+pytest-benchmark microbenchmarks for the AgentsHome auth service.
+
+Run explicitly (not part of the regular test run):
+    pytest benchmarks/bench_micro.py --benchmark-storage=benchmarks/baselines --benchmark-autosave
+    pytest benchmarks/bench_micro.py --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.services.auth_service import (
+    create_access_token, generate_api_key, hash_api_key, hash_password,
+    verify_api_key, verify_password, verify_token,
+)
+
+
+@pytest.fixture(scope="module")
+def password_hash():
+    return hash_password("TestPassword123")
+
+
+def test_hash_password(benchmark):
+    assert benchmark.pedantic(hash_password, args=("TestPassword123",), rounds=5).startswith("$2b$")
+
+
+def test_verify_password(benchmark, password_hash):
+    assert benchmark.pedantic(verify_password, args=("TestPassword123", password_hash), rounds=5)
+
+
+def test_hash_api_key(benchmark):
+    key = generate_api_key()
+    assert benchmark.pedantic(hash_api_key, args=(key,), rounds=5)
+
+
+def test_verify_api_key(benchmark):
+    key = generate_api_key()
+    hashed = hash_api_key(key)
+    assert benchmark.pedantic(verify_api_key, args=(key, hashed), rounds=5)
+
+
+def test_create_access_token(benchmark):
+    assert benchmark(create_access_token, {"sub": "user-1"})
+
+
+def test_verify_token(benchmark):
+    token = create_access_token({"sub": "user-1"})
+    assert benchmark(verify_token, token) == "user-1"
+
+
+def test_generate_api_key(benchmark):
+    assert benchmark(generate_api_key).startswith("sk_")
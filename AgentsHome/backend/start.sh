@@ -4,7 +4,7 @@
 cd /workspaces/yashus/AgentsHome/backend
 
 # Install dependencies
-pip install -r requirements.txt
+pip install -r requirements.txt -e ../../common
 
 # Run migrations (create tables)
 python -m app.main
@@ -0,0 +1,35 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+
+# Settings and the engine are built at import time, so point them at a throwaway
+# SQLite database (and turn off the background and per-client machinery) first
+_db_dir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir.name}/agentshome.db")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("LOAD_SHEDDING_ENABLED", "false")
+os.environ.setdefault("SWEEPER_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def signup(client) -> dict:
+    """Query params authenticating a new user"""
+    response = client.post("/api/auth/signup", json={
+        "email": f"test-{uuid.uuid4().hex[:8]}@agentshome.com", "password": "TestPassword123", "name": "Test"})
+    assert response.status_code == 200, response.text
+    return {"authorization": f"Bearer {response.json()['token']}"}
+
+
+@pytest.fixture
+def auth(client):
+    return signup(client)
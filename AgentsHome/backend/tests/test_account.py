@@ -0,0 +1,23 @@
+def test_context_lists_active_state_and_follows_writes(client, auth):
+    subscription = client.post("/api/subscriptions/", params=auth, json={"agent_id": "hunter", "plan_tier": "pro"})
+    keys = [client.post("/api/api-keys/", params=auth, json={"agent_id": "hunter", "name": f"k{i}"}).json()
+            for i in range(2)]
+
+    response = client.get("/api/account/context", params=auth)
+    context = response.json()
+    assert [s["id"] for s in context["subscriptions"]] == [subscription.json()["id"]]
+    assert {k["id"] for k in context["api_keys"]} == {k["id"] for k in keys}
+    assert "key_hash" not in context["api_keys"][0]
+
+    etag = response.headers["etag"]
+    assert client.get("/api/account/context", params=auth, headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/api/api-keys/{keys[0]['id']}/revoke", params=auth)  # invalidates the cached context
+    fresh = client.get("/api/account/context", params=auth, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert [k["id"] for k in fresh.json()["api_keys"]] == [keys[1]["id"]]
+
+
+def test_context_requires_a_valid_token(client):
+    assert client.get("/api/account/context").status_code == 401
+    assert client.get("/api/account/context", params={"authorization": "Bearer nope"}).status_code == 401
@@ -0,0 +1,103 @@
+import orjson
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app.database import Base, SessionLocal, ensure_indexes
+from app.models import APIKey
+from app.services.auth_service import generate_api_key, hash_api_key, pwd_context, verify_api_key
+from tests.conftest import signup
+
+
+def bulk_create(client, auth, n: int):
+    response = client.post("/api/api-keys/bulk", params=auth,
+                           json={"keys": [{"agent_id": "hunter", "name": f"ci-{i}"} for i in range(n)]})
+    assert response.status_code == 200
+    return [orjson.loads(line) for line in response.iter_lines() if line]
+
+
+def stored_hash(key_id: str) -> str:
+    db = SessionLocal()
+    try:
+        return db.get(APIKey, key_id).key_hash
+    finally:
+        db.close()
+
+
+def test_api_keys_are_stored_as_peppered_hmac():
+    key = "sk_" + "0" * 32
+    assert hash_api_key(key) == hash_api_key(key) and len(hash_api_key(key)) == 64
+    assert verify_api_key(key, hash_api_key(key))
+    assert not verify_api_key(key + "1", hash_api_key(key))
+    assert verify_api_key(key, pwd_context.hash(key))  # keys created before HMAC hashing
+
+
+def test_generated_keys_carry_128_random_bits():
+    key = generate_api_key()
+    assert key.startswith("sk_") and len(bytes.fromhex(key[3:])) == 16
+    assert generate_api_key() != key
+
+
+def test_key_hash_index_is_added_to_an_existing_table():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_api_keys_key_hash"))  # a table created before the index
+    Base.metadata.create_all(bind=engine)
+    assert "ix_api_keys_key_hash" not in {i["name"] for i in inspect(engine).get_indexes("api_keys")}
+    ensure_indexes(engine)
+    assert "ix_api_keys_key_hash" in {i["name"] for i in inspect(engine).get_indexes("api_keys")}
+
+
+def test_bulk_create_streams_usable_keys(client, auth):
+    keys = bulk_create(client, auth, 3)
+    assert [k["name"] for k in keys] == ["ci-0", "ci-1", "ci-2"]
+    for key in keys:
+        assert verify_api_key(key["key"], stored_hash(key["id"]))
+    listed = client.get("/api/api-keys/", params=auth).json()
+    assert {k["id"] for k in keys} <= {k["id"] for k in listed}
+
+
+def test_bulk_rotate_is_all_or_nothing(client, auth):
+    keys = bulk_create(client, auth, 2)
+    ids = [k["id"] for k in keys]
+    response = client.post("/api/api-keys/bulk/rotate", params=auth, json={"key_ids": ids + ["missing"]})
+    assert response.status_code == 404
+    assert all(k["is_active"] for k in client.get("/api/api-keys/", params=auth).json() if k["id"] in ids)
+
+    rotated = [orjson.loads(line) for line in client.post(
+        "/api/api-keys/bulk/rotate", params=auth, json={"key_ids": ids[::-1]}).iter_lines() if line]
+    assert [k["rotated_from"] for k in rotated] == ids[::-1]
+    active = {k["id"]: k["is_active"] for k in client.get("/api/api-keys/", params=auth).json()}
+    assert not any(active[i] for i in ids) and all(active[k["id"]] for k in rotated)
+
+
+@pytest.mark.parametrize("operation", ["rotate", "revoke"])
+def test_bulk_operations_only_touch_own_keys(client, auth, operation):
+    ids = [k["id"] for k in bulk_create(client, auth, 2)]
+    other = signup(client)
+    response = client.post(f"/api/api-keys/bulk/{operation}", params=other, json={"key_ids": ids})
+    if operation == "rotate":
+        assert response.status_code == 404
+    else:
+        assert response.json() == {"revoked": 0}
+    assert all(k["is_active"] for k in client.get("/api/api-keys/", params=auth).json() if k["id"] in ids)
+
+
+def test_key_list_revalidates_against_the_database(client, auth):
+    key_id = client.post("/api/api-keys/", params=auth, json={"agent_id": "hunter", "name": "etag"}).json()["id"]
+    etag = client.get("/api/api-keys/", params=auth).headers["etag"]
+    assert client.get("/api/api-keys/", params=auth, headers={"If-None-Match": etag}).status_code == 304
+
+    db = SessionLocal()  # a revoke committed elsewhere (another worker) must not be hidden by a 304
+    try:
+        db.get(APIKey, key_id).is_active = False
+        db.commit()
+    finally:
+        db.close()
+    fresh = client.get("/api/api-keys/", params=auth, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["etag"] != etag
+
+
+def test_conditional_get_checks_the_caller_first(client):
+    stranger = {"authorization": "Bearer not-a-token"}
+    assert client.get("/api/subscriptions/", params=stranger, headers={"If-None-Match": "*"}).status_code == 401
@@ -0,0 +1,68 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from service_kit.load_shedding import AUTH, CRITICAL, LOW, NORMAL, LoadShedder, LoadSheddingMiddleware
+
+from app.config import get_settings
+
+settings = get_settings()
+paths = {"critical_paths": settings.load_shedding_critical_paths,
+         "auth_paths": settings.load_shedding_auth_paths,
+         "low_priority_paths": settings.load_shedding_low_priority_paths}
+
+
+def test_configured_priorities():
+    s = LoadShedder(**paths)
+    assert [s.priority(p) for p in ("/health", "/metrics", "/api/auth/login", "/api/api-keys/bulk",
+                                     "/api/subscriptions/")] == [CRITICAL, CRITICAL, AUTH, LOW, NORMAL]
+
+
+def test_auth_has_its_own_cap():
+    s = LoadShedder(auth_max_in_flight=2, **paths)
+    s.in_flight = 100  # far past the adaptive limit: normal traffic is shed, auth is not
+    s.observe(lag=1.0, threads_waiting=5)
+    assert not s.admit(NORMAL) and s.admit(AUTH)
+    s.auth_in_flight = 2
+    assert not s.admit(AUTH)
+
+
+app = FastAPI()
+app.add_middleware(LoadSheddingMiddleware, retry_after=2, auth_max_in_flight=1, **paths)
+
+
+@app.get("/block")
+async def block():
+    time.sleep(0.3)  # holds the event loop, as a CPU-bound handler would
+    return {}
+
+
+@app.post("/api/auth/login")
+async def login():
+    await asyncio.sleep(0.3)
+    return {}
+
+
+@app.post("/api/api-keys/bulk")
+async def bulk():
+    return []
+
+
+def test_overload_sheds_bulk_but_not_login():
+    with TestClient(app) as client:
+        assert client.post("/api/api-keys/bulk").status_code == 200
+        client.get("/block")
+        shed = client.post("/api/api-keys/bulk")
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "2"
+        assert client.post("/api/auth/login").status_code == 200
+
+
+def test_logins_past_the_auth_cap_are_shed():
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(1) as pool:
+            first = pool.submit(client.post, "/api/auth/login")
+            time.sleep(0.1)
+            assert client.post("/api/auth/login").status_code == 503
+            assert first.result().status_code == 200
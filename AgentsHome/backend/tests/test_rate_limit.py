@@ -0,0 +1,106 @@
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.database import SessionLocal
+from app.models import APIKey, Subscription
+from app import rate_limit
+from app.rate_limit import Limit, RateLimitMiddleware, TierCache, api_usage, gcra
+from app.services.sweeper import sweep
+
+LIMITS = {"anonymous": [60, 2], "free": [60, 3], "pro": [600, 5], "enterprise": [600, 5]}
+
+
+def limited_client(limits: dict = LIMITS) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limits=limits)
+    app.add_api_route("/ping", lambda: {"ok": True})
+    return TestClient(app)
+
+
+def test_gcra_allows_a_burst_then_refills_one_per_interval():
+    limit = Limit(per_minute=60, burst=3)
+    tat, allowed = 0.0, []
+    for _ in range(4):
+        decision, tat = gcra(tat, 100.0, limit)
+        allowed.append((decision.allowed, decision.remaining))
+    assert allowed == [(True, 2), (True, 1), (True, 0), (False, 0)]
+    assert decision.retry_after == 1.0
+    decision, tat = gcra(tat, 101.0, limit)  # one interval later: one more request
+    assert decision.allowed and decision.remaining == 0
+    decision, _ = gcra(tat, 200.0, limit)  # idle: full burst again
+    assert decision.allowed and decision.remaining == 2
+
+
+def test_limiter_rejects_with_retry_after_once_exhausted():
+    client = limited_client()
+    responses = [client.get("/ping") for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 200, 429]
+    assert responses[0].headers["x-ratelimit-limit"] == "60"
+    assert int(responses[2].headers["retry-after"]) >= 1
+
+
+def test_unknown_api_keys_share_the_caller_bucket():
+    client = limited_client()
+    statuses = [client.get("/ping", headers={"X-API-Key": f"sk_{uuid.uuid4().hex}"}).status_code
+                for _ in range(3)]
+    assert statuses == [200, 200, 429]  # a fresh key per request is not a fresh bucket
+
+
+def test_uncached_keys_are_charged_to_the_ip_before_the_db_lookup(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(rate_limit, "_lookup_api_key", lambda key_hash: lookups.append(key_hash))
+    client = limited_client({**LIMITS, "anonymous": [60, 10], "key_lookup": [60, 1]})
+    keys = [f"sk_{uuid.uuid4().hex}" for _ in range(3)]
+    statuses = [client.get("/ping", headers={"X-API-Key": k}).status_code for k in keys]
+    assert statuses == [200, 429, 429] and len(lookups) == 1
+    assert client.get("/ping", headers={"X-API-Key": keys[0]}).status_code == 200  # cached miss: no lookup
+    assert len(lookups) == 1
+
+
+def test_tier_cache_evicts_the_least_recently_used_user():
+    cache = TierCache(max_entries=2)
+    cache.set("a", "pro")
+    cache.set("b", "free")
+    cache.get("a")
+    cache.set("c", "enterprise")
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("pro", None, "enterprise")
+
+
+def test_verified_key_is_bucketed_and_counted_against_the_quota(client, auth):
+    subscription = client.post("/api/subscriptions/", params=auth,
+                               json={"agent_id": "hunter", "plan_tier": "pro"}).json()
+    key = client.post("/api/api-keys/", params=auth, json={"agent_id": "hunter", "name": "quota"}).json()["key"]
+    db = SessionLocal()
+    try:
+        db.execute(update(Subscription).where(Subscription.id == subscription["id"]).values(api_quota=4))
+        db.commit()
+    finally:
+        db.close()
+
+    limited = limited_client()
+    responses = [limited.get("/ping", headers={"X-API-Key": key}) for _ in range(5)]
+    assert [r.status_code for r in responses] == [200, 200, 200, 200, 429]
+    assert responses[-1].json() == {"detail": "Monthly API quota exceeded"}  # pro burst is 5: not the limiter
+
+    db = SessionLocal()
+    try:
+        assert sweep(db)["api_usage_flushed"] >= 1
+        assert db.get(Subscription, subscription["id"]).api_used == 4
+    finally:
+        db.close()
+    assert len(api_usage) == 0
+
+
+def test_verified_key_use_reaches_last_used_after_a_sweep(client, auth):
+    created = client.post("/api/api-keys/", params=auth, json={"agent_id": "hunter", "name": "used"}).json()
+    assert limited_client().get("/ping", headers={"X-API-Key": created["key"]}).status_code == 200
+
+    db = SessionLocal()
+    try:
+        assert sweep(db)["last_used_flushed"] >= 1
+        assert db.get(APIKey, created["id"]).last_used is not None
+    finally:
+        db.close()
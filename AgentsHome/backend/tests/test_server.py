@@ -0,0 +1,13 @@
+import pytest
+
+from app.config import get_settings
+from app.server import main
+
+
+def test_several_workers_need_shared_rate_limits(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "rate_limit_enabled", True)
+    monkeypatch.setattr(settings, "rate_limit_redis_url", None)
+    with pytest.raises(SystemExit) as exited:
+        main(["--workers", "2"])  # refused before anything is preloaded or bound
+    assert exited.value.code == 2
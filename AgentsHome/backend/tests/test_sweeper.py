@@ -0,0 +1,61 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import WORKER_INDEX_ENV
+from app.database import SessionLocal
+from app.models import APIKey, Subscription, User
+from app.rate_limit import last_used_buffer
+from app.services.sweeper import sweep
+
+NOW = datetime(2030, 1, 31)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def account(db):
+    """A user with an overdue active subscription, a cancelled one and an expired key"""
+    user = User(id=str(uuid.uuid4()), email=f"sweep-{uuid.uuid4().hex[:8]}@agentshome.com", name="Sweep")
+    active = Subscription(id=str(uuid.uuid4()), user_id=user.id, agent_id="hunter", status="active",
+                          api_used=700, renewal_date=NOW - timedelta(days=45))
+    cancelled = Subscription(id=str(uuid.uuid4()), user_id=user.id, agent_id="agent2", status="cancelled",
+                             renewal_date=NOW - timedelta(days=1))
+    key = APIKey(id=str(uuid.uuid4()), user_id=user.id, agent_id="hunter", key_hash=uuid.uuid4().hex,
+                 expires_at=NOW - timedelta(hours=1))
+    db.add_all([user, active, cancelled, key])
+    db.commit()
+    return active.id, cancelled.id, key.id
+
+
+def test_one_pass_renews_expires_and_deactivates(db, account):
+    active_id, cancelled_id, key_id = account
+    used_at = NOW - timedelta(minutes=5)
+    last_used_buffer.touch(key_id, used_at)
+
+    counts = sweep(db, now=NOW, batch_size=1)  # batches of one: the pass must loop until done
+    assert counts["renewed_subscriptions"] >= 1 and counts["expired_subscriptions"] >= 1
+    assert counts["expired_api_keys"] >= 1 and counts["last_used_flushed"] == 1
+
+    db.expire_all()
+    active = db.get(Subscription, active_id)
+    assert active.api_used == 0
+    assert active.renewal_date == NOW - timedelta(days=45) + timedelta(days=60)  # two periods: into the current one
+    assert db.get(Subscription, cancelled_id).status == "expired"
+    key = db.get(APIKey, key_id)
+    assert key.is_active is False and key.last_used == used_at
+
+    assert sweep(db, now=NOW)["renewed_subscriptions"] == 0  # nothing left in range
+
+
+def test_only_worker_zero_renews_and_expires(db, account, monkeypatch):
+    monkeypatch.setenv(WORKER_INDEX_ENV, "1")
+    assert set(sweep(db, now=NOW)) == {"api_usage_flushed", "last_used_flushed"}
+    db.expire_all()
+    assert db.get(Subscription, account[1]).status == "cancelled"
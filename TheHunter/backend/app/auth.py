@@ -0,0 +1,31 @@
+"""
+Caller identity for tenant-scoped routes.
+
+AgentsHome issues the access tokens (signed with the SECRET_KEY both
+services share); a token's subject, the AgentsHome user id, is the tenant
+whose leads the caller may read. The tenant never comes from the request
+parameters.
+"""
+from typing import Optional
+
+from fastapi import Header, HTTPException
+from jose import JWTError, jwt
+from service_kit.instrumentation import timed
+
+from app.config import settings
+
+
+def get_current_tenant(authorization: Optional[str] = Header(None)) -> str:
+    """Tenant id of the caller, from an `Authorization: Bearer <token>` header"""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    try:
+        with timed("jwt"):
+            payload = jwt.decode(authorization.split(" ", 1)[1], settings.SECRET_KEY,
+                                 algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    tenant_id = payload.get("sub")
+    if not tenant_id:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return tenant_id
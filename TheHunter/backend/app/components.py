@@ -0,0 +1,215 @@
+import json
+import logging
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.config import settings
+from app.executor import SingleFlight, make_key
+from app.leads import Lead, LeadBatch, to_batch
+
+logger = logging.getLogger(__name__)
+
+# Coalesces identical external calls (LLM expansion, data-source search, scoring)
+# issued concurrently by different recipe runs of the same tenant
+component_flight = SingleFlight()
+
+
+def component_key(tenant_id: str, component: str, config: Dict[str, Any], inputs: Any) -> str:
+    """Coalescing key for a component call: same tenant, component, config and inputs"""
+    return make_key("component", tenant_id, component, config, inputs)
+
+
+def call_component(tenant_id: str, component: str, config: Dict[str, Any], inputs: Any,
+                   fn: Callable[[], Any]) -> Any:
+    """
+    Invoke a component, sharing the result with identical calls already in
+    flight. Callers get the same result object and must not modify it.
+    """
+    return component_flight.do(component_key(tenant_id, component, config, inputs), fn)
+
+
+# ============= LEAD DISCOVERY (BATCHED LLM) =============
+
+LEADS_PER_QUERY = 5
+
+# A complete JSON string, or a brace, or a closing bracket, or the opening
+# quote of a string that has not fully arrived yet
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\]"]')
+# Between objects: the next one opens, or the array closes
+_NEXT = re.compile(r"[{\]]")
+# Where the array of objects opens; braces in the chatter before it are not leads
+_ARRAY_START = re.compile(r"\[\s*\{")
+
+
+class IncrementalJSONArrayParser:
+    """
+    Parse a streamed JSON array of objects, emitting each object as it closes.
+
+    Parsing starts at the first `[` followed by `{`, so braces in chatter the
+    model writes before the array cannot swallow the leads. Parsing stops at
+    the `]` that closes the array, so objects in chatter after it are not
+    leads either; commas and whitespace between objects are ignored.
+    Objects that fail to decode are counted in `errors` and skipped rather
+    than aborting the stream.
+    """
+
+    def __init__(self):
+        self._preamble = ""
+        self._started = False
+        self._buf = ""
+        self._pos = 0
+        self._depth = 0
+        self._done = False
+        self.errors = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of text and return the objects it completed"""
+        if self._done:
+            return []
+        if not self._started:
+            text = self._preamble + chunk
+            m = _ARRAY_START.search(text)
+            if m is None:
+                # keep a trailing "[" whose "{" may still be on its way
+                bracket = text.rfind("[")
+                self._preamble = text[bracket:] if bracket >= 0 and not text[bracket + 1:].strip() else ""
+                return []
+            self._started = True
+            self._preamble = ""
+            chunk = text[m.end() - 1:]
+        elif not self._buf:
+            m = _NEXT.search(chunk)
+            if m is None:
+                return []
+            if m.group() == "]":
+                self._done = True
+                return []
+            chunk = chunk[m.start():]
+        buf = self._buf = self._buf + chunk
+        out = []
+        pos = self._pos
+        depth = self._depth
+        obj_start = 0
+        search = _TOKEN.search
+        while True:
+            m = search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            token = m.group()
+            if token == '"':
+                # string still streaming in; rescan it once more text arrives
+                pos = m.start()
+                break
+            pos = m.end()
+            if token == "{":
+                if depth == 0:
+                    obj_start = m.start()
+                depth += 1
+            elif token == "}" and depth:
+                depth -= 1
+                if depth == 0:
+                    try:
+                        out.append(json.loads(buf[obj_start:pos]))
+                    except ValueError:
+                        self.errors += 1
+                    obj_start = pos
+            elif token == "]" and depth == 0:
+                self._done = True
+                break
+
+        self._depth = depth
+        if depth:
+            # keep only the unfinished object
+            self._buf = buf[obj_start:]
+            self._pos = pos - obj_start
+        else:
+            self._buf = ""
+            self._pos = 0
+        return out
+
+
+def build_lead_prompt(queries: List[str], per_query: int = LEADS_PER_QUERY) -> str:
+    """Single prompt asking for leads for several expanded queries at once"""
+    numbered = "\n".join(f'{i}. "{q}"' for i, q in enumerate(queries))
+    return (
+        f"Generate {per_query} realistic professional leads for EACH of these search queries:\n"
+        f"{numbered}\n\n"
+        "Return ONLY a valid JSON array. Each element is one lead object with:\n"
+        '- "query_index": the number of the query it matches\n'
+        '- "name", "email", "company", "title", "industry", "location"\n'
+        '- "engagement_score" between 0.5 and 0.95\n\n'
+        "Generate ONLY the JSON, nothing else"
+    )
+
+
+def _enrich_lead(lead: Dict[str, Any], queries: List[str]) -> Dict[str, Any]:
+    index = lead.pop("query_index", None)
+    if isinstance(index, int) and 0 <= index < len(queries):
+        lead["query"] = queries[index]
+    lead.setdefault("engagement_score", 0.5)
+    lead.setdefault("source", "ai_search")
+    return lead
+
+
+def discover_leads_batched(client: Any, queries: List[str], per_query: int = LEADS_PER_QUERY,
+                           batch_size: Optional[int] = None) -> Iterator[Lead]:
+    """
+    Generate leads for many expanded queries with one streamed LLM call per batch.
+
+    Leads are yielded as soon as each JSON object closes in the stream, so
+    downstream stages (dedup, scoring) can start before the completion ends.
+    `client` is a Groq (or OpenAI-compatible) client.
+    """
+    batch_size = batch_size or settings.LLM_QUERY_BATCH_SIZE
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start:start + batch_size]
+        parser = IncrementalJSONArrayParser()
+        stream = client.chat.completions.create(
+            model=settings.GROQ_MODEL,
+            messages=[{"role": "user", "content": build_lead_prompt(batch, per_query)}],
+            temperature=0.7,
+            max_tokens=min(8000, 400 * per_query * len(batch)),
+            stream=True,
+        )
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            for lead in parser.feed(delta):
+                yield Lead.from_dict(_enrich_lead(lead, batch))
+        if parser.errors:
+            logger.warning("Skipped %d malformed leads", parser.errors)
+
+
+# ============= DEDUPLICATION & SCORING =============
+
+def deduplicate_leads(leads: Iterable[Any]) -> List[Lead]:
+    """Keep the first lead per normalized email (or company + location)"""
+    seen = set()
+    unique = []
+    for lead in leads:
+        if not isinstance(lead, Lead):
+            lead = Lead.from_dict(lead)
+        key = lead.dedup_key
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(lead)
+    return unique
+
+
+def score_leads(leads: Iterable[Any], predict_proba: Callable[[Any], Any],
+                criteria: Optional[Dict[str, str]] = None) -> LeadBatch:
+    """
+    Score a batch in one call to the model.
+
+    `predict_proba` receives the (n, 10) feature matrix and returns the
+    conversion probability per row; results are stored on the batch in place.
+    """
+    from app.ml.feature_extractor import extract_feature_matrix
+
+    batch = to_batch(leads)
+    if len(batch):
+        batch.set_scores(predict_proba(extract_feature_matrix(batch, criteria)))
+    return batch
@@ -2,11 +2,14 @@ from pydantic_settings import BaseSettings
 from typing import Optional
 import os
 
+WORKER_INDEX_ENV = "SERVER_WORKER_INDEX"  # set by app.server in each worker; process-wide jobs run only in worker 0
+
 class Settings(BaseSettings):
     # App
     APP_NAME: str = "The Hunter API"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = False
+    FAST_JSON: bool = False  # orjson responses; list endpoints skip response_model re-validation
     
     # Database - use environment variable if available, fallback to SQLite
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./hunter.db")
@@ -16,6 +19,62 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # LLM lead discovery
+    GROQ_MODEL: str = "llama-3.3-70b-versatile"
+    LLM_QUERY_BATCH_SIZE: int = 4  # Expanded queries packed into one LLM call
+    
+    # Recipe runs: step outputs are cached and runs checkpointed under STEP_CACHE_DIR
+    STEP_CACHE_DIR: str = ".cache/steps"
+    STEP_CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    SCORER_MODEL_PATH: Optional[str] = None  # CompiledForest .npz; unset scores by engagement
+    
+    # Data sources (app/services/data_source.py): live | record | replay against CASSETTE_DIR
+    DATA_SOURCE_MODE: str = "live"
+    CASSETTE_DIR: str = "cassettes"
+    REPLAY_LATENCY_SCALE: float = 1.0  # recorded latency multiplier; 0 replays instantly
+    REPLAY_ERROR_RATE: float = 0.0  # share of replayed calls that fail
+    REPLAY_SEED: int = 0
+    
+    # Recipe job scheduling (app/queue.py): weights and per-tenant caps by plan_tier
+    QUEUE_TIER_WEIGHTS: dict = {"free": 1.0, "pro": 4.0, "enterprise": 16.0}
+    QUEUE_TENANT_CONCURRENCY: dict = {"free": 2, "pro": 8, "enterprise": 16}
+    QUEUE_SOURCE_CONCURRENCY: dict = {"linkedin": 2, "google_maps": 4, "yelp": 4}  # unlisted: uncapped
+    QUEUE_INTERACTIVE_RESERVED_SLOTS: int = 1  # per capped source, unavailable to batch jobs
+    QUEUE_INTERACTIVE_DEADLINE_SECONDS: float = 30.0
+    QUEUE_URGENT_SLACK_SECONDS: float = 5.0  # jobs this close to their deadline skip fair order
+    
+    # Geocoding (offline gazetteer CSV; defaults to app/data/gazetteer.csv)
+    GAZETTEER_PATH: Optional[str] = None
+    
+    # Pre-fork server (app/server.py)
+    SERVER_WORKERS: int = 1  # more is opt-in (caches and /metrics are per worker); 0 = one per CPU
+    SERVER_MEMORY_REPORT_SECONDS: float = 60.0  # per-worker RSS/PSS log interval; 0 = startup only
+    
+    # HTTP
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses go out uncompressed
+    ETAG_CACHE_TTL_SECONDS: float = 30.0  # how long a 304 may be served without a DB read
+    ETAG_CACHE_MAX_ENTRIES: int = 10000  # LRU cap across all owners and pages
+    
+    # Instrumentation
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None  # bearer token for /metrics; unset = loopback clients only
+    INSTRUMENTATION_SAMPLE_RATE: float = 0.1  # share of requests with DB counting, Server-Timing and logs
+    N_PLUS_ONE_THRESHOLD: int = 5  # same statement this many times in one request gets flagged
+    
+    # Load shedding (service_kit.load_shedding): critical routes are never shed, low-priority ones first
+    LOAD_SHEDDING_ENABLED: bool = True
+    LOAD_SHEDDING_TARGET_LAG_SECONDS: float = 0.05  # event-loop lag above this counts as overload
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = 200
+    LOAD_SHEDDING_MIN_IN_FLIGHT: int = 8
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = 1
+    LOAD_SHEDDING_CRITICAL_PATHS: list = ["/api/health", "/api/v1/calculator/health", "/metrics"]
+    LOAD_SHEDDING_AUTH_PATHS: list = ["/api/auth/"]  # never shed with other routes, but capped on their own
+    LOAD_SHEDDING_AUTH_MAX_IN_FLIGHT: int = 8
+    LOAD_SHEDDING_LOW_PRIORITY_PATHS: list = ["/api/v1/calculator/history"]
+    
+    # Admin endpoints (/api/admin/*) are disabled unless a token is set
+    ADMIN_TOKEN: Optional[str] = None
+    
     # CORS - Allow all origins for now (dev mode)
     # In production, restrict to specific domains
     ALLOWED_ORIGINS: list = [
@@ -0,0 +1,299 @@
+import asyncio
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable coalescing key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _Call:
+    """A single in-flight execution shared by every waiter"""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical work.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is still running wait for that execution and receive the same result (or
+    exception). Nothing is cached once the call completes, so the next caller
+    after completion triggers a fresh execution.
+
+    Every waiter receives the very object the leader's call returned, not a
+    copy: callers must treat shared results as read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # Per event loop: a future can only be awaited from the loop it belongs to
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = \
+            weakref.WeakKeyDictionary()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once per key among concurrent threads and share the result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.event.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the coroutine factory once per key among concurrent tasks of this event loop"""
+        with self._lock:
+            tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        future = tasks.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            tasks[key] = future
+            future.add_done_callback(lambda _f, k=key: tasks.pop(k, None))
+        # shield so one cancelled waiter does not cancel the shared execution
+        return await asyncio.shield(future)
+
+    def in_flight(self) -> int:
+        """Number of keys currently executing"""
+        with self._lock:
+            return len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+
+
+# Shared by all recipe runs in this process
+recipe_flight = SingleFlight()
+
+
+def recipe_key(tenant_id: str, recipe_id: str, inputs: Dict[str, Any], run_id: Optional[str] = None) -> str:
+    """
+    Coalescing key for a recipe run: same tenant, recipe and inputs, and the
+    same run_id when one is given. Runs with different run_ids never share a
+    flight, since only the run that executes writes its checkpoint.
+    """
+    if run_id is None:
+        return make_key("recipe", tenant_id, recipe_id, inputs)
+    return make_key("recipe", tenant_id, recipe_id, inputs, run_id)
+
+
+def run_recipe_coalesced(tenant_id: str, recipe_id: str, inputs: Dict[str, Any],
+                         run: Callable[[], Any], run_id: Optional[str] = None) -> Any:
+    """Execute a recipe run, sharing it with identical runs already in flight"""
+    return recipe_flight.do(recipe_key(tenant_id, recipe_id, inputs, run_id), run)
+
+
+async def run_recipe_coalesced_async(tenant_id: str, recipe_id: str, inputs: Dict[str, Any],
+                                     run: Callable[[], Awaitable[Any]], run_id: Optional[str] = None) -> Any:
+    """Async variant of run_recipe_coalesced"""
+    return await recipe_flight.do_async(recipe_key(tenant_id, recipe_id, inputs, run_id), run)
+
+
+# ============= STEP CACHE & CHECKPOINTS =============
+
+def _write_atomic(path: str, data: bytes):
+    """Write via a temp file + rename so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class StepCache:
+    """
+    Content-addressed store of recipe step outputs on local disk.
+
+    - blobs/<digest>: a pickled output, named by the sha256 of its bytes
+    - actions/<key>: the digest produced by a step key (component + config +
+      input digest)
+
+    Chaining steps by output digest means a step whose upstream produced the
+    same output as last time is a hit even if the upstream itself re-ran.
+    Entries older than `ttl_seconds` count as misses and are removed by prune(),
+    along with run checkpoints (runs/) that have not been written for as long.
+    Outputs are pickled, so the directory must only be writable by the worker.
+    """
+
+    def __init__(self, root: str, ttl_seconds: float = 7 * 24 * 3600):
+        self.root = root
+        self.ttl_seconds = ttl_seconds
+
+    def _path(self, kind: str, name: str) -> str:
+        return os.path.join(self.root, kind, name[:2], name)
+
+    def _fresh(self, path: str) -> bool:
+        try:
+            return time.time() - os.path.getmtime(path) <= self.ttl_seconds
+        except OSError:
+            return False
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Output digest recorded for a step key, if it and its blob are still fresh"""
+        path = self._path("actions", key)
+        if not self._fresh(path):
+            return None
+        with open(path) as f:
+            digest = f.read().strip()
+        return digest if self._fresh(self._path("blobs", digest)) else None
+
+    def record(self, key: str, digest: str):
+        _write_atomic(self._path("actions", key), digest.encode())
+
+    def put(self, value: Any) -> str:
+        """Store an output and return its digest (an existing identical blob is reused)"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path("blobs", digest)
+        if os.path.exists(path):
+            os.utime(path)  # refresh for TTL/prune
+        else:
+            _write_atomic(path, data)
+        return digest
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self._path("blobs", digest))
+
+    def load(self, digest: str) -> Any:
+        with open(self._path("blobs", digest), "rb") as f:
+            return pickle.load(f)
+
+    def prune(self) -> int:
+        """Delete expired actions, blobs and run checkpoints; returns how many files were removed"""
+        removed = 0
+        for kind in ("actions", "blobs", "runs"):
+            for dirpath, _, filenames in os.walk(os.path.join(self.root, kind)):
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    if not self._fresh(path):
+                        try:
+                            os.unlink(path)
+                            removed += 1
+                        except OSError:
+                            pass
+        return removed
+
+
+class RunCheckpoint:
+    """
+    Steps completed by one recipe run, persisted after every step.
+
+    A retried run skips every checkpointed step whose key is unchanged, even
+    steps that are not cacheable across runs (live discovery, for example).
+    """
+
+    def __init__(self, root: str, run_id: str):
+        self.path = os.path.join(root, "runs", f"{hashlib.sha256(run_id.encode()).hexdigest()}.json")
+        self.steps: List[Dict[str, str]] = []
+        self.done = False
+        try:
+            with open(self.path) as f:
+                state = json.load(f)
+            self.steps, self.done = state["steps"], state["done"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def completed(self, index: int, key: str) -> Optional[str]:
+        """Output digest if step `index` already finished with this key"""
+        if index < len(self.steps) and self.steps[index]["key"] == key:
+            return self.steps[index]["digest"]
+        return None
+
+    def save(self, index: int, name: str, key: str, digest: str, done: bool = False):
+        del self.steps[index:]  # anything after a changed step is stale
+        self.steps.append({"step": name, "key": key, "digest": digest})
+        self.done = done
+        _write_atomic(self.path, json.dumps({"steps": self.steps, "done": done}).encode())
+
+
+class Step(NamedTuple):
+    """One recipe step: fn(previous output) -> output"""
+    name: str
+    component: str
+    config: Dict[str, Any]
+    fn: Callable[[Any], Any]
+    cacheable: bool = True  # False: reused only when resuming the same run
+
+
+class RunResult(NamedTuple):
+    output: Any
+    executed: List[str]  # steps that actually ran
+    cached: List[str]    # steps served from the step cache
+    resumed: List[str]   # steps skipped thanks to this run's checkpoint
+
+
+def step_key(tenant_id: str, step: Step, input_digest: str) -> str:
+    return make_key("step", tenant_id, step.component, step.config, input_digest)
+
+
+def run_steps(tenant_id: str, run_id: str, steps: List[Step], inputs: Any, cache: StepCache) -> RunResult:
+    """
+    Run steps in order, each fed the previous output.
+
+    Before a step runs, this run's checkpoint and then the shared step cache
+    are consulted; an output is only loaded from disk when the next step
+    actually has to execute (or at the end), so an unchanged re-run reads
+    a few small files and one blob.
+    """
+    checkpoint = RunCheckpoint(cache.root, run_id)
+    value, value_digest = inputs, make_key("inputs", inputs)
+    loaded = True  # whether `value` holds the output named by value_digest
+    executed, cached, resumed = [], [], []
+
+    for index, step in enumerate(steps):
+        key = step_key(tenant_id, step, value_digest)
+        last = index == len(steps) - 1
+        digest = checkpoint.completed(index, key)
+        if digest is not None and cache.has(digest):
+            resumed.append(step.name)
+        elif step.cacheable and (digest := cache.lookup(key)) is not None:
+            cached.append(step.name)
+            checkpoint.save(index, step.name, key, digest, done=last)
+        else:
+            if not loaded:
+                value = cache.load(value_digest)
+            value = step.fn(value)
+            digest = cache.put(value)
+            if step.cacheable:
+                cache.record(key, digest)
+            checkpoint.save(index, step.name, key, digest, done=last)
+            executed.append(step.name)
+            value_digest, loaded = digest, True
+            continue
+        value_digest, loaded = digest, False
+
+    if not loaded:
+        value = cache.load(value_digest)
+    return RunResult(value, executed, cached, resumed)
@@ -0,0 +1,305 @@
+"""
+Offline geocoding and geohash grid indexing for lead locations.
+
+- Gazetteer / Geocoder: free-text locations ("Viman Nagar, Pune, India")
+  resolved against a bundled CSV of places, cached per distinct string.
+- Geohash helpers: cells covering a bounding box or radius, so radius and
+  bbox searches become prefix range lookups on an indexed geohash column
+  (or on GeoIndex in memory) followed by an exact distance check.
+- location_score: numeric location match (distance decay outside the wanted
+  place's extent) used by the feature extractor.
+"""
+import csv
+import math
+import os
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+DEFAULT_GAZETTEER = os.path.join(os.path.dirname(__file__), "data", "gazetteer.csv")
+
+STORED_PRECISION = 9  # ~5m cells; any shorter prefix is a coarser cell
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+_SEPARATORS = re.compile(r"[^\w]+")
+
+
+# ============= DISTANCE =============
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bboxes(lat: float, lon: float, radius_km: float) -> List[Tuple[float, float, float, float]]:
+    """
+    (min_lat, min_lon, max_lat, max_lon) boxes enclosing a circle, clamped at
+    the poles. A circle crossing the antimeridian gets one box on each side;
+    one reaching a pole spans every longitude.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+    min_lat, max_lat = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if dlon >= 180.0 or lat + dlat >= 90.0 or lat - dlat <= -90.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    west, east = lon - dlon, lon + dlon
+    if west < -180.0:
+        return [(min_lat, west + 360.0, max_lat, 180.0), (min_lat, -180.0, max_lat, east)]
+    if east > 180.0:
+        return [(min_lat, west, max_lat, 180.0), (min_lat, -180.0, max_lat, east - 360.0)]
+    return [(min_lat, west, max_lat, east)]
+
+
+# ============= GEOHASH =============
+
+def geohash_encode(lat: float, lon: float, precision: int = STORED_PRECISION) -> str:
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value, lon_lo = value * 2 + 1, mid
+            else:
+                value, lon_hi = value * 2, mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value, lat_lo = value * 2 + 1, mid
+            else:
+                value, lat_hi = value * 2, mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_decode(geohash: str) -> Tuple[float, float]:
+    """Center (lat, lon) of a cell"""
+    lat_lo, lat_hi, lon_lo, lon_hi = -90.0, 90.0, -180.0, 180.0
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                lon_lo, lon_hi = (mid, lon_hi) if bit else (lon_lo, mid)
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                lat_lo, lat_hi = (mid, lat_hi) if bit else (lat_lo, mid)
+            even = not even
+    return (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """(lat degrees, lon degrees) of one cell at a precision"""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def bbox_cells(min_lat: float, min_lon: float, max_lat: float, max_lon: float,
+               max_cells: int = 32) -> Set[str]:
+    """
+    Geohash cells covering a bounding box, at the finest precision that needs
+    no more than `max_cells` cells (fewer, coarser cells = fewer range scans,
+    more candidates to filter).
+    """
+    precision = 1
+    for p in range(STORED_PRECISION, 0, -1):
+        dlat, dlon = cell_size(p)
+        if (math.floor(max_lat / dlat) - math.floor(min_lat / dlat) + 1) * \
+                (math.floor(max_lon / dlon) - math.floor(min_lon / dlon) + 1) <= max_cells:
+            precision = p
+            break
+    dlat, dlon = cell_size(precision)
+    cells = set()
+    # Stepping one cell size from the min corner lands in each successive cell exactly once
+    n_lat = math.floor(max_lat / dlat) - math.floor(min_lat / dlat) + 1
+    n_lon = math.floor(max_lon / dlon) - math.floor(min_lon / dlon) + 1
+    for i in range(n_lat):
+        lat = min(min_lat + i * dlat, max_lat)
+        for j in range(n_lon):
+            cells.add(geohash_encode(lat, min(min_lon + j * dlon, max_lon), precision))
+    return cells
+
+
+def radius_cells(lat: float, lon: float, radius_km: float, max_cells: int = 32) -> Set[str]:
+    return set().union(*(bbox_cells(*box, max_cells=max_cells) for box in radius_bboxes(lat, lon, radius_km)))
+
+
+# ============= IN-MEMORY INDEX =============
+
+class GeoIndex:
+    """
+    Points kept sorted by geohash; a query scans only the prefix ranges of the
+    cells covering its area, then checks exact distance/containment.
+    """
+
+    def __init__(self, points: Iterable[Tuple[Any, float, float]] = ()):
+        self._entries: List[Tuple[str, float, float, Any]] = sorted(
+            (geohash_encode(lat, lon), lat, lon, item) for item, lat, lon in points
+        )
+        self._hashes = [e[0] for e in self._entries]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, item: Any, lat: float, lon: float):
+        geohash = geohash_encode(lat, lon)
+        index = bisect_left(self._hashes, geohash)
+        self._hashes.insert(index, geohash)
+        self._entries.insert(index, (geohash, lat, lon, item))
+
+    def _candidates(self, cells: Set[str]) -> Iterable[Tuple[str, float, float, Any]]:
+        for cell in cells:
+            start = bisect_left(self._hashes, cell)
+            end = bisect_left(self._hashes, cell + "~", start)
+            yield from self._entries[start:end]
+
+    def within_bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[Any]:
+        return [
+            item for _, lat, lon, item in self._candidates(bbox_cells(min_lat, min_lon, max_lat, max_lon))
+            if min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+        ]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Any, float]]:
+        """(item, distance km) within the radius, nearest first"""
+        found = []
+        for _, p_lat, p_lon, item in self._candidates(radius_cells(lat, lon, radius_km)):
+            distance = haversine_km(lat, lon, p_lat, p_lon)
+            if distance <= radius_km:
+                found.append((item, distance))
+        found.sort(key=lambda pair: pair[1])
+        return found
+
+
+# ============= GAZETTEER / GEOCODER =============
+
+class Place(NamedTuple):
+    name: str
+    parent: str
+    lat: float
+    lon: float
+    radius_km: float
+
+    @property
+    def geohash(self) -> str:
+        return _place_geohash(self.lat, self.lon)
+
+
+@lru_cache(maxsize=4096)
+def _place_geohash(lat: float, lon: float) -> str:
+    return geohash_encode(lat, lon)  # places repeat on every lead stored there
+
+
+def _normalize(text: str) -> str:
+    return " ".join(_SEPARATORS.sub(" ", text.lower()).split())
+
+
+class Gazetteer:
+    """Place names (normalized) to places; neighbourhoods carry their parent city"""
+
+    MAX_NAME_WORDS = 4
+
+    def __init__(self, places: Iterable[Place]):
+        self._by_name: Dict[str, List[Place]] = {}
+        for place in places:
+            self._by_name.setdefault(place.name, []).append(place)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_GAZETTEER) -> "Gazetteer":
+        with open(path, newline="") as f:
+            rows = csv.DictReader(line for line in f if not line.startswith("#"))
+            return cls(
+                Place(_normalize(r["name"]), _normalize(r["parent"] or ""), float(r["lat"]),
+                      float(r["lon"]), float(r["radius_km"]))
+                for r in rows
+            )
+
+    def lookup(self, location: str) -> Optional[Place]:
+        """
+        Most specific place named in a free-text location. A neighbourhood
+        wins when its city is also named, then a city, then a neighbourhood
+        named on its own.
+        """
+        words = _normalize(location).split()
+        if not words:
+            return None
+        matched: List[Place] = []
+        for n in range(min(self.MAX_NAME_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                matched.extend(self._by_name.get(" ".join(words[i:i + n]), ()))
+        if not matched:
+            return None
+        names = {p.name for p in matched}
+
+        def rank(place: Place) -> int:
+            if place.parent and place.parent in names:
+                return 3
+            return 1 if place.parent else 2
+
+        return max(matched, key=rank)
+
+
+class Geocoder:
+    """Gazetteer lookups cached per distinct location string (locations are heavily repeated)"""
+
+    MAX_CACHE = 100_000
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+        self._cache: Dict[str, Optional[Place]] = {}
+        self._lock = threading.Lock()
+
+    def geocode(self, location: Optional[str]) -> Optional[Place]:
+        if not location:
+            return None
+        try:
+            return self._cache[location]
+        except KeyError:
+            pass
+        place = self.gazetteer.lookup(location)
+        with self._lock:
+            if len(self._cache) >= self.MAX_CACHE:
+                self._cache.clear()
+            self._cache[location] = place
+        return place
+
+
+@lru_cache()
+def get_geocoder() -> Geocoder:
+    from app.config import settings
+    return Geocoder(Gazetteer.load(settings.GAZETTEER_PATH or DEFAULT_GAZETTEER))
+
+
+def location_score(place: Place, wanted: Place, decay_km: float = 5.0) -> float:
+    """1.0 inside the wanted place's extent, decaying exponentially with distance beyond it"""
+    distance = haversine_km(place.lat, place.lon, wanted.lat, wanted.lon)
+    overshoot = distance - wanted.radius_km
+    return 1.0 if overshoot <= 0 else math.exp(-overshoot / decay_km)
+
+
+def location_scores(locations: Iterable[str], wanted: str, decay_km: float = 5.0) -> Dict[str, Optional[float]]:
+    """
+    Numeric location match for many distinct locations at once; None where
+    either side is not in the gazetteer (callers fall back to token matching).
+    """
+    geocoder = get_geocoder()
+    target = geocoder.geocode(wanted)
+    scores: Dict[str, Optional[float]] = {}
+    for location in locations:
+        place = geocoder.geocode(location) if target is not None else None
+        scores[location] = None if place is None else location_score(place, target, decay_km)
+    return scores
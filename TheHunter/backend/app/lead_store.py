@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import DateTime, JSON, bindparam, func, or_, text
+from sqlalchemy.orm import Session
+
+from app.geo import bbox_cells, get_geocoder, haversine_km, radius_cells
+from app.leads import Lead, to_records
+from app.models import LeadRecord
+
+COLUMNS = ("tenant_id", "dedup_key", "name", "email", "company", "title", "industry", "location",
+           "source", "query", "engagement_score", "conversion_probability", "extra",
+           "latitude", "longitude", "geohash", "discovered_at", "updated_at")
+
+# Fields a re-discovery may leave blank; a blank never overwrites a known value
+_FILL_FIELDS = ("name", "email", "company", "title", "industry", "location", "query")
+
+_EMPTY_KEY = "|"  # dedup key of a lead with no email, company or location
+
+_MERGE = ", ".join(
+    [f"{f} = COALESCE(NULLIF(excluded.{f}, ''), leads.{f})" for f in _FILL_FIELDS] + [
+        "source = excluded.source",
+        "engagement_score = excluded.engagement_score",
+        "conversion_probability = COALESCE(excluded.conversion_probability, leads.conversion_probability)",
+        "extra = COALESCE(excluded.extra, leads.extra)",
+        # Coordinates follow the location: replaced whenever the run brought a location
+        *[f"{f} = CASE WHEN excluded.location <> '' THEN excluded.{f} ELSE leads.{f} END"
+          for f in ("latitude", "longitude", "geohash")],
+        "updated_at = excluded.updated_at",
+    ]
+)
+_ON_CONFLICT = f"ON CONFLICT (tenant_id, dedup_key) DO UPDATE SET {_MERGE}"
+
+_UPSERT_VALUES = text(
+    f"INSERT INTO leads ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)}) {_ON_CONFLICT}"
+).bindparams(
+    bindparam("extra", type_=JSON(none_as_null=True)),
+    bindparam("discovered_at", type_=DateTime),
+    bindparam("updated_at", type_=DateTime),
+)
+
+
+def lead_rows(tenant_id: str, leads: Iterable[Any], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """One row per dedup key (later leads win); leads without any identity are dropped"""
+    now = now or datetime.utcnow()
+    geocoder = get_geocoder()
+    rows: Dict[str, Dict[str, Any]] = {}
+    for lead in to_records(leads):
+        key = lead.dedup_key
+        if key == _EMPTY_KEY:
+            continue
+        place = geocoder.geocode(lead.location)
+        rows[key] = {
+            "tenant_id": tenant_id, "dedup_key": key,
+            "name": lead.name, "email": lead.email, "company": lead.company, "title": lead.title,
+            "industry": lead.industry, "location": lead.location, "source": lead.source,
+            "query": lead.query, "engagement_score": lead.engagement_score,
+            "conversion_probability": lead.conversion_probability,
+            "extra": lead.extra, "discovered_at": now, "updated_at": now,
+            "latitude": place.lat if place else None,
+            "longitude": place.lon if place else None,
+            "geohash": place.geohash if place else None,
+        }
+    return list(rows.values())
+
+
+def _upsert_executemany(db: Session, rows: List[Dict[str, Any]], batch_size: int):
+    """INSERT ... ON CONFLICT DO UPDATE through executemany, batch_size rows per call"""
+    for start in range(0, len(rows), batch_size):
+        db.execute(_UPSERT_VALUES, rows[start:start + batch_size])
+
+
+def _upsert_copy(db: Session, rows: List[Dict[str, Any]], batch_size: int):
+    """
+    COPY into a temp staging table, then one INSERT ... SELECT ... ON CONFLICT.
+
+    COPY streams batch_size rows of CSV at a time, so memory stays bounded
+    while Postgres does the merge set-wise instead of once per row.
+    """
+    cursor = db.connection().connection.cursor()
+    columns = ", ".join(COLUMNS)
+    cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS leads_stage ON COMMIT DELETE ROWS "
+                   f"AS SELECT {columns} FROM leads WITH NO DATA")
+    cursor.execute("TRUNCATE leads_stage")
+    for start in range(0, len(rows), batch_size):
+        buffer = io.StringIO()
+        # QUOTE_NONNUMERIC writes '' as "" (empty string) and None as a bare empty field (NULL)
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NONNUMERIC)
+        for row in rows[start:start + batch_size]:
+            writer.writerow([
+                json.dumps(row[c]) if c == "extra" and row[c] is not None else row[c] for c in COLUMNS
+            ])
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY leads_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.execute(f"INSERT INTO leads ({columns}) SELECT {columns} FROM leads_stage {_ON_CONFLICT}")
+
+
+def upsert_leads(db: Session, tenant_id: str, leads: Iterable[Any], batch_size: int = 5000,
+                 now: Optional[datetime] = None) -> int:
+    """
+    Insert or merge a run's leads for a tenant in one transaction, keyed on
+    Lead.dedup_key. Postgres uses COPY + ON CONFLICT; other backends (SQLite)
+    use batched executemany upserts. Returns the number of rows written.
+    """
+    return _write_rows(db, lead_rows(tenant_id, leads, now), batch_size)
+
+
+def upsert_lead_groups(db: Session, groups: Iterable[Tuple[str, Iterable[Any]]], batch_size: int = 5000,
+                       now: Optional[datetime] = None) -> int:
+    """
+    upsert_leads for several (tenant_id, leads) groups in one transaction (bulk
+    loads). A tenant may appear in several groups; rows are deduped on
+    (tenant_id, dedup_key) across all of them, later rows winning, since one
+    INSERT ... ON CONFLICT cannot update the same row twice.
+    """
+    rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for tenant_id, leads in groups:
+        for row in lead_rows(tenant_id, leads, now):
+            rows[(tenant_id, row["dedup_key"])] = row
+    return _write_rows(db, list(rows.values()), batch_size)
+
+
+def _write_rows(db: Session, rows: List[Dict[str, Any]], batch_size: int) -> int:
+    if not rows:
+        return 0
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            _upsert_copy(db, rows, batch_size)
+        else:
+            _upsert_executemany(db, rows, batch_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
+
+
+def load_leads(db: Session, tenant_id: str, order: str = "recent", limit: int = 100,
+               offset: int = 0) -> List[Lead]:
+    """A tenant's leads, newest first ("recent") or best scored first ("score")"""
+    query = db.query(LeadRecord).filter(LeadRecord.tenant_id == tenant_id)
+    if order == "score":
+        query = query.order_by(LeadRecord.conversion_probability.desc().nulls_last(), LeadRecord.id)
+    else:
+        query = query.order_by(LeadRecord.discovered_at.desc(), LeadRecord.id)
+    return [_to_lead(r) for r in query.offset(offset).limit(limit)]
+
+
+def _to_lead(r: LeadRecord) -> Lead:
+    return Lead(
+        name=r.name, email=r.email, company=r.company, title=r.title, industry=r.industry,
+        location=r.location, source=r.source, query=r.query, engagement_score=r.engagement_score,
+        conversion_probability=r.conversion_probability, extra=r.extra,
+    )
+
+
+def _in_cells(db: Session, tenant_id: str, cells: Set[str], industry: Optional[str]):
+    """
+    Tenant's leads in the given geohash cells: one indexed prefix scan per cell.
+    A prefix LIKE, not a >= / < range: the text_pattern_ops index serves LIKE
+    under any collation, and a range's upper bound sorts differently per collation.
+    """
+    query = db.query(LeadRecord).filter(
+        LeadRecord.tenant_id == tenant_id,
+        or_(*[LeadRecord.geohash.like(cell + "%") for cell in cells]),  # base32 has no LIKE wildcards
+    )
+    if industry:
+        query = query.filter(func.lower(LeadRecord.industry).contains(industry.lower()))
+    return query
+
+
+def leads_within_radius(db: Session, tenant_id: str, lat: float, lon: float, radius_km: float,
+                        industry: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[Lead, float]]:
+    """(lead, distance km) within radius_km of a point, nearest first"""
+    found = []
+    for r in _in_cells(db, tenant_id, radius_cells(lat, lon, radius_km), industry):
+        distance = haversine_km(lat, lon, r.latitude, r.longitude)
+        if distance <= radius_km:
+            found.append((_to_lead(r), distance))
+    found.sort(key=lambda pair: pair[1])
+    return found[:limit] if limit else found
+
+
+def leads_within_bbox(db: Session, tenant_id: str, min_lat: float, min_lon: float, max_lat: float,
+                      max_lon: float, industry: Optional[str] = None) -> List[Lead]:
+    return [
+        _to_lead(r) for r in _in_cells(db, tenant_id, bbox_cells(min_lat, min_lon, max_lat, max_lon), industry)
+        if min_lat <= r.latitude <= max_lat and min_lon <= r.longitude <= max_lon
+    ]
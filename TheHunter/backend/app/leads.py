@@ -0,0 +1,180 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_intern = sys.intern
+
+# Columns that hold a small set of repeated values; interned so 100k leads
+# share one string object per distinct industry/location/source
+INTERNED_FIELDS = ("industry", "location", "source", "title")
+
+_CORE_FIELDS = ("name", "email", "company", "title", "industry", "location", "source", "query")
+
+
+def _norm(value: Optional[str]) -> str:
+    return " ".join(value.lower().split()) if value else ""
+
+
+@dataclass(slots=True)
+class Lead:
+    """Compact lead record passed between pipeline stages"""
+
+    name: str = ""
+    email: str = ""
+    company: str = ""
+    title: str = ""
+    industry: str = ""
+    location: str = ""
+    source: str = "ai_search"
+    query: Optional[str] = None
+    engagement_score: float = 0.5
+    conversion_probability: Optional[float] = None
+    extra: Optional[Dict[str, Any]] = None  # Fields not covered above, kept for round-tripping
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Lead":
+        """Build a lead from the JSON shape produced by discovery"""
+        extra = {k: v for k, v in data.items() if k not in _LEAD_FIELDS}
+        return cls(
+            name=data.get("name") or "",
+            email=data.get("email") or "",
+            company=data.get("company") or "",
+            title=_intern(data.get("title") or ""),
+            industry=_intern(data.get("industry") or ""),
+            location=_intern(data.get("location") or ""),
+            source=_intern(data.get("source") or "ai_search"),
+            query=data.get("query"),
+            engagement_score=0.5 if data.get("engagement_score") is None else float(data["engagement_score"]),
+            conversion_probability=data.get("conversion_probability"),
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON shape used in API responses"""
+        data = {
+            "name": self.name,
+            "email": self.email,
+            "company": self.company,
+            "title": self.title,
+            "industry": self.industry,
+            "location": self.location,
+            "engagement_score": self.engagement_score,
+            "source": self.source,
+        }
+        if self.query is not None:
+            data["query"] = self.query
+        if self.conversion_probability is not None:
+            data["conversion_probability"] = self.conversion_probability
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def dedup_key(self) -> str:
+        """Normalized identity: email when present, otherwise company + location"""
+        if self.email:
+            return _norm(self.email)
+        return f"{_norm(self.company)}|{_norm(self.location)}"
+
+
+_LEAD_FIELDS = frozenset(Lead.__slots__) - {"extra"}
+
+
+class LeadBatch:
+    """
+    Column-oriented batch of leads for scoring and serialization.
+
+    String columns are plain lists (interned where repetitive); numeric columns
+    are `array('d')`, which exposes the buffer protocol so the scorer can view
+    them (and the feature matrix) as NumPy arrays without copying. While such
+    a view is alive the batch is frozen: append() raises BufferError.
+    """
+
+    __slots__ = ("name", "email", "company", "title", "industry", "location", "source",
+                 "query", "engagement_score", "conversion_probability", "extra")
+
+    def __init__(self):
+        for field in _CORE_FIELDS:
+            setattr(self, field, [])
+        self.engagement_score = array("d")
+        self.conversion_probability = array("d")  # NaN until scored
+        self.extra: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_leads(cls, leads: Iterable[Any]) -> "LeadBatch":
+        """Build a batch from Lead records or raw lead dicts"""
+        batch = cls()
+        for lead in leads:
+            batch.append(lead if isinstance(lead, Lead) else Lead.from_dict(lead))
+        return batch
+
+    def append(self, lead: Lead):
+        # numeric columns first: they are the ones that raise (BufferError) while viewed,
+        # and a failed append must leave every column the same length
+        self.engagement_score.append(lead.engagement_score)
+        prob = lead.conversion_probability
+        try:
+            self.conversion_probability.append(float("nan") if prob is None else prob)
+        except BufferError:
+            self.engagement_score.pop()
+            raise
+        if lead.extra:
+            self.extra[len(self.name)] = lead.extra
+        for field in _CORE_FIELDS:
+            getattr(self, field).append(getattr(lead, field))
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    def lead(self, i: int) -> Lead:
+        """Materialize one row as a Lead record"""
+        prob = self.conversion_probability[i]
+        return Lead(
+            name=self.name[i], email=self.email[i], company=self.company[i],
+            title=self.title[i], industry=self.industry[i], location=self.location[i],
+            source=self.source[i], query=self.query[i],
+            engagement_score=self.engagement_score[i],
+            conversion_probability=None if prob != prob else prob,
+            extra=self.extra.get(i),
+        )
+
+    def __iter__(self) -> Iterator[Lead]:
+        return (self.lead(i) for i in range(len(self)))
+
+    def set_scores(self, probabilities: Iterable[float]):
+        """Store scorer output in place (accepts a list, array or NumPy vector)"""
+        probs = array("d", probabilities)
+        if len(probs) != len(self):
+            raise ValueError(f"Expected {len(self)} scores, got {len(probs)}")
+        self.conversion_probability = probs
+
+    def iter_dicts(self) -> Iterator[Dict[str, Any]]:
+        """Stream response rows straight from the columns, one dict at a time"""
+        for i in range(len(self)):
+            yield self.lead(i).to_dict()
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Column view for columnar serializers; arrays are shared, not copied"""
+        columns = {field: getattr(self, field) for field in _CORE_FIELDS}
+        columns["engagement_score"] = self.engagement_score
+        columns["conversion_probability"] = self.conversion_probability
+        return columns
+
+
+def as_numpy(column: array):
+    """
+    Zero-copy NumPy view over an array('d') column or feature buffer. The
+    array cannot grow while the view is referenced (BufferError); take
+    np.array(column) instead when it still has to.
+    """
+    import numpy as np
+    return np.frombuffer(column, dtype=np.float64)
+
+
+def to_batch(leads: Iterable[Any]) -> LeadBatch:
+    return leads if isinstance(leads, LeadBatch) else LeadBatch.from_leads(leads)
+
+
+def to_records(leads: Iterable[Any]) -> List[Lead]:
+    return [lead if isinstance(lead, Lead) else Lead.from_dict(lead) for lead in leads]
@@ -1,20 +1,52 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
+from service_kit.admin import admin_router
+from service_kit.instrumentation import InstrumentationMiddleware, install_db_hooks, metrics_endpoint
+from service_kit.load_shedding import LoadSheddingMiddleware
+from service_kit.middleware import CompressionMiddleware
 from app.config import settings
 from app.database import Base, engine
+from app.lead_search import ensure_search_index
+from app.models import LeadFeedback, LeadRecord
 from app.routes import router
+from app.routes_calculator import router as calculator_router
+from app.routes_leads import router as leads_router
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Create tables. On Postgres, migrations/ owns the lead tables (leads is
+# hash-partitioned there), so create_all must not create them first.
+if engine.dialect.name == "postgresql":
+    _migrated = {LeadRecord.__table__, LeadFeedback.__table__}
+    Base.metadata.create_all(
+        bind=engine, tables=[t for t in Base.metadata.sorted_tables if t not in _migrated]
+    )
+else:
+    Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
 
 # Initialize app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    default_response_class=ORJSONResponse if settings.FAST_JSON else JSONResponse,
 )
 
-# CORS middleware - must be added first
+# Load shedding (innermost, so 503s still get CORS headers and show up in the metrics)
+if settings.LOAD_SHEDDING_ENABLED:
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        retry_after=settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS,
+        critical_paths=settings.LOAD_SHEDDING_CRITICAL_PATHS,
+        auth_paths=settings.LOAD_SHEDDING_AUTH_PATHS,
+        auth_max_in_flight=settings.LOAD_SHEDDING_AUTH_MAX_IN_FLIGHT,
+        low_priority_paths=settings.LOAD_SHEDDING_LOW_PRIORITY_PATHS,
+        target_lag=settings.LOAD_SHEDDING_TARGET_LAG_SECONDS,
+        max_in_flight=settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+        min_in_flight=settings.LOAD_SHEDDING_MIN_IN_FLIGHT,
+    )
+
+# CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Allow all origins
@@ -25,8 +57,24 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Compress large payloads (lead exports, history) for clients that accept it
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
+
+# Instrumentation (outermost, so timings include compression)
+if settings.METRICS_ENABLED:
+    install_db_hooks(engine)
+    app.add_middleware(
+        InstrumentationMiddleware,
+        sample_rate=settings.INSTRUMENTATION_SAMPLE_RATE,
+        n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+    )
+    app.add_route("/metrics", metrics_endpoint(settings.METRICS_TOKEN), include_in_schema=False)
+
 # Include routes
 app.include_router(router)
+app.include_router(calculator_router)
+app.include_router(leads_router)
+app.include_router(admin_router(lambda: settings.ADMIN_TOKEN))
 
 @app.get("/")
 async def root():
@@ -0,0 +1,192 @@
+"""
+Tree-ensemble inference without scikit-learn.
+
+compile_forest() flattens a fitted RandomForestClassifier/Regressor into a
+handful of contiguous NumPy arrays (one node table for all trees); a
+CompiledForest walks every tree for a whole batch at once, one vectorized
+step per tree level, and can attribute each prediction to the features
+along the decision paths in the same pass:
+
+    forest = compile_forest(model)          # at training time
+    forest.save("models/lead_scorer.npz")
+
+    forest = CompiledForest.load("models/lead_scorer.npz")   # workers: numpy only
+    probs = forest.predict_proba(X)
+    probs, contributions, bias = forest.predict_with_contributions(X)
+
+Contributions follow the decision-path method: every split moves the node
+value from parent to child, and that change is credited to the split's
+feature, so for each row `bias + contributions.sum() == prediction`.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_LEAF = -1  # sklearn's TREE_LEAF marker in children_left/right
+
+
+class CompiledForest:
+    """
+    All trees of an ensemble in one node table.
+
+    feature/threshold/left/right/value are indexed by global node id;
+    `roots` holds each tree's first node. Leaves point to themselves with an
+    infinite threshold, so extra traversal steps past a leaf are no-ops.
+    """
+
+    __slots__ = ("feature", "threshold", "left", "right", "value", "roots", "max_depth", "n_features",
+                 "feature_names", "_children")
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, max_depth: int, n_features: int,
+                 feature_names: Optional[Sequence[str]] = None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        # Interleaved (left, right) per node: the next node is one gather at 2 * node + go_right
+        self._children = np.empty(2 * len(feature), dtype=np.intp)
+        self._children[0::2], self._children[1::2] = left, right
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def save(self, path: str):
+        np.savez(
+            path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            value=self.value, roots=self.roots, meta=np.array([self.max_depth, self.n_features]),
+            feature_names=np.array(self.feature_names or [], dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledForest":
+        with np.load(path) as data:
+            max_depth, n_features = (int(v) for v in data["meta"])
+            names = [str(n) for n in data["feature_names"]] or None
+            return cls(data["feature"], data["threshold"], data["left"], data["right"], data["value"],
+                       data["roots"], max_depth, n_features, names)
+
+    def _check(self, X: Any) -> np.ndarray:
+        # sklearn compares float32 features against its thresholds; do the same for identical splits
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected an (n, {self.n_features}) feature matrix, got shape {X.shape}")
+        return X
+
+    def _walk(self, X: np.ndarray, contributions: Optional[np.ndarray]) -> np.ndarray:
+        """Leaf node id per (row, tree); accumulates path contributions when given"""
+        n = len(X)
+        flat_x = X.astype(np.float64).ravel()
+        nodes = np.tile(self.roots.astype(np.intp), n)
+        row_offsets = np.repeat(np.arange(n, dtype=np.intp) * self.n_features, self.n_trees)
+        for _ in range(self.max_depth):
+            cells = row_offsets + self.feature[nodes]
+            go_right = flat_x[cells] > self.threshold[nodes]
+            next_nodes = self._children[2 * nodes + go_right]
+            if contributions is not None:
+                # One bincount over (row, feature) cells instead of an np.add.at scatter
+                contributions += np.bincount(
+                    cells, weights=self.value[next_nodes] - self.value[nodes], minlength=n * self.n_features,
+                ).reshape(n, self.n_features)
+            nodes = next_nodes
+        return nodes.reshape(n, self.n_trees)
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Positive-class probability (classifiers) or prediction (regressors) per row"""
+        X = self._check(X)
+        if not len(X):
+            return np.zeros(0)
+        return self.value[self._walk(X, None)].mean(axis=1)
+
+    def predict_with_contributions(self, X: Any) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        (predictions, (n, n_features) contributions, bias); bias is the
+        ensemble's prior, the mean root value over trees
+        """
+        X = self._check(X)
+        contributions = np.zeros((len(X), self.n_features))
+        if not len(X):
+            return np.zeros(0), contributions, self.bias
+        leaves = self._walk(X, contributions)
+        contributions /= self.n_trees
+        return self.value[leaves].mean(axis=1), contributions, self.bias
+
+    @property
+    def bias(self) -> float:
+        return float(self.value[self.roots].mean())
+
+    def feature_scores(self, X: Any, top: Optional[int] = None) -> List[Dict[str, float]]:
+        """Per-row {feature name: contribution} for explaining individual scores"""
+        _, contributions, _ = self.predict_with_contributions(X)
+        return self.named_contributions(contributions, top)
+
+    def named_contributions(self, contributions: np.ndarray, top: Optional[int] = None) -> List[Dict[str, float]]:
+        """
+        Name the columns of a contributions matrix, per row; with `top`, keep
+        only the largest contributions by magnitude, largest first
+        """
+        names = self.feature_names or [f"f{i}" for i in range(self.n_features)]
+        if top is None:
+            return [dict(zip(names, row)) for row in contributions.tolist()]
+        order = np.argsort(-np.abs(contributions), axis=1, kind="stable")[:, :top]
+        return [{names[j]: round(float(contributions[i, j]), 4) for j in row}
+                for i, row in enumerate(order.tolist())]
+
+
+def _node_values(tree: Any, classifier: bool) -> np.ndarray:
+    value = tree.value[:, 0, :]
+    if not classifier:
+        return value[:, 0].astype(np.float64)
+    if value.shape[1] != 2:
+        raise ValueError(f"Only binary classifiers can be compiled, got {value.shape[1]} classes")
+    # Older sklearn stores class counts per node, newer stores fractions; normalize either way
+    return (value[:, 1] / value.sum(axis=1)).astype(np.float64)
+
+
+def compile_forest(model: Any, feature_names: Optional[Sequence[str]] = None) -> CompiledForest:
+    """
+    Flatten a fitted sklearn forest (RandomForest/ExtraTrees, classifier or
+    regressor). Only the fitted attributes are read, so sklearn itself is not
+    imported here.
+    """
+    estimators = getattr(model, "estimators_", None)
+    if not estimators:
+        raise ValueError("Model is not a fitted tree ensemble")
+    classifier = hasattr(model, "classes_")
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset, max_depth = 0, 0
+    for estimator in estimators:
+        tree = estimator.tree_
+        ids = np.arange(tree.node_count)
+        leaf = tree.children_left == _LEAF
+        features.append(np.where(leaf, 0, tree.feature))
+        thresholds.append(np.where(leaf, np.inf, tree.threshold))
+        lefts.append(np.where(leaf, ids, tree.children_left) + offset)
+        rights.append(np.where(leaf, ids, tree.children_right) + offset)
+        values.append(_node_values(tree, classifier))
+        roots.append(offset)
+        offset += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    index_type = np.int32 if offset < 2 ** 31 else np.int64
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.intp),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(index_type),
+        right=np.concatenate(rights).astype(index_type),
+        value=np.concatenate(values),
+        roots=np.array(roots, dtype=index_type),
+        max_depth=max_depth,
+        n_features=model.n_features_in_,
+        feature_names=feature_names,
+    )
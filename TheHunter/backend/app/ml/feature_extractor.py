@@ -0,0 +1,143 @@
+from array import array
+from typing import Any, Dict, List, Optional
+
+from app.geo import location_scores
+from app.leads import Lead, LeadBatch, as_numpy, to_batch
+
+FEATURE_NAMES = [
+    "engagement_score",
+    "industry_match",
+    "seniority_level_score",
+    "company_size_fit",
+    "location_match",
+    "lead_age_days",
+    "quality_score",
+    "feedback_count",
+    "previous_conversion_rate",
+    "recency_score",
+]
+N_FEATURES = len(FEATURE_NAMES)
+
+_SENIORITY = [
+    (("founder", "ceo", "owner", "chief", "president", "partner"), 1.0),
+    (("director", "vp", "vice president", "head"), 0.8),
+    (("manager", "lead", "principal"), 0.6),
+    (("senior", "sr", "consultant", "dentist", "doctor", "physician"), 0.5),
+]
+_QUALITY_FIELDS = ("name", "email", "company", "title", "industry", "location")
+
+
+def calculate_seniority_score(title: str) -> float:
+    title = title.lower()
+    for keywords, score in _SENIORITY:
+        if any(k in title for k in keywords):
+            return score
+    return 0.3
+
+
+def calculate_industry_match(industry: str, wanted: Optional[str]) -> float:
+    if not wanted:
+        return 0.5
+    industry, wanted = industry.lower(), wanted.lower()
+    return 1.0 if wanted in industry or (industry and industry in wanted) else 0.0
+
+
+def calculate_location_match(location: str, wanted: Optional[str]) -> float:
+    """
+    Distance-based match when both locations are in the gazetteer, otherwise
+    the share of the wanted location's tokens present in the lead location
+    """
+    if not wanted:
+        return 0.5
+    score = location_scores((location,), wanted)[location]
+    if score is not None:
+        return score
+    return calculate_token_location_match(location, wanted)
+
+
+def calculate_token_location_match(location: str, wanted: str) -> float:
+    wanted_tokens = {t for t in wanted.lower().replace(",", " ").split() if t}
+    if not wanted_tokens:
+        return 0.5
+    have = set(location.lower().replace(",", " ").split())
+    return len(wanted_tokens & have) / len(wanted_tokens)
+
+
+def _extras(extra: Optional[Dict[str, Any]]):
+    extra = extra or {}
+    age = float(extra.get("lead_age_days", 0))
+    return (
+        float(extra.get("company_size_fit", 0.5)),
+        age,
+        float(extra.get("feedback_count", 0)),
+        float(extra.get("previous_conversion_rate", 0.0)),
+        1.0 / (1.0 + age / 30.0),
+    )
+
+
+def extract_features(lead: Any, criteria: Optional[Dict[str, str]] = None) -> List[float]:
+    """
+    Input: Lead record or dict with name, email, engagement_score, etc.
+    Output: 10-feature vector for ML model (order of FEATURE_NAMES)
+    """
+    if not isinstance(lead, Lead):
+        lead = Lead.from_dict(lead)
+    criteria = criteria or {}
+    filled = sum(1 for f in _QUALITY_FIELDS if getattr(lead, f))
+    size_fit, age, feedback, prev_rate, recency = _extras(lead.extra)
+    return [
+        lead.engagement_score,
+        calculate_industry_match(lead.industry, criteria.get("industry")),
+        calculate_seniority_score(lead.title),
+        size_fit,
+        calculate_location_match(lead.location, criteria.get("location")),
+        age,
+        filled / len(_QUALITY_FIELDS),
+        feedback,
+        prev_rate,
+        recency,
+    ]
+
+
+def extract_feature_buffer(leads: Any, criteria: Optional[Dict[str, str]] = None) -> array:
+    """
+    Row-major n x 10 float64 buffer for a whole batch.
+
+    Industry/location/title scores are computed once per distinct (interned)
+    value rather than once per lead.
+    """
+    batch: LeadBatch = to_batch(leads)
+    criteria = criteria or {}
+    industry_cache: Dict[str, float] = {}
+    location_cache: Dict[str, Optional[float]] = {}
+    wanted_location = criteria.get("location")
+    if wanted_location:
+        # Geocode each distinct location once and score them all against the target
+        location_cache = location_scores(set(batch.location), wanted_location)
+    title_cache: Dict[str, float] = {}
+    out = array("d")
+    for i in range(len(batch)):
+        industry, location, title = batch.industry[i], batch.location[i], batch.title[i]
+        industry_score = industry_cache.get(industry)
+        if industry_score is None:
+            industry_score = industry_cache[industry] = calculate_industry_match(industry, criteria.get("industry"))
+        location_score = location_cache.get(location)
+        if location_score is None:
+            location_score = location_cache[location] = (
+                calculate_token_location_match(location, wanted_location) if wanted_location else 0.5
+            )
+        seniority = title_cache.get(title)
+        if seniority is None:
+            seniority = title_cache[title] = calculate_seniority_score(title)
+        filled = sum(1 for f in _QUALITY_FIELDS if getattr(batch, f)[i])
+        size_fit, age, feedback, prev_rate, recency = _extras(batch.extra.get(i))
+        out.extend((
+            batch.engagement_score[i], industry_score, seniority, size_fit, location_score,
+            age, filled / len(_QUALITY_FIELDS), feedback, prev_rate, recency,
+        ))
+    return out
+
+
+def extract_feature_matrix(leads: Any, criteria: Optional[Dict[str, str]] = None):
+    """(n, 10) NumPy matrix viewing the feature buffer without a copy"""
+    return as_numpy(extract_feature_buffer(leads, criteria)).reshape(-1, N_FEATURES)
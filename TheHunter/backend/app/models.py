@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime
+from sqlalchemy import Boolean, Column, Integer, Float, String, DateTime, JSON, Index, UniqueConstraint
 from datetime import datetime
 from app.database import Base
 
@@ -11,3 +11,58 @@ class Calculation(Base):
     operand2 = Column(Float)
     result = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class LeadRecord(Base):
+    """
+    Stored lead, one row per (tenant, dedup key).
+
+    Written in bulk by app.lead_store, never row by row through the ORM.
+    On Postgres the table is hash-partitioned by tenant_id (see
+    migrations/001_init.sql).
+    """
+    __tablename__ = "leads"
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "dedup_key", name="uq_leads_tenant_dedup"),
+        Index("ix_leads_tenant_discovered", "tenant_id", "discovered_at"),
+        Index("ix_leads_tenant_probability", "tenant_id", "conversion_probability"),
+        Index("ix_leads_tenant_geohash", "tenant_id", "geohash"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(String, nullable=False)
+    dedup_key = Column(String, nullable=False)  # Lead.dedup_key: normalized email, else company|location
+    name = Column(String, nullable=False, default="")
+    email = Column(String, nullable=False, default="")
+    company = Column(String, nullable=False, default="")
+    title = Column(String, nullable=False, default="")
+    industry = Column(String, nullable=False, default="")
+    location = Column(String, nullable=False, default="")
+    source = Column(String, nullable=False, default="ai_search")
+    query = Column(String, nullable=True)
+    engagement_score = Column(Float, nullable=False, default=0.5)
+    conversion_probability = Column(Float, nullable=True)
+    extra = Column(JSON(none_as_null=True), nullable=True)
+    latitude = Column(Float, nullable=True)  # from the offline gazetteer (app.geo), NULL if not found
+    longitude = Column(Float, nullable=True)
+    geohash = Column(String, nullable=True)  # precision 9; radius/bbox queries range-scan its prefixes
+    discovered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class LeadFeedback(Base):
+    """
+    Outcome reported for a stored lead: labelled samples for retraining the
+    scorer. Refers to the lead by (tenant_id, dedup_key), which survives
+    re-discovery and upserts.
+    """
+    __tablename__ = "lead_feedback"
+    __table_args__ = (
+        Index("ix_lead_feedback_tenant_lead", "tenant_id", "dedup_key"),
+        Index("ix_lead_feedback_created", "created_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(String, nullable=False)
+    dedup_key = Column(String, nullable=False)
+    outcome = Column(String, nullable=False)  # 'converted', 'replied', 'no_response', 'rejected'
+    converted = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,256 @@
+"""
+Fair multi-tenant scheduling for recipe jobs.
+
+FairScheduler replaces a single FIFO with start-time fair queuing (SFQ):
+- every job gets a virtual start tag S = max(V, tenant's last finish tag)
+  and finish tag F = S + cost / weight, where weight comes from the tenant's
+  subscription plan_tier; the lowest S runs next and V advances to it. A
+  tenant with 5,000 queued hunts has tags far in the future, so a newcomer
+  starts at V and is served next.
+- V and the tenant clocks are kept per data source: a capped source drains
+  slower than the others, and one shared V would run ahead of the backlog
+  waiting on it, letting that backlog outrank newcomers at that source.
+- interactive and batch jobs keep separate per-tenant clocks, so a tenant's
+  interactive job is not queued behind its own batch backlog.
+- concurrency is capped per tenant (by tier) and per data source, and
+  batch jobs leave `interactive_reserve` slots of a capped source free for
+  interactive ones. Jobs are grouped in flows of (tenant, source); a flow
+  whose tenant or source is at its cap is parked and returned to the ready
+  heap when a slot frees, so blocked work is never rescanned.
+- interactive jobs carry a deadline; when the earliest one is within
+  `urgent_slack` that job runs ahead of fair order. Batch jobs have no
+  deadline: a flood of overdue batch work would otherwise take over the
+  earliest-deadline order and starve everyone again.
+
+Every decision is a few heap operations: O(log n) in queued jobs.
+"""
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+
+
+@dataclass(eq=False)
+class Job:
+    job_id: str
+    tenant_id: str
+    tier: str = "free"  # the tenant's Subscription.plan_tier
+    source: str = "default"  # data source the job mostly hits (caps are per source)
+    kind: str = BATCH
+    cost: float = 1.0  # expected run time, any unit; weights virtual time
+    payload: Any = None
+    submitted_at: float = 0.0
+    deadline: Optional[float] = None  # interactive jobs only
+    # Set by the scheduler
+    start_tag: float = 0.0
+    seq: int = 0
+    state: str = "queued"  # queued -> running -> done
+
+
+@dataclass(eq=False)
+class _Flow:
+    tenant_id: str
+    source: str
+    jobs: List[Tuple[float, int, Job]] = field(default_factory=list)  # by (start tag, seq)
+    version: int = 0  # invalidates older entries of this flow in the ready heap
+    parked: bool = False
+
+    def head(self) -> Optional[Job]:
+        while self.jobs and self.jobs[0][2].state != "queued":
+            heapq.heappop(self.jobs)  # dispatched early by the deadline path
+        return self.jobs[0][2] if self.jobs else None
+
+
+class FairScheduler:
+    """Not thread-safe on its own; RecipeQueue adds locking for worker threads"""
+
+    def __init__(self, tier_weights: Optional[Dict[str, float]] = None,
+                 tenant_concurrency: Optional[Dict[str, int]] = None,
+                 source_concurrency: Optional[Dict[str, int]] = None,
+                 interactive_deadline: Optional[float] = None, urgent_slack: Optional[float] = None,
+                 interactive_reserve: Optional[int] = None):
+        self.tier_weights = tier_weights or settings.QUEUE_TIER_WEIGHTS
+        self.tenant_concurrency = tenant_concurrency or settings.QUEUE_TENANT_CONCURRENCY
+        self.source_concurrency = source_concurrency or settings.QUEUE_SOURCE_CONCURRENCY
+        self.interactive_deadline = interactive_deadline or settings.QUEUE_INTERACTIVE_DEADLINE_SECONDS
+        self.urgent_slack = settings.QUEUE_URGENT_SLACK_SECONDS if urgent_slack is None else urgent_slack
+        self.interactive_reserve = (settings.QUEUE_INTERACTIVE_RESERVED_SLOTS if interactive_reserve is None
+                                    else interactive_reserve)
+
+        self.virtual_time: Dict[str, float] = {}  # per source
+        self._seq = itertools.count()
+        self._last_finish: Dict[Tuple[str, str, str], float] = {}  # (tenant, kind, source) -> finish tag
+        self._flows: Dict[Tuple[str, str], _Flow] = {}
+        self._ready: List[Tuple[float, int, int, _Flow]] = []  # (head start tag, seq, version, flow)
+        self._by_deadline: List[Tuple[float, int, Job]] = []
+        self._running_tenant: Dict[str, int] = {}
+        self._running_source: Dict[str, int] = {}
+        self._parked_tenant: Dict[str, List[_Flow]] = {}
+        self._parked_source: Dict[str, List[_Flow]] = {}
+        self._queued = 0
+
+    def __len__(self) -> int:
+        return self._queued
+
+    def running(self) -> int:
+        return sum(self._running_tenant.values())
+
+    # ---- submission ----
+
+    def submit(self, job: Job, now: Optional[float] = None) -> Job:
+        now = time.monotonic() if now is None else now
+        weight = self.tier_weights.get(job.tier, min(self.tier_weights.values()))
+        clock = (job.tenant_id, job.kind, job.source)
+        job.submitted_at = now
+        job.start_tag = max(self.virtual_time.get(job.source, 0.0), self._last_finish.get(clock, 0.0))
+        self._last_finish[clock] = job.start_tag + job.cost / weight
+        job.seq = next(self._seq)
+        job.state = "queued"
+
+        flow = self._flows.get((job.tenant_id, job.source))
+        if flow is None:
+            flow = self._flows[(job.tenant_id, job.source)] = _Flow(job.tenant_id, job.source)
+        head = flow.head()
+        heapq.heappush(flow.jobs, (job.start_tag, job.seq, job))
+        if not flow.parked and (head is None or job.start_tag < head.start_tag):
+            self._push_ready(flow)
+        if job.kind == INTERACTIVE:
+            job.deadline = now + self.interactive_deadline
+            heapq.heappush(self._by_deadline, (job.deadline, job.seq, job))
+        self._queued += 1
+        return job
+
+    # ---- dispatch ----
+
+    def _blocked_by(self, job: Job) -> Optional[str]:
+        if self._running_tenant.get(job.tenant_id, 0) >= self.tenant_concurrency.get(job.tier, 1):
+            return "tenant"
+        cap = self.source_concurrency.get(job.source)
+        if cap is not None:
+            if job.kind != INTERACTIVE:
+                cap = max(cap - self.interactive_reserve, 1)
+            if self._running_source.get(job.source, 0) >= cap:
+                return "source"
+        return None
+
+    def _push_ready(self, flow: _Flow):
+        head = flow.head()
+        if head is None:
+            return
+        flow.version += 1
+        heapq.heappush(self._ready, (head.start_tag, head.seq, flow.version, flow))
+
+    def _park(self, flow: _Flow, reason: str):
+        flow.parked = True
+        parked = self._parked_tenant if reason == "tenant" else self._parked_source
+        parked.setdefault(flow.tenant_id if reason == "tenant" else flow.source, []).append(flow)
+
+    def _start(self, job: Job, flow: _Flow, fair: bool = True) -> Job:
+        job.state = "running"
+        self._queued -= 1
+        if fair:  # a deadline dispatch jumps the order, so it must not move virtual time
+            self.virtual_time[job.source] = max(self.virtual_time.get(job.source, 0.0), job.start_tag)
+        self._running_tenant[job.tenant_id] = self._running_tenant.get(job.tenant_id, 0) + 1
+        self._running_source[job.source] = self._running_source.get(job.source, 0) + 1
+        if not flow.parked:
+            self._push_ready(flow)  # next head of the flow, at its own tag
+        return job
+
+    def _urgent(self, now: float) -> Optional[Job]:
+        """The earliest-deadline queued job, if it is close to its deadline and can run now"""
+        while self._by_deadline and self._by_deadline[0][2].state != "queued":
+            heapq.heappop(self._by_deadline)
+        if not self._by_deadline:
+            return None
+        deadline, _, job = self._by_deadline[0]
+        if deadline - now > self.urgent_slack or self._blocked_by(job):
+            return None
+        heapq.heappop(self._by_deadline)
+        return job
+
+    def next_job(self, now: Optional[float] = None) -> Optional[Job]:
+        """Dispatch the next job, or None when nothing queued may run right now"""
+        now = time.monotonic() if now is None else now
+        urgent = self._urgent(now)
+        if urgent is not None:
+            return self._start(urgent, self._flows[(urgent.tenant_id, urgent.source)], fair=False)
+
+        while self._ready:
+            tag, seq, version, flow = heapq.heappop(self._ready)
+            if flow.parked or version != flow.version:
+                continue  # stale entry; the flow was re-pushed or parked since
+            head = flow.head()
+            if head is None:
+                continue
+            if head.seq != seq:  # head changed without a re-push (deadline dispatch)
+                self._push_ready(flow)
+                continue
+            reason = self._blocked_by(head)
+            if reason:
+                self._park(flow, reason)
+                continue
+            heapq.heappop(flow.jobs)
+            return self._start(head, flow)
+        return None
+
+    def complete(self, job: Job):
+        """Release the job's tenant and source slots and wake flows parked on them"""
+        if job.state != "running":
+            return
+        job.state = "done"
+        self._running_tenant[job.tenant_id] -= 1
+        self._running_source[job.source] -= 1
+        for parked in (self._parked_tenant.pop(job.tenant_id, ()), self._parked_source.pop(job.source, ())):
+            for flow in parked:
+                if flow.parked:
+                    flow.parked = False
+                    self._push_ready(flow)
+
+
+class RecipeQueue:
+    """Thread-safe FairScheduler for a pool of worker threads"""
+
+    def __init__(self, scheduler: Optional[FairScheduler] = None):
+        self.scheduler = scheduler or FairScheduler()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, job: Job) -> Job:
+        with self._cond:
+            self.scheduler.submit(job)
+            self._cond.notify()
+        return job
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Job]:
+        """Next runnable job; None on timeout or once closed and drained"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                job = self.scheduler.next_job()
+                if job is not None:
+                    return job
+                if self._closed and not len(self.scheduler):
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                # Wake on new work, a freed slot, or in time for the next deadline to turn urgent
+                self._cond.wait(remaining if remaining is not None else 1.0)
+
+    def done(self, job: Job):
+        with self._cond:
+            self.scheduler.complete(job)
+            self._cond.notify_all()
+
+    def close(self):
+        """No more jobs will be put; get() returns None once the queue drains"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
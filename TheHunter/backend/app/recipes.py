@@ -0,0 +1,149 @@
+"""
+Recipe definitions and the memoized, resumable recipe runner.
+
+A recipe is an ordered list of executor Steps. run_recipe() executes it with
+the shared StepCache and a per-run checkpoint (app/executor.py), so:
+- a retried run resumes after its last completed step
+- an unchanged re-run is served from the cache without LLM or API calls
+"""
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+from app.components import call_component, deduplicate_leads, discover_leads_batched, score_leads
+from app.config import settings
+from app.executor import RunResult, Step, StepCache, recipe_key, run_recipe_coalesced, run_steps
+from app.leads import LeadBatch
+from app.services.data_source import llm_client
+
+MAX_EXPANDED_QUERIES = 20
+FEATURE_SCORES = 3  # feature contributions kept per scored lead
+
+
+@lru_cache()
+def get_step_cache() -> StepCache:
+    return StepCache(settings.STEP_CACHE_DIR, settings.STEP_CACHE_TTL_SECONDS)
+
+
+# ============= LEAD HUNT =============
+
+def expand_queries(inputs: Dict[str, Any]) -> List[str]:
+    """Search phrases for discovery: explicit queries, or the query in each location"""
+    queries = list(inputs.get("queries") or [])
+    query = inputs.get("query")
+    if query:
+        locations = inputs.get("locations") or [None]
+        queries.extend(f"{query} in {loc}" if loc else query for loc in locations)
+    return list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))[:MAX_EXPANDED_QUERIES]
+
+
+def _groq() -> Any:
+    from groq import Groq  # optional dependency, only needed by workers that run discovery live
+    return Groq(api_key=os.environ["GROQ_API_KEY"])
+
+
+def _llm_client():
+    """Groq, recorded or replayed per DATA_SOURCE_MODE"""
+    return llm_client(_groq)
+
+
+def _scorer_model() -> Optional[Dict[str, Any]]:
+    """Identity of the configured scorer, part of the scoring step's cache key"""
+    path = settings.SCORER_MODEL_PATH
+    if not path:
+        return None
+    return {"path": os.path.abspath(path), "mtime": os.path.getmtime(path)}
+
+
+@lru_cache(maxsize=1)
+def _load_forest(path: str, mtime: float):
+    from app.ml.compiled_forest import CompiledForest
+    return CompiledForest.load(path)
+
+
+def load_scorer():
+    """The configured CompiledForest, loaded once per model file; None when unset"""
+    model = _scorer_model()
+    return None if model is None else _load_forest(model["path"], model["mtime"])
+
+
+def _score(leads: List[Any], criteria: Dict[str, str]) -> LeadBatch:
+    """
+    Score with the configured forest and keep each lead's largest feature
+    contributions as `feature_scores`, computed in the same tree walk
+    """
+    forest = load_scorer()
+    if forest is None:
+        return score_leads(leads, lambda matrix: matrix[:, 0], criteria)  # engagement_score column
+    feature_scores: List[Dict[str, float]] = []
+
+    def predict(matrix):
+        probabilities, contributions, _ = forest.predict_with_contributions(matrix)
+        feature_scores.extend(forest.named_contributions(contributions, top=FEATURE_SCORES))
+        return probabilities
+
+    batch = score_leads(leads, predict, criteria)
+    for i, row in enumerate(feature_scores):
+        batch.extra[i] = {**batch.extra.get(i, {}), "feature_scores": row}  # extras may be shared with the input leads
+    return batch
+
+
+def _store(tenant_id: str) -> Callable[[LeadBatch], int]:
+    def store(batch: LeadBatch) -> int:
+        from app.database import SessionLocal
+        from app.lead_store import upsert_leads
+
+        db = SessionLocal()
+        try:
+            return upsert_leads(db, tenant_id, batch)
+        finally:
+            db.close()
+    return store
+
+
+def _coalesced(tenant_id: str, step: Step) -> Step:
+    """The step, with its component call shared among identical calls in flight (call_component)"""
+    fn = step.fn
+    return step._replace(
+        fn=lambda value: call_component(tenant_id, step.component, step.config, value, lambda: fn(value))
+    )
+
+
+def lead_hunt_steps(tenant_id: str, inputs: Dict[str, Any],
+                    client_factory: Callable[[], Any] = _llm_client) -> List[Step]:
+    per_query = int(inputs.get("per_query", 5))
+    criteria = {k: inputs[k] for k in ("industry", "location") if inputs.get(k)}
+    return [
+        Step("expand", "query_expansion", {"max": MAX_EXPANDED_QUERIES}, expand_queries),
+        _coalesced(tenant_id, Step(
+            "discover", "llm_discovery", {"model": settings.GROQ_MODEL, "per_query": per_query},
+            lambda queries: list(discover_leads_batched(client_factory(), queries, per_query)))),
+        Step("dedupe", "deduplicate", {}, deduplicate_leads),
+        _coalesced(tenant_id, Step(
+            "score", "ml_scoring", {"model": _scorer_model(), "criteria": criteria},
+            lambda leads: _score(leads, criteria))),
+        # Writes every run; re-running a store is an idempotent upsert
+        Step("store", "lead_store", {}, _store(tenant_id), cacheable=False),
+    ]
+
+
+RECIPES: Dict[str, Callable[..., List[Step]]] = {
+    "lead_hunt": lead_hunt_steps,
+}
+
+
+def run_recipe(tenant_id: str, recipe_id: str, inputs: Dict[str, Any], run_id: Optional[str] = None,
+               cache: Optional[StepCache] = None, **step_options: Any) -> RunResult:
+    """
+    Run a recipe with step memoization and checkpointing. `run_id` names the
+    checkpoint; retries of a job must pass the same one. Identical runs in
+    flight in this process (same inputs and run_id) are coalesced.
+    """
+    if recipe_id not in RECIPES:
+        raise KeyError(f"Unknown recipe: {recipe_id}")
+    steps = RECIPES[recipe_id](tenant_id, inputs, **step_options)
+    cache = cache or get_step_cache()
+    run_id = run_id or recipe_key(tenant_id, recipe_id, inputs)
+    return run_recipe_coalesced(
+        tenant_id, recipe_id, inputs, lambda: run_steps(tenant_id, run_id, steps, inputs, cache), run_id
+    )
@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from typing import List
+from service_kit.http_cache import ETagCache, if_none_match, not_modified, weak_etag
+from app import schemas
+from app.config import settings
+from app.database import get_db
+from app.old_services import CalculationService
+from app.serializers import list_response, serialize_calculation
+
+router = APIRouter(prefix="/api/v1/calculator", tags=["calculator"])
+
+etag_cache = ETagCache(ttl_seconds=settings.ETAG_CACHE_TTL_SECONDS,
+                       max_entries=settings.ETAG_CACHE_MAX_ENTRIES)
+
+@router.get("/health")
+async def health_check():
+    """Calculator health check"""
+    return {"status": "healthy", "service": "calculator"}
+
+@router.post("/calculate", response_model=schemas.CalculationResponse)
+def calculate(calculation: schemas.CalculationCreate, db: Session = Depends(get_db)):
+    """Run a calculation and store it in history"""
+    try:
+        db_calculation = CalculationService.create_calculation(db, calculation)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    etag_cache.invalidate("calculations", "history")
+    return db_calculation
+
+@router.get("/history", response_model=List[schemas.CalculationResponse])
+def get_history(request: Request, response: Response, skip: int = 0, limit: int = 100,
+                db: Session = Depends(get_db)):
+    """Get calculation history"""
+    page = f"history:{skip}:{limit}"
+    # Conditional GET answered from the ETag cache, before any DB read
+    cached = etag_cache.get("calculations", page)
+    if cached and if_none_match(request, cached):
+        return not_modified(cached)
+    
+    calculations = CalculationService.get_calculations(db, skip=skip, limit=limit)
+    # Calculations are immutable, so the ids on the page are its version
+    etag = weak_etag(calculations, ("id",))
+    etag_cache.set("calculations", page, etag)
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    
+    response.headers["ETag"] = etag
+    if settings.FAST_JSON:
+        return list_response(calculations, serialize_calculation, headers={"ETag": etag})
+    return calculations
+
+@router.get("/history/{calculation_id}", response_model=schemas.CalculationResponse)
+def get_calculation(calculation_id: int, db: Session = Depends(get_db)):
+    """Get a single calculation"""
+    calculation = CalculationService.get_calculation(db, calculation_id)
+    if not calculation:
+        raise HTTPException(status_code=404, detail="Calculation not found")
+    return calculation
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.auth import get_current_tenant
+from app.database import get_db
+from app.lead_search import MAX_PAGE_SIZE, search_leads
+
+router = APIRouter(prefix="/api/v1/leads", tags=["leads"])
+
+@router.get("/search")
+def search(q: str = Query(..., min_length=1), page: int = Query(1, ge=1),
+           page_size: int = Query(20, ge=1, le=MAX_PAGE_SIZE), tenant_id: str = Depends(get_current_tenant),
+           db: Session = Depends(get_db)):
+    """Search the caller's stored leads by company, title, industry and name"""
+    result = search_leads(db, tenant_id, q, page, page_size)
+    return {
+        "results": [dict(hit.lead.to_dict(), score=round(hit.score, 4)) for hit in result.hits],
+        "page": result.page,
+        "page_size": result.page_size,
+        "has_more": result.has_more,
+        "fuzzy": result.fuzzy,
+    }
@@ -0,0 +1,35 @@
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Type
+
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app import schemas
+from app.leads import to_batch
+
+
+def row_serializer(schema: Type[BaseModel]) -> Callable[[Any], Dict[str, Any]]:
+    """
+    Pre-built serializer copying a response schema's fields off a trusted ORM row.
+
+    Skips per-row Pydantic validation; orjson encodes datetimes natively.
+    """
+    fields = tuple(schema.model_fields)
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda row: {fields[0]: getter(row)}
+    return lambda row: dict(zip(fields, getter(row)))
+
+
+serialize_calculation = row_serializer(schemas.CalculationResponse)
+
+
+def list_response(rows: Iterable[Any], serializer: Callable[[Any], Dict[str, Any]],
+                  headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    """Serialize ORM rows straight to JSON, bypassing response_model re-validation"""
+    return ORJSONResponse([serializer(row) for row in rows], headers=headers)
+
+
+def leads_response(leads: Iterable[Any]) -> ORJSONResponse:
+    """Serialize a lead list (Lead records, dicts or a LeadBatch) with orjson"""
+    return ORJSONResponse(list(to_batch(leads).iter_dicts()))
@@ -0,0 +1,55 @@
+"""
+Production entry point: a pre-fork server (service_kit.server).
+
+    python -m app.server --workers 4 --port 8000
+
+The master imports the app and loads the heavy read-only state once
+(gazetteer, scorer model arrays, recipe registry, ORM mappers), then forks
+the workers, which share those pages copy-on-write, and logs their memory
+every SERVER_MEMORY_REPORT_SECONDS.
+
+It runs one worker unless more are asked for (--workers, SERVER_WORKERS; 0 =
+one per available CPU). Several workers are opt-in because state kept in
+process memory is per worker: /metrics describes only the worker that
+answered the scrape (scrape each worker, or run one worker per container),
+and the ETag cache only sees writes made in its own worker.
+"""
+import argparse
+from typing import List, Optional
+
+from service_kit.server import available_cpus, serve
+
+from app.config import WORKER_INDEX_ENV, settings
+
+
+def preload():
+    """Import the app and build the state every worker reads; returns the ASGI app"""
+    from sqlalchemy.orm import configure_mappers
+
+    from app.database import engine
+    from app.geo import get_geocoder
+    from app.main import app
+    from app.ml import feature_extractor  # noqa: F401
+    from app.recipes import RECIPES, load_scorer  # noqa: F401
+
+    configure_mappers()
+    get_geocoder()
+    load_scorer()
+    engine.dispose()  # connections opened by create_all must not be shared by the workers
+    return app
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pre-fork server: preload once, fork workers that share it")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="default 1; 0 = one per available CPU")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    serve(preload, args.host, args.port, args.workers or available_cpus(), args.log_level,
+          settings.SERVER_MEMORY_REPORT_SECONDS, WORKER_INDEX_ENV)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Record/replay at the data-source boundary.
+
+Every external call discovery makes goes through a DataSource: the LLM
+today, and the Google Maps, Yelp and LinkedIn connectors as they land. A
+source runs in one of three modes (DATA_SOURCE_MODE):
+- live: calls go straight to the connector
+- record: calls go to the connector, and each request, response and its
+  timing is appended to the source's cassette, CASSETTE_DIR/<source>.jsonl
+- replay: calls are answered from the cassette and never touch the network.
+  Latency is the recorded one times REPLAY_LATENCY_SCALE (0 = instant), and
+  REPLAY_ERROR_RATE of calls fail with DataSourceError, drawn from a
+  REPLAY_SEED-seeded stream so a single-threaded run is reproducible
+
+Requests are matched by a fingerprint of their JSON-serializable
+parameters. A request recorded several times replays its takes in turn; an
+unrecorded request raises CassetteMiss. Streamed responses keep the offset
+of every chunk, so replays reproduce time to first token as well as total
+latency.
+"""
+import json
+import os
+import random
+import threading
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.config import settings
+from app.executor import make_key
+
+LIVE, RECORD, REPLAY = "live", "record", "replay"
+
+
+class DataSourceError(Exception):
+    """A data-source call failed (recorded or injected in replay)"""
+
+    def __init__(self, source: str, message: str):
+        super().__init__(f"{source}: {message}")
+        self.source = source
+
+
+class CassetteMiss(DataSourceError):
+    """Replay found no recording of the request"""
+
+
+class Cassette:
+    """Recorded interactions of one source: a JSON-lines file, loaded into memory by fingerprint"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._takes: Dict[str, List[Dict[str, Any]]] = {}
+        self._next: Dict[str, int] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._takes.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(takes) for takes in self._takes.values())
+
+    def append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, default=str) + "\n"
+        with self._lock:
+            self._takes.setdefault(entry["key"], []).append(entry)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line)
+
+    def take(self, key: str) -> Optional[Dict[str, Any]]:
+        """Next recording of a request, cycling through its takes"""
+        with self._lock:
+            takes = self._takes.get(key)
+            if not takes:
+                return None
+            index = self._next.get(key, 0)
+            self._next[key] = index + 1
+            return takes[index % len(takes)]
+
+
+class DataSource:
+    """
+    One external source behind record/replay. The live connector call is
+    passed per request (`fetch`), so one DataSource (and its cassette and
+    error stream) can be shared by every client in the process.
+    """
+
+    def __init__(self, name: str, mode: Optional[str] = None, cassette_dir: Optional[str] = None,
+                 latency_scale: Optional[float] = None, error_rate: Optional[float] = None,
+                 seed: Optional[int] = None, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.name = name
+        self.mode = mode or settings.DATA_SOURCE_MODE
+        if self.mode not in (LIVE, RECORD, REPLAY):
+            raise ValueError(f"Unknown data source mode: {self.mode}")
+        self.latency_scale = settings.REPLAY_LATENCY_SCALE if latency_scale is None else latency_scale
+        self.error_rate = settings.REPLAY_ERROR_RATE if error_rate is None else error_rate
+        self.clock, self.sleep = clock, sleep
+        self.cassette = (Cassette(os.path.join(cassette_dir or settings.CASSETTE_DIR, f"{name}.jsonl"))
+                         if self.mode != LIVE else None)
+        self._rng = random.Random(f"{settings.REPLAY_SEED if seed is None else seed}:{name}")
+        self._rng_lock = threading.Lock()
+
+    def key(self, request: Dict[str, Any]) -> str:
+        return make_key("data_source", self.name, request)
+
+    # ---- single responses ----
+
+    def call(self, request: Dict[str, Any], fetch: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Any:
+        """The connector's response to `request` (JSON-serializable), live or from the cassette"""
+        if self.mode == REPLAY:
+            entry = self._replay_entry(request)
+            self.sleep(entry["latency"] * self.latency_scale)
+            if "error" in entry:
+                raise DataSourceError(self.name, entry["error"])
+            return entry["response"]
+        if fetch is None:
+            raise DataSourceError(self.name, f"no live connector in {self.mode} mode")
+        if self.mode == LIVE:
+            return fetch(request)
+        started = self.clock()
+        try:
+            response = fetch(request)
+        except Exception as e:
+            self._record(request, started, error=f"{type(e).__name__}: {e}")
+            raise
+        self._record(request, started, response=response)
+        return response
+
+    # ---- streamed responses ----
+
+    def stream(self, request: Dict[str, Any],
+               fetch: Optional[Callable[[Dict[str, Any]], Iterable[Any]]] = None) -> Iterator[Any]:
+        """Like call() for a streamed response; replays pace each chunk at its recorded offset"""
+        if self.mode == REPLAY:
+            return self._replay_stream(self._replay_entry(request))
+        if fetch is None:
+            raise DataSourceError(self.name, f"no live connector in {self.mode} mode")
+        if self.mode == LIVE:
+            return iter(fetch(request))
+        return self._record_stream(request, fetch)
+
+    def _record_stream(self, request: Dict[str, Any], fetch: Callable[[Dict[str, Any]], Iterable[Any]]):
+        started = self.clock()
+        chunks = []
+        try:
+            for chunk in fetch(request):
+                chunks.append([round(self.clock() - started, 6), chunk])
+                yield chunk
+        except Exception as e:
+            self._record(request, started, chunks=chunks, error=f"{type(e).__name__}: {e}")
+            raise
+        self._record(request, started, chunks=chunks)
+
+    def _replay_stream(self, entry: Dict[str, Any]) -> Iterator[Any]:
+        started = self.clock()
+        for offset, chunk in entry.get("chunks", ()):
+            self._wait_until(started, offset)
+            yield chunk
+        self._wait_until(started, entry["latency"])
+        if "error" in entry:
+            raise DataSourceError(self.name, entry["error"])
+
+    # ---- helpers ----
+
+    def _wait_until(self, started: float, offset: float):
+        delay = started + offset * self.latency_scale - self.clock()
+        if delay > 0:
+            self.sleep(delay)
+
+    def _replay_entry(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self.cassette.take(self.key(request))
+        if entry is None:
+            raise CassetteMiss(self.name, f"no recording for request {self.key(request)[:12]}")
+        if self.error_rate:
+            with self._rng_lock:
+                failed = self._rng.random() < self.error_rate
+            if failed:
+                # Fail like a timed-out call: after the recorded latency, before any data
+                return {"latency": entry["latency"], "error": "injected failure"}
+        return entry
+
+    def _record(self, request: Dict[str, Any], started: float, **outcome: Any):
+        self.cassette.append({"key": self.key(request), "source": self.name, "request": request,
+                              "latency": round(self.clock() - started, 6), **outcome})
+
+
+@lru_cache()
+def get_data_source(name: str) -> DataSource:
+    """The process-wide DataSource for a connector, configured from settings"""
+    return DataSource(name)
+
+
+# ============= LLM (Groq / OpenAI-compatible) =============
+
+def stream_chunk(text: str) -> Any:
+    """A streamed completion chunk carrying `text`, shaped like Groq's"""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class LLMClient:
+    """
+    Groq/OpenAI-compatible client whose completions go through a DataSource.
+    Only the completion text is recorded; `connect` builds the real client
+    and is never called in replay mode.
+    """
+
+    def __init__(self, source: DataSource, connect: Optional[Callable[[], Any]] = None):
+        self.source = source
+        self._connect = connect
+        self._client = None
+        self.chat = SimpleNamespace(completions=self)
+
+    def _live(self) -> Any:
+        if self._client is None:
+            self._client = self._connect()
+        return self._client
+
+    def create(self, **request: Any) -> Any:
+        live = self._connect is not None
+        if request.get("stream"):
+            chunks = self.source.stream(request, self._fetch_stream if live else None)
+            return (stream_chunk(text) for text in chunks)
+        text = self.source.call(request, self._fetch if live else None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    def _fetch(self, request: Dict[str, Any]) -> str:
+        return self._live().chat.completions.create(**request).choices[0].message.content
+
+    def _fetch_stream(self, request: Dict[str, Any]) -> Iterator[str]:
+        for chunk in self._live().chat.completions.create(**request):
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
+
+def llm_client(connect: Callable[[], Any], source: str = "groq") -> Any:
+    """The real client in live mode, otherwise one recording to / replaying from the source's cassette"""
+    data_source = get_data_source(source)
+    if data_source.mode == LIVE:
+        return connect()
+    return LLMClient(data_source, connect)
@@ -0,0 +1,52 @@
+"""
+Memory per 100k leads: plain dicts vs slotted Lead records vs a columnar LeadBatch.
+
+Usage: python -m benchmarks.bench_lead_memory [n_leads]
+"""
+import json
+import sys
+import tracemalloc
+
+from app.leads import Lead, LeadBatch
+
+INDUSTRIES = ["Healthcare", "SaaS", "Real Estate", "Hospitality", "Education"]
+LOCATIONS = ["Viman Nagar, Pune, India", "Baner, Pune, India", "San Francisco, CA", "New York, NY"]
+
+
+def raw_leads(n: int):
+    # Decode from JSON like discovery does, so repeated strings are not shared
+    for i in range(n):
+        yield json.loads(json.dumps({
+            "name": f"Lead {i}",
+            "email": f"lead{i}@company{i % 1000}.com",
+            "company": f"Company {i % 1000}",
+            "title": "Dentist" if i % 2 else "Founder & CEO",
+            "industry": INDUSTRIES[i % len(INDUSTRIES)],
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "engagement_score": 0.5 + (i % 45) / 100,
+            "source": "ai_search",
+            "conversion_probability": 0.44,
+        }))
+
+
+def measure(label: str, build, n: int):
+    tracemalloc.start()
+    obj = build(n)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {current / 1e6:8.1f} MB  ({current / n:6.0f} B/lead)")
+    del obj
+    return current
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{n} leads")
+    dicts = measure("dict per lead", lambda k: list(raw_leads(k)), n)
+    records = measure("slotted Lead", lambda k: [Lead.from_dict(d) for d in raw_leads(k)], n)
+    batch = measure("columnar LeadBatch", lambda k: LeadBatch.from_leads(raw_leads(k)), n)
+    print(f"reduction vs dicts: Lead {dicts / records:.1f}x, LeadBatch {dicts / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark the incremental lead parser against json.loads on large LLM responses.
+
+Usage: python -m benchmarks.bench_lead_parser [n_leads] [chunk_size]
+"""
+import json
+import sys
+import time
+
+from app.components import IncrementalJSONArrayParser
+
+
+def make_response(n_leads: int) -> str:
+    leads = [
+        {
+            "query_index": i % 4,
+            "name": f"Lead {i}",
+            "email": f"lead{i}@clinic{i % 97}.in",
+            "company": f"Smile Care \"Dental\" Clinic {i % 97}",
+            "title": "Dentist",
+            "industry": "Healthcare",
+            "location": "Viman Nagar, Pune, India",
+            "engagement_score": 0.85,
+        }
+        for i in range(n_leads)
+    ]
+    return "```json\n" + json.dumps(leads, indent=2) + "\n```"
+
+
+def chunked(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def main():
+    n_leads = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    text = make_response(n_leads)
+    chunks = chunked(text, chunk_size)
+
+    # Baseline: accumulate the full completion, then parse once
+    start = time.perf_counter()
+    body = "".join(chunks)
+    baseline = json.loads(body[body.index("["):body.rindex("]") + 1])
+    baseline_total = time.perf_counter() - start
+
+    parser = IncrementalJSONArrayParser()
+    start = time.perf_counter()
+    first = None
+    count = 0
+    for chunk in chunks:
+        leads = parser.feed(chunk)
+        if leads and first is None:
+            first = time.perf_counter() - start
+        count += len(leads)
+    incremental_total = time.perf_counter() - start
+
+    assert count == len(baseline) and parser.errors == 0
+    print(f"response: {len(text) / 1e6:.1f} MB, {n_leads} leads, {len(chunks)} chunks of {chunk_size}B")
+    print(f"json.loads (after full stream): total {baseline_total * 1000:.1f} ms")
+    print(f"incremental parser:             total {incremental_total * 1000:.1f} ms, "
+          f"first lead after {first * 1e6:.0f} us of parsing "
+          f"({incremental_total / n_leads * 1e6:.2f} us/lead)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Lead search latency on SQLite FTS5 (trigram): exact, prefix, typo and deep-page
+queries over a generated corpus.
+
+Usage: python -m benchmarks.bench_lead_search [n_leads]
+"""
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.lead_search import ensure_search_index, search_leads
+from app.lead_store import upsert_leads
+from app.leads import Lead
+
+WORDS = ["Smile", "Bright", "Care", "Prime", "Metro", "Lotus", "Cloud", "Peak", "Green", "Blue",
+         "Nova", "Apex", "Urban", "Royal", "Sunrise", "Harbor", "Summit", "Pioneer", "Vertex", "Zen"]
+KINDS = ["Dental Clinic", "Software", "Realty", "Bistro", "Academy", "Fitness", "Pharmacy", "Logistics"]
+INDUSTRIES = ["Healthcare", "SaaS", "Real Estate", "Hospitality", "Education", "Fitness", "Retail"]
+TITLES = ["Dentist", "Founder & CEO", "Owner", "CTO", "Director", "Manager"]
+QUERIES = ["dental", "dent", "software cto", "sunrise fitness", "pharmcy", "harbour logistics"]
+
+
+def make_leads(n: int):
+    for i in range(n):
+        yield Lead(
+            name=f"Person {i}", email=f"p{i}@c{i}.com",
+            company=f"{WORDS[i % 20]} {WORDS[(i // 20) % 20]} {KINDS[i % len(KINDS)]} {i % 997}",
+            title=TITLES[i % len(TITLES)], industry=INDUSTRIES[i % len(INDUSTRIES)],
+            conversion_probability=(i % 100) / 100,
+        )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{workdir}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        ensure_search_index(engine)
+        db = sessionmaker(bind=engine)()
+        start = time.perf_counter()
+        leads = list(make_leads(n))
+        for i in range(0, n, 50_000):
+            upsert_leads(db, "bench", leads[i:i + 50_000])
+        print(f"{n} leads indexed in {time.perf_counter() - start:.1f} s")
+
+        for query in QUERIES:
+            for page in (1, 10):
+                times = []
+                for _ in range(5):
+                    t = time.perf_counter()
+                    result = search_leads(db, "bench", query, page=page, page_size=20)
+                    times.append((time.perf_counter() - t) * 1000)
+                mode = "fuzzy" if result.fuzzy else "exact"
+                print(f"{query!r:<22} page {page:<3} {mode:<6} {statistics.median(times):8.1f} ms  "
+                      f"({len(result.hits)} hits)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Lead ingestion into SQLite: per-row ORM add + flush vs lead_store.upsert_leads,
+then a second upsert of the same run (all conflicts).
+
+Usage: python -m benchmarks.bench_lead_store [n_leads]
+       DATABASE_URL=postgresql://... python -m benchmarks.bench_lead_store  # COPY path
+"""
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.lead_store import lead_rows, upsert_leads
+from app.leads import Lead
+from app.models import LeadRecord
+
+INDUSTRIES = ["Healthcare", "SaaS", "Real Estate", "Hospitality", "Education"]
+LOCATIONS = ["Viman Nagar, Pune, India", "Baner, Pune, India", "San Francisco, CA", "New York, NY"]
+
+
+def make_leads(n: int):
+    return [
+        Lead(name=f"Lead {i}", email=f"lead{i}@company{i % 1000}.com", company=f"Company {i % 1000}",
+             title="Dentist" if i % 2 else "Founder & CEO", industry=INDUSTRIES[i % len(INDUSTRIES)],
+             location=LOCATIONS[i % len(LOCATIONS)], engagement_score=0.5 + (i % 45) / 100)
+        for i in range(n)
+    ]
+
+
+def timed(label: str, fn, n: int):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:7.2f} s  ({n / elapsed:9.0f} leads/s)")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    leads = make_leads(n)
+    with tempfile.TemporaryDirectory() as workdir:
+        url = os.getenv("DATABASE_URL") or f"sqlite:///{workdir}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        print(f"{n} leads -> {engine.dialect.name}")
+
+        orm_n = min(n, 10_000)
+
+        def orm_rows():
+            db = Session()
+            for row in lead_rows("bench-orm", leads[:orm_n]):
+                db.add(LeadRecord(**row))
+                db.flush()
+            db.commit()
+
+        orm = timed(f"ORM add+flush ({orm_n})", orm_rows, orm_n) * n / orm_n
+        fresh = timed("upsert_leads (insert)", lambda: upsert_leads(Session(), "bench", leads), n)
+        timed("upsert_leads (all conflict)", lambda: upsert_leads(Session(), "bench", leads), n)
+        print(f"speedup vs ORM (extrapolated to {n}): {orm / fresh:.0f}x")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+pytest-benchmark microbenchmarks for The Hunter backend.
+
+Run explicitly (not part of the regular test run):
+    pytest benchmarks/bench_micro.py --benchmark-storage=benchmarks/baselines --benchmark-autosave
+    pytest benchmarks/bench_micro.py --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pytest_benchmark")
+
+from app import schemas
+from app.components import deduplicate_leads, score_leads
+from app.database import Base
+from app.leads import LeadBatch
+from app.ml.feature_extractor import extract_feature_matrix
+from app.old_services import CalculationService
+
+INDUSTRIES = ["Healthcare", "SaaS", "Real Estate", "Hospitality"]
+TITLES = ["Dentist", "Founder & CEO", "VP of Product", "Office Manager"]
+
+
+def make_leads(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Lead {i}",
+            "email": f"lead{rng.randrange(n)}@clinic{i % 50}.in",
+            "company": f"Clinic {i % 50}",
+            "title": rng.choice(TITLES),
+            "industry": rng.choice(INDUSTRIES),
+            "location": "Viman Nagar, Pune, India",
+            "engagement_score": round(rng.uniform(0.5, 0.95), 2),
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(scope="module")
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_calculate(benchmark):
+    assert benchmark(CalculationService.calculate, 20.0, 4.0, "divide") == 5.0
+
+
+def test_create_calculation_sqlite(benchmark, db):
+    request = schemas.CalculationCreate(operation="add", operand1=5, operand2=3)
+    assert benchmark(CalculationService.create_calculation, db, request).result == 8
+
+
+def test_get_calculations_sqlite(benchmark, db):
+    request = schemas.CalculationCreate(operation="multiply", operand1=2, operand2=3)
+    for _ in range(200):
+        CalculationService.create_calculation(db, request)
+    assert len(benchmark(CalculationService.get_calculations, db, 0, 100)) == 100
+
+
+def test_deduplicate_1k_leads(benchmark):
+    leads = make_leads(1000)
+    assert len(benchmark(deduplicate_leads, leads)) <= 1000
+
+
+def test_feature_matrix_1k_leads(benchmark):
+    pytest.importorskip("numpy")
+    batch = LeadBatch.from_leads(make_leads(1000))
+    matrix = benchmark(extract_feature_matrix, batch, {"location": "pune", "industry": "healthcare"})
+    assert matrix.shape == (1000, 10)
+
+
+@pytest.mark.parametrize("n_leads", [5, 1000])
+def test_score_leads(benchmark, n_leads):
+    np = pytest.importorskip("numpy")
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 10))
+    model = ensemble.RandomForestClassifier(n_estimators=100, max_depth=10, random_state=0)
+    model.fit(X, X[:, 0] > 0.5)
+    batch = LeadBatch.from_leads(make_leads(n_leads))
+    predict = lambda m: model.predict_proba(m)[:, 1]
+    assert len(benchmark(score_leads, batch, predict)) == n_leads
+
+
+@pytest.mark.parametrize("n_leads", [5, 1000])
+def test_score_leads_compiled_forest(benchmark, n_leads):
+    np = pytest.importorskip("numpy")
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    from app.ml.compiled_forest import compile_forest
+
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 10))
+    model = ensemble.RandomForestClassifier(n_estimators=100, max_depth=10, random_state=0)
+    model.fit(X, X[:, 0] > 0.5)
+    forest = compile_forest(model)
+    batch = LeadBatch.from_leads(make_leads(n_leads))
+    assert len(benchmark(score_leads, batch, forest.predict_proba)) == n_leads
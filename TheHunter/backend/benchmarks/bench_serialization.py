@@ -0,0 +1,65 @@
+"""
+Serialization time for 10k-item list responses: FastAPI's default path
+(response_model validation + stdlib json) vs the orjson fast path.
+
+Usage: python -m benchmarks.bench_serialization [n_items]
+"""
+import json
+import sys
+import time
+from datetime import datetime
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models import Calculation
+from app.schemas import CalculationResponse
+from app.serializers import leads_response, list_response, serialize_calculation
+
+
+def best_of(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    rows = [
+        Calculation(id=i, operation="add", operand1=i, operand2=2.5, result=i + 2.5,
+                    created_at=datetime(2025, 12, 14, 18, 1, i % 60))
+        for i in range(n)
+    ]
+    adapter = TypeAdapter(List[CalculationResponse])
+
+    def default_path():
+        value = adapter.validate_python(rows, from_attributes=True)
+        content = jsonable_encoder(adapter.dump_python(value, mode="json"))
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    def fast_path():
+        return list_response(rows, serialize_calculation).body
+
+    assert json.loads(default_path()) == json.loads(fast_path())
+    default_ms, fast_ms = best_of(default_path), best_of(fast_path)
+    print(f"{n} calculation rows: default {default_ms:.1f} ms, orjson fast path {fast_ms:.1f} ms "
+          f"({default_ms / fast_ms:.1f}x)")
+
+    leads = [
+        {"name": f"Lead {i}", "email": f"lead{i}@clinic.in", "company": "Smile Care", "title": "Dentist",
+         "industry": "Healthcare", "location": "Viman Nagar, Pune", "engagement_score": 0.85,
+         "source": "ai_search", "conversion_probability": 0.44}
+        for i in range(n)
+    ]
+    stdlib_ms = best_of(lambda: json.dumps(jsonable_encoder(leads)).encode())
+    orjson_ms = best_of(lambda: leads_response(leads).body)
+    print(f"{n} leads: jsonable_encoder + json {stdlib_ms:.1f} ms, orjson via LeadBatch {orjson_ms:.1f} ms "
+          f"({stdlib_ms / orjson_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
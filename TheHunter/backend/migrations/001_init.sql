@@ -0,0 +1,60 @@
+-- 001_init.sql
+-- Base schema for The Hunter on PostgreSQL.
+-- SQLite development databases get the same tables (unpartitioned) from
+-- Base.metadata.create_all at startup.
+
+CREATE TABLE IF NOT EXISTS calculations (
+    id          SERIAL PRIMARY KEY,
+    operation   VARCHAR,
+    operand1    DOUBLE PRECISION,
+    operand2    DOUBLE PRECISION,
+    result      DOUBLE PRECISION,
+    created_at  TIMESTAMP DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_calculations_id ON calculations (id);
+CREATE INDEX IF NOT EXISTS ix_calculations_operation ON calculations (operation);
+CREATE INDEX IF NOT EXISTS ix_calculations_created_at ON calculations (created_at);
+
+-- Leads: one row per (tenant, dedup key), bulk-upserted by app/lead_store.py.
+-- Hash-partitioned by tenant so a tenant's upserts, listings and deletes
+-- touch one partition; the dedup constraint includes the partition key, as
+-- Postgres requires for unique constraints on partitioned tables.
+CREATE TABLE IF NOT EXISTS leads (
+    id                      BIGSERIAL,
+    tenant_id               TEXT NOT NULL,
+    dedup_key               TEXT NOT NULL,
+    name                    TEXT NOT NULL DEFAULT '',
+    email                   TEXT NOT NULL DEFAULT '',
+    company                 TEXT NOT NULL DEFAULT '',
+    title                   TEXT NOT NULL DEFAULT '',
+    industry                TEXT NOT NULL DEFAULT '',
+    location                TEXT NOT NULL DEFAULT '',
+    source                  TEXT NOT NULL DEFAULT 'ai_search',
+    query                   TEXT,
+    engagement_score        DOUBLE PRECISION NOT NULL DEFAULT 0.5,
+    conversion_probability  DOUBLE PRECISION,
+    extra                   JSONB,
+    latitude                DOUBLE PRECISION,
+    longitude               DOUBLE PRECISION,
+    geohash                 TEXT,
+    discovered_at           TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at              TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (tenant_id, id),
+    CONSTRAINT uq_leads_tenant_dedup UNIQUE (tenant_id, dedup_key)
+) PARTITION BY HASH (tenant_id);
+
+DO $$
+BEGIN
+    FOR i IN 0..15 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS leads_p%s PARTITION OF leads FOR VALUES WITH (MODULUS 16, REMAINDER %s)',
+            i, i
+        );
+    END LOOP;
+END $$;
+
+-- Newest leads of a tenant, and best-scored leads of a tenant
+CREATE INDEX IF NOT EXISTS ix_leads_tenant_discovered ON leads (tenant_id, discovered_at DESC);
+CREATE INDEX IF NOT EXISTS ix_leads_tenant_probability ON leads (tenant_id, conversion_probability DESC NULLS LAST);
+-- Radius / bounding-box search: geohash LIKE 'cell%' prefix scans within a tenant (text_pattern_ops: LIKE can use the index under any collation)
+CREATE INDEX IF NOT EXISTS ix_leads_tenant_geohash ON leads (tenant_id, geohash text_pattern_ops);
@@ -0,0 +1,20 @@
+-- 006_lead_search.sql
+-- Lead search on PostgreSQL (app/lead_search.py). SQLite builds an FTS5
+-- trigram index at startup instead (ensure_search_index).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE leads
+    ADD COLUMN IF NOT EXISTS search_text TEXT GENERATED ALWAYS AS (
+        lower(company || ' ' || title || ' ' || industry || ' ' || name)
+    ) STORED,
+    ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', company), 'A') ||
+        setweight(to_tsvector('simple', title || ' ' || industry), 'B') ||
+        setweight(to_tsvector('simple', name), 'C')
+    ) STORED;
+
+-- Substring, prefix and typo-tolerant (word_similarity) matching
+CREATE INDEX IF NOT EXISTS ix_leads_search_trgm ON leads USING gin (search_text gin_trgm_ops);
+-- Whole-word matching and ts_rank
+CREATE INDEX IF NOT EXISTS ix_leads_search_tsv ON leads USING gin (search_tsv);
@@ -0,0 +1,13 @@
+-- 007_lead_feedback.sql
+-- Outcomes reported for stored leads (training labels for the scorer).
+
+CREATE TABLE IF NOT EXISTS lead_feedback (
+    id          BIGSERIAL PRIMARY KEY,
+    tenant_id   TEXT NOT NULL,
+    dedup_key   TEXT NOT NULL,
+    outcome     TEXT NOT NULL,
+    converted   BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at  TIMESTAMP NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_lead_feedback_tenant_lead ON lead_feedback (tenant_id, dedup_key);
+CREATE INDEX IF NOT EXISTS ix_lead_feedback_created ON lead_feedback (created_at);
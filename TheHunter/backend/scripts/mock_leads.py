@@ -0,0 +1,236 @@
+"""
+Deterministic synthetic data at production scale: users, subscriptions and
+API keys (AgentsHome schema), leads and lead feedback (The Hunter schema).
+
+Everything is a generator, so millions of rows stream in constant memory,
+and the same seed and sizes always give the same rows:
+- ids come from a hash of (seed, kind, index), so any row's id can be
+  derived without generating the others (leads reference tenant user ids)
+- timestamps are offsets from a fixed ANCHOR, not from today
+- each kind draws from its own seeded random stream, so changing the number
+  of leads does not change the users
+
+Every mock user's password is MOCK_PASSWORD. Every API key shares one bcrypt
+hash, of MOCK_API_KEY, because hashing millions of keys would take hours.
+
+Usage (from TheHunter/backend), JSON lines on stdout:
+    python -m scripts.mock_leads leads 1000000 --users 10000 --seed 7 > leads.jsonl
+    python -m scripts.mock_leads users 10000
+"""
+import argparse
+import hashlib
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.leads import Lead
+
+ANCHOR = datetime(2025, 1, 1)
+MOCK_PASSWORD = "mock-password"
+MOCK_API_KEY = "sk_mock00000000000000000000000000000"
+_PASSWORD_HASH = "$2b$12$xz08ErlMA8GACtI6dH4dcOV95rM5EO3gJ5BpDRVm55sLHWt.XGW/2"
+_API_KEY_HASH = "$2b$12$mrHyUarkaU8CVTE2P0HC7.oorejyAwClU9zp7ARANKSEeKe15nYLy"
+
+FIRST = ["Aarav", "Priya", "Rohan", "Ananya", "Vikram", "Meera", "Arjun", "Kavya", "Rahul", "Sneha",
+         "James", "Emma", "Liam", "Olivia", "Noah", "Ava", "Lucas", "Mia", "Ethan", "Sofia"]
+LAST = ["Sharma", "Patel", "Iyer", "Reddy", "Kulkarni", "Deshmukh", "Nair", "Joshi", "Gupta", "Mehta",
+        "Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Wilson", "Moore", "Taylor", "Clark"]
+WORDS = ["Smile", "Bright", "Care", "Prime", "Metro", "Lotus", "Cloud", "Peak", "Green", "Blue",
+         "Nova", "Apex", "Urban", "Royal", "Sunrise", "Harbor", "Summit", "Pioneer", "Vertex", "Zen"]
+# (company kind, industry, titles)
+KINDS = [
+    ("Dental Clinic", "Healthcare", ["Dentist", "Owner", "Practice Manager"]),
+    ("Software", "SaaS", ["Founder & CEO", "CTO", "VP Engineering", "Engineering Manager"]),
+    ("Realty", "Real Estate", ["Broker", "Owner", "Sales Director"]),
+    ("Bistro", "Hospitality", ["Owner", "General Manager", "Head Chef"]),
+    ("Academy", "Education", ["Director", "Principal", "Admissions Lead"]),
+    ("Fitness", "Fitness", ["Owner", "Head Coach", "Studio Manager"]),
+    ("Pharmacy", "Retail", ["Pharmacist", "Store Manager", "Owner"]),
+    ("Logistics", "Logistics", ["Operations Head", "Fleet Manager", "Founder"]),
+]
+LOCATIONS = ["Viman Nagar, Pune", "Baner, Pune", "Koregaon Park, Pune", "Kothrud, Pune", "Hinjewadi, Pune",
+             "Pune", "Andheri, Mumbai", "Bandra, Mumbai", "Powai, Mumbai", "Mumbai", "Indiranagar, Bangalore",
+             "Koramangala, Bangalore", "Bangalore", "Hyderabad", "Delhi", "Chennai", "Remote"]
+SOURCES = ["ai_search", "google_maps", "linkedin", "yelp", "website"]
+TIERS = [("free", 0.70, 1000), ("pro", 0.25, 10000), ("enterprise", 0.05, 100000)]  # (tier, share, quota)
+OUTCOMES = ["converted", "replied", "no_response", "rejected"]
+
+
+def mock_id(seed: int, kind: str, index: int) -> str:
+    """Stable UUID for row `index` of a kind"""
+    digest = hashlib.blake2b(f"{seed}:{kind}:{index}".encode(), digest_size=16).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+def _rng(seed: int, kind: str) -> random.Random:
+    return random.Random(f"{seed}:{kind}")
+
+
+def _pick_tier(rng: random.Random) -> Tuple[str, int]:
+    r, total = rng.random(), 0.0
+    for tier, share, quota in TIERS:
+        total += share
+        if r < total:
+            return tier, quota
+    return TIERS[-1][0], TIERS[-1][2]
+
+
+# ============= ACCOUNTS (AgentsHome) =============
+
+def iter_users(n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    rng = _rng(seed, "users")
+    for i in range(n):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        created = ANCHOR - timedelta(seconds=rng.randrange(730 * 86400))
+        yield {
+            "id": mock_id(seed, "user", i), "email": f"{first}.{last}.{i}@example.com".lower(),
+            "name": f"{first} {last}", "password_hash": _PASSWORD_HASH, "provider": "email",
+            "provider_id": None, "is_active": rng.random() > 0.02, "created_at": created, "updated_at": created,
+        }
+
+
+def iter_subscriptions(n_users: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Every user subscribes to hunter; about a third also to agent2"""
+    rng = _rng(seed, "subscriptions")
+    index = 0
+    for i in range(n_users):
+        user_id = mock_id(seed, "user", i)
+        for agent_id in ("hunter", "agent2") if rng.random() < 0.33 else ("hunter",):
+            tier, quota = _pick_tier(rng)
+            status = "active" if rng.random() < 0.9 else rng.choice(["cancelled", "suspended", "expired"])
+            created = ANCHOR - timedelta(seconds=rng.randrange(365 * 86400))
+            yield {
+                "id": mock_id(seed, "subscription", index), "user_id": user_id, "agent_id": agent_id,
+                "plan_tier": tier, "status": status, "api_quota": quota,
+                "api_used": int(quota * rng.random() ** 2),
+                "renewal_date": ANCHOR + timedelta(seconds=rng.randrange(30 * 86400)),
+                "created_at": created, "updated_at": created,
+            }
+            index += 1
+
+
+def iter_api_keys(n_users: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """0-3 keys per user; all share the hash of MOCK_API_KEY"""
+    rng = _rng(seed, "api_keys")
+    index = 0
+    for i in range(n_users):
+        user_id = mock_id(seed, "user", i)
+        for k in range(rng.choice((0, 1, 1, 2, 3))):
+            created = ANCHOR - timedelta(seconds=rng.randrange(365 * 86400))
+            expires = created + timedelta(days=365) if rng.random() < 0.5 else None
+            yield {
+                "id": mock_id(seed, "api_key", index), "user_id": user_id, "agent_id": "hunter",
+                "key_hash": _API_KEY_HASH, "name": f"Key {k + 1}", "is_active": rng.random() > 0.1,
+                "last_used": created + timedelta(seconds=rng.randrange(86400 * 30)) if rng.random() < 0.7 else None,
+                "created_at": created, "expires_at": expires,
+            }
+            index += 1
+
+
+# ============= LEADS & FEEDBACK (The Hunter) =============
+
+def tenant_sizes(n_leads: int, n_tenants: int, skew: float = 1.1) -> List[int]:
+    """Leads per tenant following a Zipf-like law: a few large tenants, a long tail"""
+    weights = [1 / (t + 1) ** skew for t in range(n_tenants)]
+    total = sum(weights)
+    bounds = [round(n_leads * c / total) for c in accumulate(weights)]
+    return [b - a for a, b in zip([0] + bounds[:-1], bounds)]
+
+
+def iter_leads(n_leads: int, n_tenants: int, seed: int = 0) -> Iterator[Tuple[str, Lead]]:
+    """(tenant id, lead), grouped by tenant; tenant t is mock user t"""
+    rng = _rng(seed, "leads")
+    choice, random_ = rng.choice, rng.random
+    index = 0
+    for tenant, size in enumerate(tenant_sizes(n_leads, n_tenants)):
+        tenant_id = mock_id(seed, "user", tenant)
+        for _ in range(size):
+            first, last = choice(FIRST), choice(LAST)
+            kind, industry, titles = choice(KINDS)
+            company = " ".join(rng.sample(WORDS, 2) + [kind])
+            location = choice(LOCATIONS)
+            age = int(random_() ** 2 * 365)
+            yield tenant_id, Lead(
+                name=f"{first} {last}",
+                email=f"{first}.{last}.{index}@{company.replace(' ', '').lower()}.com".lower(),
+                company=company, title=choice(titles), industry=industry, location=location,
+                source=choice(SOURCES), query=f"{kind.lower()} in {location.split(', ')[-1]}",
+                engagement_score=round(rng.betavariate(2, 3), 3),
+                extra={"company_size_fit": round(random_(), 2), "lead_age_days": age,
+                       "feedback_count": 0, "previous_conversion_rate": round(random_() * 0.3, 3)},
+            )
+            index += 1
+
+
+def get_mock_leads(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """A small batch of lead dicts for a search query, stable per query; source is "mock\""""
+    seed = int.from_bytes(hashlib.blake2b(query.encode(), digest_size=4).digest(), "big")
+    leads = []
+    for _, lead in iter_leads(limit, 1, seed):
+        lead.source, lead.query = "mock", query
+        leads.append(lead.to_dict())
+    return leads
+
+
+def feedback_for(tenant_id: str, lead: Lead, rng: random.Random,
+                 rate: float = 0.05) -> List[Dict[str, Any]]:
+    """
+    Outcomes for about `rate` of leads. Conversion odds rise with engagement
+    and seniority, so a scorer trained on the data has signal to find.
+    """
+    if rng.random() >= rate:
+        return []
+    senior = any(w in lead.title for w in ("Owner", "Founder", "CEO", "CTO", "Director", "Head"))
+    p = 0.05 + 0.5 * lead.engagement_score + (0.2 if senior else 0.0)
+    rows = []
+    for _ in range(1 + (rng.random() < 0.3)):
+        converted = rng.random() < p
+        outcome = "converted" if converted else rng.choice(OUTCOMES[1:])
+        rows.append({"tenant_id": tenant_id, "dedup_key": lead.dedup_key, "outcome": outcome,
+                     "converted": converted,
+                     "created_at": ANCHOR - timedelta(seconds=rng.randrange(90 * 86400))})
+    return rows
+
+
+def iter_feedback(n_leads: int, n_tenants: int, seed: int = 0, rate: float = 0.05) -> Iterator[Dict[str, Any]]:
+    rng = _rng(seed, "feedback")
+    for tenant_id, lead in iter_leads(n_leads, n_tenants, seed):
+        yield from feedback_for(tenant_id, lead, rng, rate)
+
+
+# ============= CLI =============
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Stream deterministic mock rows as JSON lines")
+    parser.add_argument("kind", choices=["users", "subscriptions", "api_keys", "leads", "feedback"])
+    parser.add_argument("count", type=int, help="users (account kinds) or leads (lead kinds)")
+    parser.add_argument("--users", type=int, default=1000, help="tenants that own the leads")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.kind in ("leads", "feedback"):
+        n_tenants = min(args.users, max(args.count, 1))
+        if args.kind == "leads":
+            rows = ({"tenant_id": t, **lead.to_dict()} for t, lead in iter_leads(args.count, n_tenants, args.seed))
+        else:
+            rows = iter_feedback(args.count, n_tenants, args.seed)
+    else:
+        rows = {"users": iter_users, "subscriptions": iter_subscriptions,
+                "api_keys": iter_api_keys}[args.kind](args.count, args.seed)
+    write = sys.stdout.write
+    for row in rows:
+        write(json.dumps(row, default=_json_default) + "\n")
+
+
+if __name__ == "__main__":
+    main()
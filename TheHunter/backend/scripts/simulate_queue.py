@@ -0,0 +1,138 @@
+"""
+Replay a synthetic recipe-job trace against the worker pool scheduler and
+report queueing latency per tier and job kind.
+
+The default trace is the starvation case: one enterprise tenant drops a
+batch of 5,000 hunts at t=0 while pro and free tenants keep submitting
+interactive hunts. It is replayed twice, through a single FIFO and through
+FairScheduler (app/queue.py), on the same simulated worker pool.
+
+Usage (from TheHunter/backend):
+    python -m scripts.simulate_queue
+    python -m scripts.simulate_queue --workers 16 --flood 20000 --duration 3600 --seed 7
+"""
+import argparse
+import heapq
+import random
+import statistics
+import time
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple
+
+from app.queue import BATCH, INTERACTIVE, FairScheduler, Job
+
+SOURCES = {"google_maps": 20.0, "linkedin": 45.0, "yelp": 15.0, "llm": 10.0}  # mean seconds per job
+
+
+def make_trace(flood: int, duration: float, pro_tenants: int, free_tenants: int,
+               seed: int) -> List[Tuple[float, Job, float]]:
+    """(arrival time, job, run time), sorted by arrival"""
+    rng = random.Random(seed)
+    sources = list(SOURCES)
+    trace = []
+
+    def add(at: float, tenant: str, tier: str, kind: str):
+        source = rng.choice(sources)
+        run_time = rng.lognormvariate(0, 0.5) * SOURCES[source]
+        trace.append((at, Job(f"{tenant}-{len(trace)}", tenant, tier=tier, source=source, kind=kind,
+                              cost=SOURCES[source]), run_time))
+
+    for _ in range(flood):
+        add(0.0, "enterprise-1", "enterprise", BATCH)
+    for tier, tenants, per_hour in (("pro", pro_tenants, 20), ("free", free_tenants, 4)):
+        for t in range(tenants):
+            at = rng.expovariate(per_hour / 3600)
+            while at < duration:
+                add(at, f"{tier}-{t}", tier, INTERACTIVE if rng.random() < 0.8 else BATCH)
+                at += rng.expovariate(per_hour / 3600)
+    trace.sort(key=lambda item: item[0])
+    return trace
+
+
+class FifoQueue:
+    """The previous behaviour: one queue, first come first served, no caps"""
+
+    def __init__(self):
+        self._jobs = deque()
+
+    def submit(self, job: Job, now: float):
+        job.submitted_at = now
+        self._jobs.append(job)
+
+    def next_job(self, now: float):
+        return self._jobs.popleft() if self._jobs else None
+
+    def complete(self, job: Job):
+        pass
+
+
+def simulate(trace: List[Tuple[float, Job, float]], scheduler, workers: int) -> Dict[str, list]:
+    """Discrete-event replay; returns waits per tier/kind plus scheduler decision times"""
+    events = [(at, 0, i) for i, (at, _, _) in enumerate(trace)]  # (time, 0=arrival | 1=completion, index)
+    heapq.heapify(events)
+    free = workers
+    waits: Dict[str, list] = defaultdict(list)
+    decisions: List[float] = []
+    run_times = {id(job): run_time for _, job, run_time in trace}
+    by_id = {}
+    while events:
+        now, kind, index = heapq.heappop(events)
+        if kind == 0:
+            job = trace[index][1]
+            scheduler.submit(job, now=now)
+        else:
+            free += 1
+            scheduler.complete(by_id.pop(index))
+        while free:
+            started = time.perf_counter()
+            job = scheduler.next_job(now=now)
+            decisions.append(time.perf_counter() - started)
+            if job is None:
+                break
+            free -= 1
+            waits[f"{job.tier}/{job.kind}"].append(now - job.submitted_at)
+            by_id[id(job)] = job
+            heapq.heappush(events, (now + run_times[id(job)], 1, id(job)))
+    waits["_decisions"] = decisions
+    return waits
+
+
+def _pct(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def report(name: str, waits: Dict[str, list], interactive_deadline: float):
+    print(f"\n{name}")
+    print(f"  {'tier/kind':<22}{'jobs':>7}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}{'missed':>9}")
+    for key in sorted(k for k in waits if not k.startswith("_")):
+        values = waits[key]
+        missed = sum(w > interactive_deadline for w in values) if key.endswith(INTERACTIVE) else 0
+        print(f"  {key:<22}{len(values):>7}{statistics.median(values):>10.1f}{_pct(values, 0.95):>10.1f}"
+              f"{_pct(values, 0.99):>10.1f}{(f'{missed / len(values):.0%}' if missed else '-'):>9}")
+    decisions = waits["_decisions"]
+    print(f"  scheduler decision: mean {statistics.mean(decisions) * 1e6:.1f} us, "
+          f"p99 {_pct(decisions, 0.99) * 1e6:.1f} us over {len(decisions)} calls")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare FIFO and fair scheduling on a synthetic job trace")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--flood", type=int, default=5000, help="batch jobs the enterprise tenant submits at t=0")
+    parser.add_argument("--duration", type=float, default=3600, help="seconds of interactive traffic")
+    parser.add_argument("--pro-tenants", type=int, default=10)
+    parser.add_argument("--free-tenants", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    trace = make_trace(args.flood, args.duration, args.pro_tenants, args.free_tenants, args.seed)
+    print(f"{len(trace)} jobs, {args.workers} workers")
+    fair = FairScheduler()
+    deadline = fair.interactive_deadline
+    report("FIFO", simulate(trace, FifoQueue(), args.workers), deadline)
+    trace = make_trace(args.flood, args.duration, args.pro_tenants, args.free_tenants, args.seed)
+    report("FairScheduler", simulate(trace, fair, args.workers), deadline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Offline load test of the lead_hunt recipe: discovery replays LLM responses
+from a cassette (app/services/data_source.py), so runs need no network or
+API keys and are repeatable.
+
+Record a real cassette by running the worker with DATA_SOURCE_MODE=record,
+or synthesize one for this script's job set from mock leads, paced like a
+hosted LLM (time to first token, then a steady token rate):
+
+    python -m scripts.test_discovery --synthesize --jobs 200
+    python -m scripts.test_discovery --jobs 200 --concurrency 16 --latency-scale 0.1 --error-rate 0.05
+    python -m scripts.test_discovery --jobs 200 --profile /tmp/discovery.collapsed
+
+Failed runs are retried and resume from their checkpoint, as in the worker.
+Leads are stored in DATABASE_URL; point it at a scratch database.
+"""
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Tuple
+
+from service_kit.profiler import SamplingProfiler
+
+from app.components import discover_leads_batched
+from app.database import Base, engine
+from app.executor import StepCache
+from app.models import LeadRecord  # noqa: F401 (registers the table for create_all)
+from app.recipes import expand_queries, run_recipe
+from app.services.data_source import RECORD, REPLAY, DataSource, DataSourceError, LLMClient, stream_chunk
+from scripts.mock_leads import KINDS, LOCATIONS, get_mock_leads
+
+CITIES = sorted({location.split(", ")[-1] for location in LOCATIONS} - {"Remote"})
+
+
+def make_jobs(n: int, tenants: int, seed: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """(tenant_id, lead_hunt inputs); a few inputs repeat, as real traffic does"""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(n):
+        kind, industry, _ = rng.choice(KINDS)
+        jobs.append((f"tenant-{rng.randrange(tenants)}", {
+            "query": kind.lower(), "locations": sorted(rng.sample(CITIES, rng.randint(1, 4))),
+            "industry": industry, "per_query": 5,
+        }))
+    return jobs
+
+
+# ============= SYNTHETIC CASSETTE =============
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SyntheticLLM:
+    """
+    Stand-in for a live Groq client while synthesizing: streams mock leads
+    for the prompt's queries and advances a virtual clock instead of sleeping,
+    so the recorded timings model a hosted LLM without waiting for them.
+    """
+
+    def __init__(self, clock: VirtualClock, seed: int, ttft: float = 0.4, tokens_per_second: float = 250.0):
+        self.clock, self.rng = clock, random.Random(seed)
+        self.ttft, self.token_seconds = ttft, 1 / tokens_per_second
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages: List[Dict[str, str]], **_: Any) -> Iterator[Any]:
+        """Always streams, as discovery does"""
+        prompt = messages[-1]["content"]
+        per_query = int(re.search(r"Generate (\d+)", prompt).group(1))
+        queries = re.findall(r'^\d+\. "(.*)"$', prompt, re.MULTILINE)
+        leads = [dict(lead, query_index=i) for i, q in enumerate(queries) for lead in get_mock_leads(q, per_query)]
+        for lead in leads:
+            lead.pop("source"), lead.pop("query")
+        text = json.dumps(leads)
+        self.clock.now += self.rng.lognormvariate(0, 0.3) * self.ttft
+        for start in range(0, len(text), 4):  # ~4 characters per token
+            self.clock.now += self.token_seconds
+            yield stream_chunk(text[start:start + 4])
+
+
+def synthesize(jobs: List[Tuple[str, Dict[str, Any]]], cassette_dir: str, seed: int) -> int:
+    """Record the job set's LLM calls from SyntheticLLM; returns the number of recordings"""
+    clock = VirtualClock()
+    source = DataSource("groq", mode=RECORD, cassette_dir=cassette_dir, clock=clock)
+    if len(source.cassette):
+        raise SystemExit(f"{source.cassette.path} already exists; synthesize into an empty --cassettes dir")
+    client = LLMClient(source, lambda: SyntheticLLM(clock, seed))
+    seen = set()
+    for _, inputs in jobs:
+        queries = tuple(expand_queries(inputs))
+        if (queries, inputs["per_query"]) not in seen:
+            seen.add((queries, inputs["per_query"]))
+            for _ in discover_leads_batched(client, list(queries), inputs["per_query"]):
+                pass
+    return len(source.cassette)
+
+
+# ============= LOAD TEST =============
+
+def _pct(values: List[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))] if ordered else 0.0
+
+
+def run(jobs: List[Tuple[str, Dict[str, Any]]], source: DataSource, concurrency: int, attempts: int,
+        cache: StepCache) -> Dict[str, Any]:
+    latencies: List[float] = []
+    failures: List[str] = []
+    retries = [0]
+    lock = threading.Lock()
+
+    def one(index: int):
+        tenant_id, inputs = jobs[index]
+        started = time.perf_counter()
+        for attempt in range(1, attempts + 1):
+            try:
+                run_recipe(tenant_id, "lead_hunt", inputs, run_id=f"bench-{index}", cache=cache,
+                           client_factory=lambda: LLMClient(source))
+                break
+            except DataSourceError as e:
+                with lock:
+                    retries[0] += attempt < attempts
+                    if attempt == attempts:
+                        failures.append(str(e))
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(len(jobs))))
+    return {"seconds": time.perf_counter() - started, "latencies": latencies,
+            "retries": retries[0], "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test lead discovery against recorded data sources")
+    parser.add_argument("--jobs", type=int, default=100)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--attempts", type=int, default=3, help="tries per job; retries resume")
+    parser.add_argument("--cassettes", default="cassettes", help="cassette directory")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="recorded latency multiplier")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of LLM calls that fail")
+    parser.add_argument("--synthesize", action="store_true", help="write a synthetic cassette for the job set")
+    parser.add_argument("--profile", help="write collapsed stacks of the run to this file")
+    args = parser.parse_args()
+
+    jobs = make_jobs(args.jobs, args.tenants, args.seed)
+    if args.synthesize:
+        print(f"Synthesized {synthesize(jobs, args.cassettes, args.seed)} LLM responses into {args.cassettes}")
+        return
+
+    Base.metadata.create_all(bind=engine)
+    source = DataSource("groq", mode=REPLAY, cassette_dir=args.cassettes, latency_scale=args.latency_scale,
+                        error_rate=args.error_rate, seed=args.seed)
+    if not len(source.cassette):
+        raise SystemExit(f"No recordings in {source.cassette.path}; record or --synthesize first")
+    profiler = SamplingProfiler() if args.profile else None
+    if profiler:
+        profiler.start()
+    with tempfile.TemporaryDirectory() as cache_dir:  # cold step cache: every job really discovers
+        result = run(jobs, source, args.concurrency, args.attempts, StepCache(cache_dir))
+    if profiler:
+        profiler.stop()
+        with open(args.profile, "w") as f:
+            f.write(profiler.collapsed())
+
+    latencies = result["latencies"]
+    print(f"{len(jobs)} jobs, concurrency {args.concurrency}, latency x{args.latency_scale}, "
+          f"error rate {args.error_rate:.0%}")
+    print(f"  {len(jobs) / result['seconds']:.1f} jobs/s over {result['seconds']:.1f}s")
+    print(f"  job latency p50 {statistics.median(latencies):.2f}s  p95 {_pct(latencies, 0.95):.2f}s  "
+          f"p99 {_pct(latencies, 0.99):.2f}s")
+    print(f"  retries {result['retries']}, failed jobs {len(result['failures'])}")
+    if args.profile:
+        print(f"  profile: {args.profile} ({profiler.sample_count} samples)")
+    return 1 if result["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Recipe worker: runs jobs with retries, resuming each retry from the job's
+last completed step.
+
+Jobs are JSON lines, read from a file or stdin:
+    {"run_id": "job-42", "tenant_id": "t1", "recipe_id": "lead_hunt",
+     "inputs": {"query": "dentist", "locations": ["Pune", "Mumbai"], "industry": "healthcare"},
+     "tier": "pro", "source": "google_maps", "kind": "interactive"}
+
+run_id names the job's checkpoint; when omitted, it is derived from tenant,
+recipe and inputs, so re-submitting the same job resumes it as well.
+tier (the tenant's plan_tier), source and kind (interactive | batch) drive
+the fair scheduler (app/queue.py) that orders jobs across the worker pool.
+Lines that are not a JSON job with tenant_id and recipe_id are reported and
+skipped; the exit status is then 1, as when a job fails every attempt.
+
+Usage (from TheHunter/backend):
+    python -m scripts.worker jobs.jsonl --concurrency 8
+    echo '{"tenant_id": "t1", "recipe_id": "lead_hunt", "inputs": {...}}' | python -m scripts.worker
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+from service_kit.profiler import install_signal_handlers
+
+from app.queue import BATCH, Job, RecipeQueue
+from app.recipes import get_step_cache, run_recipe
+
+
+def run_job(job: Dict[str, Any], attempts: int, backoff: float) -> bool:
+    for attempt in range(1, attempts + 1):
+        started = time.perf_counter()
+        try:
+            result = run_recipe(job["tenant_id"], job["recipe_id"], job.get("inputs", {}), job.get("run_id"))
+        except Exception as e:
+            print(f"[WORKER] {job.get('run_id', job['recipe_id'])} attempt {attempt}/{attempts} failed: {e}",
+                  file=sys.stderr)
+            if attempt < attempts:
+                time.sleep(backoff * 2 ** (attempt - 1))
+            continue
+        print(json.dumps({
+            "run_id": job.get("run_id"), "recipe_id": job["recipe_id"], "attempt": attempt,
+            "seconds": round(time.perf_counter() - started, 3),
+            "executed": result.executed, "cached": result.cached, "resumed": result.resumed,
+        }))
+        return True
+    return False
+
+
+def parse_job(line: str, n: int) -> Job:
+    """One JSON line as a queued Job; a line without tenant_id or recipe_id is rejected"""
+    job = json.loads(line)
+    if not isinstance(job, dict):
+        raise TypeError("a job must be a JSON object")
+    for field in ("tenant_id", "recipe_id"):
+        if not job.get(field):
+            raise KeyError(field)
+    return Job(job.get("run_id") or f"job-{n}", job["tenant_id"], tier=job.get("tier", "free"),
+               source=job.get("source", "default"), kind=job.get("kind", BATCH),
+               cost=float(job.get("cost", 1.0)), payload=job)
+
+
+def run_pool(queue: RecipeQueue, concurrency: int, attempts: int, backoff: float) -> int:
+    """Run queued jobs on `concurrency` threads until the queue is closed and drained"""
+    failed: List[str] = []
+
+    def work():
+        while True:
+            job = queue.get()
+            if job is None:
+                return
+            try:
+                if not run_job(job.payload, attempts, backoff):
+                    failed.append(job.job_id)
+            finally:
+                queue.done(job)
+
+    threads = [threading.Thread(target=work, name=f"worker-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run recipe jobs with step caching and resumable retries")
+    parser.add_argument("jobs", nargs="?", type=argparse.FileType("r"), default=sys.stdin,
+                        help="JSON-lines job file (default: stdin)")
+    parser.add_argument("--attempts", type=int, default=3, help="tries per job")
+    parser.add_argument("--backoff", type=float, default=2.0, help="seconds before the first retry, doubling")
+    parser.add_argument("--concurrency", type=int, default=1, help="worker threads")
+    args = parser.parse_args()
+
+    # app.* log records (e.g. leads discovery had to skip) go to stderr next to the [WORKER] lines
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    install_signal_handlers()
+    removed = get_step_cache().prune()
+    if removed:
+        print(f"[WORKER] Pruned {removed} expired cache files", file=sys.stderr)
+
+    queue = RecipeQueue()
+    skipped: List[int] = []
+
+    def feed():
+        try:
+            for n, line in enumerate(args.jobs):
+                if not line.strip():
+                    continue
+                try:
+                    job = parse_job(line, n)
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"[WORKER] Skipping line {n + 1}: {e!r}", file=sys.stderr)
+                    skipped.append(n + 1)
+                    continue
+                queue.put(job)
+        finally:
+            queue.close()  # even if reading fails, so the pool drains and exits
+
+    threading.Thread(target=feed, name="feeder", daemon=True).start()
+    failed = run_pool(queue, args.concurrency, args.attempts, args.backoff)
+    return 1 if failed or skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,8 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from service_kit.http_cache import ETagCache
+from service_kit.middleware import choose_encoding
 from app.main import app
 from app.database import Base, get_db
 from app.models import Calculation
@@ -81,3 +83,63 @@ def test_get_history():
     response = client.get("/api/v1/calculator/history")
     assert response.status_code == 200
     assert len(response.json()) >= 2
+
+def test_get_history_fast_path_matches_default(monkeypatch):
+    from app.config import settings
+
+    client.post(
+        "/api/v1/calculator/calculate",
+        json={"operation": "divide", "operand1": 1, "operand2": 3}
+    )
+    default = client.get("/api/v1/calculator/history").json()
+    monkeypatch.setattr(settings, "FAST_JSON", True)
+    fast = client.get("/api/v1/calculator/history")
+    assert fast.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert [row["id"] for row in fast.json()] == [row["id"] for row in default]
+    assert fast.json()[-1]["result"] == default[-1]["result"]
+
+def test_get_history_etag_short_circuits_until_next_calculation():
+    response = client.get("/api/v1/calculator/history")
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+
+    cached = client.get("/api/v1/calculator/history", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    client.post(
+        "/api/v1/calculator/calculate",
+        json={"operation": "add", "operand1": 2, "operand2": 2}
+    )
+    fresh = client.get("/api/v1/calculator/history", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+def test_large_history_is_compressed():
+    for i in range(30):
+        client.post(
+            "/api/v1/calculator/calculate",
+            json={"operation": "multiply", "operand1": i, "operand2": 2}
+        )
+    response = client.get("/api/v1/calculator/history", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()) >= 30
+
+def test_refused_encoding_is_not_selected():
+    response = client.get("/api/v1/calculator/history", headers={"Accept-Encoding": "br;q=0, gzip;q=0.8"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert choose_encoding("gzip;q=0, br;q=0") is None
+    assert choose_encoding("*;q=0.5, br;q=0") == "gzip"
+    assert choose_encoding("gzip, br;q=0.9") == "gzip"
+
+def test_etag_cache_evicts_least_recently_used():
+    cache = ETagCache(max_entries=2)
+    cache.set("u1", "history:0:100", 'W/"a"')
+    cache.set("u1", "history:100:100", 'W/"b"')
+    assert cache.get("u1", "history:0:100") == 'W/"a"'  # now most recently used
+    cache.set("u2", "history:0:100", 'W/"c"')
+    assert len(cache) == 2
+    assert cache.get("u1", "history:100:100") is None
+    cache.invalidate("u1", "history")
+    assert cache.get("u1", "history:0:100") is None and cache.get("u2", "history:0:100") == 'W/"c"'
@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+ensemble = pytest.importorskip("sklearn.ensemble")
+
+from app.components import score_leads
+from app.leads import Lead
+from app.ml.compiled_forest import CompiledForest, compile_forest
+from app.ml.feature_extractor import FEATURE_NAMES
+
+rng = np.random.default_rng(0)
+X = rng.random((500, 10))
+y = X[:, 0] + 0.5 * X[:, 4] + 0.2 * rng.random(500) > 0.9
+classifier = ensemble.RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+forest = compile_forest(classifier, FEATURE_NAMES)
+X_test = rng.random((200, 10))
+
+
+def test_matches_sklearn_classifier():
+    assert np.allclose(forest.predict_proba(X_test), classifier.predict_proba(X_test)[:, 1], atol=1e-12)
+
+
+def test_matches_sklearn_regressor():
+    regressor = ensemble.RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, X[:, 2] * 3)
+    assert np.allclose(compile_forest(regressor).predict_proba(X_test), regressor.predict(X_test), atol=1e-12)
+
+
+def test_contributions_sum_to_prediction():
+    probs, contributions, bias = forest.predict_with_contributions(X_test)
+    assert contributions.shape == (200, 10)
+    assert np.allclose(bias + contributions.sum(axis=1), probs)
+    assert np.allclose(probs, forest.predict_proba(X_test))
+    # The label depends on features 0 and 4 only; they carry the attribution
+    mean_abs = np.abs(contributions).mean(axis=0)
+    assert set(np.argsort(mean_abs)[-2:]) == {0, 4}
+
+
+def test_feature_scores_named_per_row():
+    scores = forest.feature_scores(X_test[:3])
+    assert len(scores) == 3 and list(scores[0]) == FEATURE_NAMES
+
+
+def test_top_feature_scores_largest_first():
+    [full] = forest.feature_scores(X_test[:1])
+    [top] = forest.feature_scores(X_test[:1], top=2)
+    assert list(top) == sorted(full, key=lambda name: -abs(full[name]))[:2]
+
+
+def test_save_load_round_trip(tmp_path):
+    path = str(tmp_path / "forest.npz")
+    forest.save(path)
+    loaded = CompiledForest.load(path)
+    assert loaded.feature_names == FEATURE_NAMES
+    assert np.array_equal(loaded.predict_proba(X_test), forest.predict_proba(X_test))
+
+
+def test_edge_cases():
+    assert forest.predict_proba(np.empty((0, 10))).shape == (0,)
+    with pytest.raises(ValueError):
+        forest.predict_proba(X_test[:, :5])
+    multiclass = ensemble.RandomForestClassifier(n_estimators=2, random_state=0).fit(X, (X[:, 0] * 3).astype(int))
+    with pytest.raises(ValueError):
+        compile_forest(multiclass)
+
+
+def test_plugs_into_score_leads():
+    leads = [Lead(name="A", email="a@x.com", engagement_score=0.9), Lead(name="B", email="b@y.com")]
+    batch = score_leads(leads, forest.predict_proba)
+    assert all(0.0 <= p <= 1.0 for p in batch.conversion_probability)
+
+
+def test_recipe_scoring_attaches_feature_scores(monkeypatch):
+    from app import recipes
+
+    monkeypatch.setattr(recipes, "load_scorer", lambda: forest)
+    leads = [Lead(name="A", email="a@x.com", engagement_score=0.9, extra={"linkedin": "a"}),
+             Lead(name="B", email="b@y.com")]
+    batch = recipes._score(leads, {})
+    first, second = batch
+    assert len(first.extra["feature_scores"]) == recipes.FEATURE_SCORES
+    assert first.extra["linkedin"] == "a" and "feature_scores" not in leads[0].extra
+    assert set(second.extra["feature_scores"]) <= set(FEATURE_NAMES)
@@ -0,0 +1,150 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.components import (
+    IncrementalJSONArrayParser, build_lead_prompt, deduplicate_leads, discover_leads_batched, score_leads,
+)
+from app.leads import Lead, LeadBatch, as_numpy
+
+LEADS = [
+    {"query_index": 0, "name": "Rahul Sharma", "company": "Smile {Care} \"Dental\"", "engagement_score": 0.85},
+    {"query_index": 1, "name": "Aisha Khan", "company": "Dental Hub\\Pune", "tags": [{"a": 1}]},
+]
+
+
+def _feed_all(text, size):
+    parser = IncrementalJSONArrayParser()
+    out = []
+    for i in range(0, len(text), size):
+        out.extend(parser.feed(text[i:i + size]))
+    return out, parser
+
+
+def test_parser_emits_objects_for_any_chunking():
+    text = "Here you go:\n```json\n" + json.dumps(LEADS, indent=2) + "\n```"
+    for size in (1, 2, 3, 7, 64, len(text)):
+        out, parser = _feed_all(text, size)
+        assert out == LEADS
+        assert parser.errors == 0
+
+
+def test_parser_emits_each_lead_before_stream_ends():
+    text = json.dumps(LEADS)
+    split = text.index("}, {") + 1
+    parser = IncrementalJSONArrayParser()
+    assert parser.feed(text[:split]) == LEADS[:1]
+    assert parser.feed(text[split:]) == LEADS[1:]
+
+
+def test_parser_skips_malformed_objects():
+    out, parser = _feed_all('[{"name": "ok"}, {"name": bad}, {"name": "also ok"}]', 5)
+    assert [lead["name"] for lead in out] == ["ok", "also ok"]
+    assert parser.errors == 1
+
+
+def test_parser_ignores_braces_in_preamble():
+    text = "Leads in the {name, email} format, as asked {\n[\n  " + json.dumps(LEADS)[1:]
+    for size in (1, 2, 5, len(text)):
+        out, parser = _feed_all(text, size)
+        assert out == LEADS
+        assert parser.errors == 0
+
+
+def test_parser_stops_at_the_closing_bracket():
+    text = json.dumps(LEADS) + ' Note: {"c": 3}'
+    for size in (1, 2, 5, len(text)):
+        out, parser = _feed_all(text, size)
+        assert out == LEADS
+        assert parser.errors == 0
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class FakeClient:
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, stream, **kwargs):
+        assert stream
+        self.prompts.append(messages[0]["content"])
+        text = json.dumps(LEADS)
+        return [_chunk(None)] + [_chunk(text[i:i + 10]) for i in range(0, len(text), 10)]
+
+
+def test_discover_leads_batched_packs_queries_into_one_call():
+    client = FakeClient()
+    queries = ["dentist viman nagar", "dental clinic pune", "orthodontist pune"]
+    leads = list(discover_leads_batched(client, queries, batch_size=2))
+
+    assert len(client.prompts) == 2
+    assert '1. "dental clinic pune"' in client.prompts[0]
+    assert [lead.query for lead in leads] == [queries[0], queries[1], queries[2], None]
+    assert all(lead.source == "ai_search" for lead in leads)
+    assert leads[1].extra == {"tags": [{"a": 1}]}
+
+
+def test_discover_logs_skipped_leads(caplog):
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: [_chunk('[{"name": "ok"}, {"name": bad}]')])))
+    with caplog.at_level("WARNING", logger="app.components"):
+        assert [lead.name for lead in discover_leads_batched(client, ["q"])] == ["ok"]
+    assert "Skipped 1 malformed leads" in caplog.text
+
+
+def test_build_lead_prompt_numbers_queries():
+    prompt = build_lead_prompt(["a", "b"], per_query=3)
+    assert 'Generate 3 realistic' in prompt and '0. "a"' in prompt and '1. "b"' in prompt
+
+
+def test_lead_round_trips_and_interns_repeated_strings():
+    raw = {"name": "Rahul", "email": "Rahul@SmileCare.in", "industry": "Health" + "care",
+           "location": "Pune", "engagement_score": 0.8, "linkedin": "x"}
+    lead = Lead.from_dict(raw)
+    assert lead.to_dict()["linkedin"] == "x"
+    assert Lead.from_dict(dict(raw)).industry is lead.industry
+    assert lead.dedup_key == "rahul@smilecare.in"
+
+
+def test_lead_null_engagement_score_takes_default():
+    assert Lead.from_dict({"name": "A", "engagement_score": None}).engagement_score == 0.5
+    assert Lead.from_dict({"name": "A", "engagement_score": 0}).engagement_score == 0.0
+
+
+def test_batch_is_frozen_while_numpy_view_is_alive():
+    batch = LeadBatch.from_leads([Lead(name="A")])
+    view = as_numpy(batch.engagement_score)
+    with pytest.raises(BufferError):
+        batch.append(Lead(name="B"))
+    assert len(batch.name) == len(batch.engagement_score) == len(batch.conversion_probability) == 1
+    del view
+    batch.append(Lead(name="B"))
+    assert len(batch) == 2
+
+
+def test_deduplicate_leads_by_email_then_company():
+    leads = [
+        {"email": "john@clinic.in", "company": "Clinic1"},
+        {"email": "JOHN@clinic.in ", "company": "Clinic1"},
+        {"company": "Dental Hub", "location": "Pune"},
+        {"company": "dental  hub", "location": "pune"},
+    ]
+    assert len(deduplicate_leads(leads)) == 2
+
+
+def test_score_leads_fills_batch_in_place():
+    seen = {}
+
+    def predict(matrix):
+        seen["shape"] = matrix.shape
+        return [0.25] * matrix.shape[0]
+
+    pytest.importorskip("numpy")
+    batch = score_leads(LEADS, predict, criteria={"location": "pune"})
+    assert seen["shape"] == (2, 10)
+    assert list(batch.conversion_probability) == [0.25, 0.25]
+    assert next(batch.iter_dicts())["conversion_probability"] == 0.25
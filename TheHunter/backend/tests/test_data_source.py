@@ -0,0 +1,113 @@
+import pytest
+
+from app.components import discover_leads_batched
+from app.services.data_source import (
+    RECORD, REPLAY, CassetteMiss, DataSource, DataSourceError, LLMClient, stream_chunk,
+)
+
+
+class FakeTime:
+    """clock + sleep pair; sleeping advances the clock"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def source(tmp_path, mode, fake, **kwargs):
+    return DataSource("test", mode=mode, cassette_dir=str(tmp_path), clock=fake.clock, sleep=fake.sleep,
+                      **kwargs)
+
+
+def test_replays_recorded_calls_in_turn_with_scaled_latency(tmp_path):
+    fake = FakeTime()
+    recorder = source(tmp_path, RECORD, fake)
+    answers = iter(["first", "second"])
+
+    def fetch(request):
+        fake.now += 2.0
+        return next(answers)
+
+    assert recorder.call({"q": "dentist"}, fetch) == "first"
+    assert recorder.call({"q": "dentist"}, fetch) == "second"
+
+    replay_time = FakeTime()
+    player = source(tmp_path, REPLAY, replay_time, latency_scale=0.5)
+    assert [player.call({"q": "dentist"}) for _ in range(3)] == ["first", "second", "first"]
+    assert replay_time.slept == [1.0, 1.0, 1.0]
+    with pytest.raises(CassetteMiss):
+        player.call({"q": "plumber"})
+
+
+def test_stream_replay_keeps_chunk_timing_and_recorded_errors(tmp_path):
+    fake = FakeTime()
+    recorder = source(tmp_path, RECORD, fake)
+
+    def fetch(request):
+        for text in ("a", "b"):
+            fake.now += 1.0
+            yield text
+        if request["fail"]:
+            raise TimeoutError("upstream timed out")
+
+    assert list(recorder.stream({"fail": False}, fetch)) == ["a", "b"]
+    with pytest.raises(TimeoutError):
+        list(recorder.stream({"fail": True}, fetch))
+
+    replay_time = FakeTime()
+    player = source(tmp_path, REPLAY, replay_time)
+    seen = []
+    for chunk in player.stream({"fail": False}):
+        seen.append((chunk, replay_time.now))
+    assert seen == [("a", 1.0), ("b", 2.0)]
+    failed = player.stream({"fail": True})
+    assert list(next(failed) for _ in range(2)) == ["a", "b"]
+    with pytest.raises(DataSourceError, match="upstream timed out"):
+        next(failed)
+
+
+def test_error_injection_is_seeded(tmp_path):
+    recorder = source(tmp_path, RECORD, FakeTime())
+    recorder.call({"q": 1}, lambda request: "ok")
+
+    def outcomes(seed):
+        player = source(tmp_path, REPLAY, FakeTime(), error_rate=0.3, seed=seed)
+        results = []
+        for _ in range(50):
+            try:
+                results.append(player.call({"q": 1}))
+            except DataSourceError:
+                results.append("error")
+        return results
+
+    assert outcomes(7) == outcomes(7)
+    assert 5 <= outcomes(7).count("error") <= 25
+
+
+class FakeGroq:
+    def __init__(self):
+        self.chat = self
+        self.completions = self
+        self.calls = 0
+
+    def create(self, **request):
+        self.calls += 1
+        text = '[{"query_index": 0, "name": "Asha", "email": "asha@smile.in", "company": "Smile Dental"}]'
+        return (stream_chunk(text[i:i + 7]) for i in range(0, len(text), 7))
+
+
+def test_llm_discovery_replays_without_a_client(tmp_path):
+    live = FakeGroq()
+    recorded = list(discover_leads_batched(LLMClient(source(tmp_path, RECORD, FakeTime()), lambda: live),
+                                           ["dentist in Pune"]))
+    replayed = list(discover_leads_batched(LLMClient(source(tmp_path, REPLAY, FakeTime())), ["dentist in Pune"]))
+    assert live.calls == 1
+    assert [lead.to_dict() for lead in replayed] == [lead.to_dict() for lead in recorded]
+    assert replayed[0].query == "dentist in Pune"
@@ -0,0 +1,91 @@
+import random
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.geo import (
+    GeoIndex, geohash_decode, geohash_encode, get_geocoder, haversine_km, radius_bboxes, radius_cells,
+)
+from app.lead_store import leads_within_bbox, leads_within_radius, upsert_leads
+from app.leads import Lead
+from app.ml.feature_extractor import calculate_location_match, extract_feature_buffer, FEATURE_NAMES
+
+engine = create_engine("sqlite://")
+Base.metadata.create_all(bind=engine)
+Session = sessionmaker(bind=engine)
+
+LOCATION = FEATURE_NAMES.index("location_match")
+
+
+def test_geohash_round_trip():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    lat, lon = geohash_decode(geohash_encode(18.5679, 73.9143))
+    assert haversine_km(lat, lon, 18.5679, 73.9143) < 0.01
+
+
+def test_geocoder_prefers_neighbourhood_of_named_city():
+    geocoder = get_geocoder()
+    assert geocoder.geocode("Viman Nagar, Pune, India").name == "viman nagar"
+    assert geocoder.geocode("PUNE").name == "pune"
+    assert geocoder.geocode("Koramangala, Bangalore").parent == "bangalore"
+    # 'camp' is a Pune neighbourhood, but the city named here is London
+    assert geocoder.geocode("Boot camp, London").name == "london"
+    assert geocoder.geocode("Atlantis") is None
+
+
+def test_geo_index_radius_matches_brute_force():
+    rng = random.Random(7)
+    points = [(i, 18.5 + rng.uniform(-0.2, 0.2), 73.85 + rng.uniform(-0.2, 0.2)) for i in range(2000)]
+    index = GeoIndex(points)
+    center = (18.5679, 73.9143)
+    found = index.within_radius(*center, 3.0)
+    expected = {i for i, lat, lon in points if haversine_km(*center, lat, lon) <= 3.0}
+    assert {item for item, _ in found} == expected
+    assert [d for _, d in found] == sorted(d for _, d in found)
+    assert len(radius_cells(*center, 3.0)) <= 32
+
+    box = index.within_bbox(18.5, 73.8, 18.55, 73.9)
+    assert set(box) == {i for i, lat, lon in points if 18.5 <= lat <= 18.55 and 73.8 <= lon <= 73.9}
+
+
+def test_radius_across_the_antimeridian():
+    assert len(radius_bboxes(0.0, 179.99, 5.0)) == 2
+    index = GeoIndex([("west", 0.0, 179.99), ("east", 0.0, -179.99), ("far", 0.0, -179.5)])
+    assert [item for item, _ in index.within_radius(0.0, 179.99, 5.0)] == ["west", "east"]
+    assert [item for item, _ in index.within_radius(0.0, -179.99, 5.0)] == ["east", "west"]
+
+
+def test_radius_search_over_stored_leads():
+    db = Session()
+    upsert_leads(db, "t-geo", [
+        Lead(name="Viman Dental", email="a@v.com", industry="Dentist", location="Viman Nagar, Pune"),
+        Lead(name="Kalyani Dental", email="b@k.com", industry="Dentist", location="Kalyani Nagar, Pune"),
+        Lead(name="Baner Dental", email="c@b.com", industry="Dentist", location="Baner, Pune"),
+        Lead(name="Viman Cafe", email="d@v.com", industry="Cafe", location="Viman Nagar, Pune"),
+        Lead(name="Nowhere", email="e@n.com", industry="Dentist", location="Atlantis"),
+    ])
+    viman = get_geocoder().geocode("Viman Nagar, Pune")
+
+    near = leads_within_radius(db, "t-geo", viman.lat, viman.lon, 3.0, industry="dentist")
+    assert [lead.name for lead, _ in near] == ["Viman Dental", "Kalyani Dental"]
+    assert near[0][1] == 0.0
+
+    boxed = leads_within_bbox(db, "t-geo", 18.55, 73.7, 18.6, 73.95)
+    assert {lead.name for lead in boxed} == {"Viman Dental", "Baner Dental", "Viman Cafe"}
+
+
+def test_location_feature_is_distance_based():
+    assert calculate_location_match("Viman Nagar, Pune, India", "Pune") == 1.0
+    kalyani = calculate_location_match("Kalyani Nagar, Pune", "Viman Nagar, Pune")
+    baner = calculate_location_match("Baner, Pune", "Viman Nagar, Pune")
+    assert 0 < baner < kalyani < 1.0
+    # Outside the gazetteer: token overlap, as before
+    assert calculate_location_match("Springfield, USA", "Springfield") == 1.0
+
+    buffer = extract_feature_buffer(
+        [Lead(location="Kalyani Nagar, Pune"), Lead(location="Springfield")],
+        {"location": "Viman Nagar, Pune"},
+    )
+    assert buffer[LOCATION] == kalyani
+    assert buffer[len(FEATURE_NAMES) + LOCATION] == 0.0
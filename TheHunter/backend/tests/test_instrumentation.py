@@ -0,0 +1,66 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from service_kit.instrumentation import InstrumentationMiddleware, install_db_hooks, metrics, metrics_endpoint, timed
+
+engine = create_engine("sqlite://")
+install_db_hooks(engine)
+
+app = FastAPI()
+app.add_middleware(InstrumentationMiddleware, sample_rate=1.0, n_plus_one_threshold=3)
+app.add_route("/metrics", metrics_endpoint(token="scrape-token"))
+
+
+@app.get("/items/{item_id}")
+def get_item(item_id: int):
+    with timed("lookup"):
+        with engine.connect() as conn:
+            for i in range(item_id):
+                conn.execute(text(f"SELECT {i}"))
+    return {"id": item_id}
+
+
+client = TestClient(app)
+
+
+def test_server_timing_reports_phases_and_db_queries():
+    response = client.get("/items/2")
+    timing = response.headers["server-timing"]
+    assert "lookup;dur=" in timing
+    assert 'desc="2 queries"' in timing
+    assert "app;dur=" in timing
+
+
+def test_repeated_statements_flagged_as_n_plus_one(caplog):
+    with caplog.at_level("INFO", logger="app.requests"):
+        client.get("/items/4")
+    record = caplog.records[-1]
+    assert record.levelname == "WARNING"
+    assert '"n_plus_one": ["SELECT ?"]' in record.getMessage()
+
+
+def test_metrics_endpoint_exports_route_histograms():
+    client.get("/items/1")
+    body = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"}).text
+    assert 'http_request_duration_seconds_count{method="GET",route="/items/{item_id}"}' in body
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"}' in body
+
+
+def test_metrics_needs_token_or_loopback():
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+    local_only = metrics_endpoint()
+    scope = {"type": "http", "method": "GET", "path": "/metrics", "headers": []}
+    assert local_only(Request({**scope, "client": ("10.0.0.7", 5000)})).status_code == 404
+    assert local_only(Request({**scope, "client": ("127.0.0.1", 5000)})).status_code == 200
+
+
+def test_unsampled_requests_still_counted_without_header():
+    unsampled = FastAPI()
+    unsampled.add_middleware(InstrumentationMiddleware, sample_rate=0.0)
+    unsampled.add_api_route("/ping", lambda: {"ok": True})
+    response = TestClient(unsampled).get("/ping")
+    assert "server-timing" not in response.headers
+    assert 'route="/ping",status="200"' in metrics.render()
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import lead_search
+from app.config import settings
+from app.database import Base, get_db
+from app.lead_search import bulk_load_search_index, ensure_search_index, search_leads
+from app.lead_store import upsert_leads
+from app.leads import Lead
+from app.routes_leads import router
+
+# One shared connection: the route test queries from the TestClient worker thread
+engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+Session = sessionmaker(bind=engine)
+
+db = Session()
+upsert_leads(db, "t-search", [
+    Lead(name="Asha", email="asha@smile.in", company="Smile Dental Clinic", title="Dentist",
+         industry="Healthcare", conversion_probability=0.2),
+    Lead(name="Ravi", email="ravi@bright.in", company="Bright Dental Care", title="Owner",
+         industry="Healthcare", conversion_probability=0.9),
+    Lead(name="Meera", email="meera@cloudnine.io", company="CloudNine Software", title="CTO",
+         industry="SaaS", conversion_probability=0.5),
+])
+upsert_leads(db, "t-other", [Lead(email="x@dental.com", company="Other Tenant Dental")])
+
+
+def names(page):
+    return [hit.lead.name for hit in page.hits]
+
+
+def test_substring_and_prefix_match_within_tenant():
+    page = search_leads(db, "t-search", "dent")
+    assert set(names(page)) == {"Asha", "Ravi"}
+    assert not page.fuzzy
+    assert names(search_leads(db, "t-search", "cloud soft")) == ["Meera"]
+
+
+def test_probability_breaks_similar_relevance():
+    page = search_leads(db, "t-search", "dental")
+    assert names(page) == ["Ravi", "Asha"]
+    assert page.hits[0].score > page.hits[1].score
+
+
+def test_typo_falls_back_to_fuzzy_match():
+    page = search_leads(db, "t-search", "softwear")
+    assert page.fuzzy
+    assert names(page)[0] == "Meera"
+
+
+def test_pagination():
+    first = search_leads(db, "t-search", "healthcare", page=1, page_size=1)
+    second = search_leads(db, "t-search", "healthcare", page=2, page_size=1)
+    assert first.has_more and not second.has_more
+    assert {names(first)[0], names(second)[0]} == {"Asha", "Ravi"}
+
+
+def test_index_follows_updates():
+    upsert_leads(db, "t-search", [Lead(email="meera@cloudnine.io", company="Nimbus Analytics")])
+    assert names(search_leads(db, "t-search", "nimbus")) == ["Meera"]
+    assert search_leads(db, "t-search", "cloudnine").fuzzy
+
+
+def test_short_query_returns_nothing():
+    assert search_leads(db, "t-search", "ab").hits == []
+
+
+def test_postgres_like_pattern_matches_wildcards_literally():
+    like = lead_search._like_pattern("50%_OFF\\")
+    with create_engine("sqlite://").connect() as conn:
+        def matches(value):
+            sql = text("SELECT :value LIKE :like ESCAPE '\\'")
+            return conn.execute(sql, {"value": value, "like": like}).scalar()
+
+        assert matches("deal: 50%_off\\ today")
+        assert not matches("deal: 50 xoff\\ today")  # % and _ in the query are not wildcards
+
+
+def test_bulk_load_indexes_once_at_the_end():
+    with bulk_load_search_index(engine):
+        upsert_leads(db, "t-bulk", [Lead(email="z@zephyr.io", name="Zed", company="Zephyr Robotics")])
+        assert search_leads(db, "t-bulk", "zephyr").hits == []
+    assert names(search_leads(db, "t-bulk", "zephyr")) == ["Zed"]
+    upsert_leads(db, "t-bulk", [Lead(email="y@zephyr.io", name="Yan", company="Zephyr Labs")])
+    assert sorted(names(search_leads(db, "t-bulk", "zephyr"))) == ["Yan", "Zed"]  # trigger is back
+
+
+def test_candidate_cap_applies_within_the_tenant(monkeypatch):
+    monkeypatch.setattr(lead_search, "SEARCH_CANDIDATES", 1)
+    # The other tenant's dental lead is the newest match; it must not take the only slot
+    page = search_leads(db, "t-search", "dental")
+    assert len(page.hits) == 1 and not page.fuzzy
+
+
+api = FastAPI()
+api.include_router(router)
+api.dependency_overrides[get_db] = lambda: db
+client = TestClient(api)
+
+
+def bearer(tenant_id: str) -> dict:
+    token = jwt.encode({"sub": tenant_id, "exp": datetime.utcnow() + timedelta(minutes=5)},
+                       settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_search_route_reads_only_the_callers_tenant():
+    assert client.get("/api/v1/leads/search", params={"q": "dental"}).status_code == 401
+    response = client.get("/api/v1/leads/search", params={"q": "dental"}, headers=bearer("t-search"))
+    assert {hit["name"] for hit in response.json()["results"]} == {"Asha", "Ravi"}
+
+    # Naming another tenant in the query string changes nothing
+    response = client.get("/api/v1/leads/search", params={"q": "dental", "tenant_id": "t-search"},
+                          headers=bearer("t-other"))
+    assert [hit["company"] for hit in response.json()["results"]] == ["Other Tenant Dental"]
+
+
+def test_search_route_rejects_forged_tokens():
+    forged = jwt.encode({"sub": "t-search"}, "not-the-secret", algorithm=settings.ALGORITHM)
+    response = client.get("/api/v1/leads/search", params={"q": "dental"},
+                          headers={"Authorization": f"Bearer {forged}"})
+    assert response.status_code == 401
@@ -0,0 +1,78 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.lead_store import load_leads, upsert_lead_groups, upsert_leads
+from app.leads import Lead
+from app.models import LeadRecord
+
+engine = create_engine("sqlite://")
+Base.metadata.create_all(bind=engine)
+Session = sessionmaker(bind=engine)
+
+
+def _count(db, tenant_id):
+    return db.query(LeadRecord).filter(LeadRecord.tenant_id == tenant_id).count()
+
+
+def test_upsert_inserts_and_dedups_within_a_run():
+    db = Session()
+    leads = [
+        Lead(name="Ann", email="ann@acme.com", company="Acme", location="Pune"),
+        Lead(name="Ann Again", email=" ANN@acme.com ", company="Acme"),
+        Lead(name="Bob", company="Beta Dental", location="Mumbai"),
+        Lead(name="Nobody"),  # no identity at all: dropped
+    ]
+    assert upsert_leads(db, "t-dedup", leads) == 2
+    assert _count(db, "t-dedup") == 2
+    names = {lead.name for lead in load_leads(db, "t-dedup")}
+    assert names == {"Ann Again", "Bob"}
+
+
+def test_upsert_merges_without_blanking_known_fields():
+    db = Session()
+    upsert_leads(db, "t-merge", [{"name": "Cara", "email": "cara@x.io", "title": "CEO", "industry": "SaaS",
+                                  "conversion_probability": 0.4, "linkedin": "in/cara"}])
+    upsert_leads(db, "t-merge", [{"email": "cara@x.io", "title": "Founder", "engagement_score": 0.9}])
+
+    [lead] = load_leads(db, "t-merge")
+    assert lead.name == "Cara"
+    assert lead.industry == "SaaS"
+    assert lead.title == "Founder"
+    assert lead.engagement_score == 0.9
+    assert lead.conversion_probability == 0.4
+    assert lead.extra == {"linkedin": "in/cara"}
+
+
+def test_tenants_are_isolated_and_score_order():
+    db = Session()
+    upsert_leads(db, "t-a", [Lead(email=f"{i}@a.com", conversion_probability=i / 10) for i in range(5)])
+    upsert_leads(db, "t-b", [Lead(email="0@a.com")])
+    assert _count(db, "t-a") == 5
+    assert _count(db, "t-b") == 1
+    top = load_leads(db, "t-a", order="score", limit=2)
+    assert [lead.email for lead in top] == ["4@a.com", "3@a.com"]
+
+
+def test_upsert_in_batches():
+    db = Session()
+    leads = [Lead(email=f"user{i}@bulk.com") for i in range(2500)]
+    assert upsert_leads(db, "t-bulk", leads, batch_size=1000) == 2500
+    assert upsert_leads(db, "t-bulk", leads, batch_size=1000) == 2500
+    assert _count(db, "t-bulk") == 2500
+
+
+def test_upsert_lead_groups_spans_tenants():
+    db = Session()
+    groups = [("t-g1", [Lead(email="a@g.com"), Lead(email="b@g.com")]), ("t-g2", [Lead(email="a@g.com")])]
+    assert upsert_lead_groups(db, groups) == 3
+    assert (_count(db, "t-g1"), _count(db, "t-g2")) == (2, 1)
+
+
+def test_upsert_lead_groups_dedups_a_tenant_across_groups():
+    db = Session()
+    groups = [("t-dup", [Lead(email="a@d.com", title="Old")]), ("t-other", [Lead(email="a@d.com")]),
+              ("t-dup", [Lead(email="a@d.com", title="New"), Lead(email="b@d.com")])]
+    assert upsert_lead_groups(db, groups, batch_size=1) == 3
+    assert _count(db, "t-dup") == 2
+    assert {lead.email: lead.title for lead in load_leads(db, "t-dup")}["a@d.com"] == "New"
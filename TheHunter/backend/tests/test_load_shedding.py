@@ -0,0 +1,82 @@
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from service_kit.load_shedding import AUTH, CRITICAL, LOW, NORMAL, LoadShedder, LoadSheddingMiddleware
+
+
+def shedder(**kwargs):
+    return LoadShedder(critical_paths=["/health"], auth_paths=["/auth/"], low_priority_paths=["/export"],
+                       max_in_flight=20, min_in_flight=4, **kwargs)
+
+
+def test_routes_are_prioritized_by_prefix():
+    s = shedder()
+    assert [s.priority(p) for p in ("/health", "/auth/login", "/export/csv", "/items")] == [CRITICAL, AUTH, LOW, NORMAL]
+
+
+def test_limit_slow_starts_while_in_use_and_backs_off_under_lag():
+    s = shedder()
+    assert s.limit == 4
+    s.observe(lag=0.0, threads_waiting=0)
+    assert s.limit == 4  # idle: no growth
+    s.in_flight = 4
+    for _ in range(30):
+        s.observe(lag=0.0, threads_waiting=0)
+    assert s.limit == 9  # grows only while at least half used
+
+    s.in_flight = 10
+    for _ in range(30):
+        s.observe(lag=0.0, threads_waiting=0)
+    assert s.limit == 20  # max_in_flight
+    s.in_flight = 15
+    s.observe(lag=0.2, threads_waiting=0)
+    assert s.limit == 15 * 0.9  # drops below the load in flight at once
+    assert not s.admit(NORMAL) and not s.admit(LOW) and s.admit(CRITICAL) and s.admit(AUTH)
+
+
+def test_low_priority_shed_first():
+    s = shedder()
+    s.limit = 20
+    s.in_flight = 10  # half the limit
+    assert s.admit(NORMAL) and not s.admit(LOW)
+    s.in_flight = 0
+    s.observe(lag=0.0, threads_waiting=3)  # threadpool saturated
+    assert s.admit(NORMAL) and not s.admit(LOW)
+
+
+app = FastAPI()
+app.add_middleware(LoadSheddingMiddleware, retry_after=2, critical_paths=["/health"],
+                   low_priority_paths=["/export"])
+
+
+@app.get("/block")
+async def block():
+    time.sleep(0.3)  # holds the event loop, as a CPU-bound handler would
+    return {}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/export")
+async def export():
+    return []
+
+
+@app.get("/items")
+async def items():
+    return []
+
+
+def test_event_loop_lag_sheds_low_priority_with_retry_after():
+    with TestClient(app) as client:
+        assert client.get("/export").status_code == 200
+        client.get("/block")
+        shed = client.get("/export")
+        assert shed.status_code == 503 and shed.headers["retry-after"] == "2"
+        assert client.get("/health").status_code == 200
+        assert client.get("/items").status_code == 200
@@ -0,0 +1,58 @@
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from service_kit.admin import admin_router
+from service_kit.profiler import SamplingProfiler, dump_thread_stacks
+
+from app.config import settings
+
+app = FastAPI()
+app.include_router(admin_router(lambda: settings.ADMIN_TOKEN))
+client = TestClient(app)
+
+
+def _busy_loop(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_collects_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    time.sleep(0.1)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert profiler.sample_count > 0
+    busy = [line for line in profiler.collapsed().splitlines() if line.startswith("busy-worker;")]
+    assert busy and "_busy_loop (test_profiler.py:" in busy[0]
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "sampling-profiler" not in profiler.collapsed()
+
+
+def test_thread_stack_dump_includes_main_thread():
+    assert "--- Thread MainThread" in dump_thread_stacks()
+
+
+def test_admin_endpoints_disabled_without_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/stacks").status_code == 404
+
+
+def test_admin_endpoints_require_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/api/admin/stacks", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    headers = {"X-Admin-Token": "secret"}
+    assert "--- Thread" in client.get("/api/admin/stacks", headers=headers).text
+    assert "--- Task" in client.get("/api/admin/tasks", headers=headers).text
+    response = client.get("/api/admin/profile", params={"seconds": 0.05, "interval_ms": 1}, headers=headers)
+    assert response.status_code == 200
+    assert response.text.strip()
@@ -0,0 +1,109 @@
+import threading
+
+from app.queue import BATCH, INTERACTIVE, FairScheduler, Job, RecipeQueue
+
+
+def scheduler(**kw):
+    options = dict(tier_weights={"free": 1.0, "pro": 4.0, "enterprise": 16.0},
+                   tenant_concurrency={"free": 100, "pro": 100, "enterprise": 100},
+                   source_concurrency={}, interactive_deadline=30.0, urgent_slack=5.0, interactive_reserve=1)
+    options.update(kw)
+    return FairScheduler(**options)
+
+
+def drain(s, n, now=0.0):
+    """Dispatch and immediately complete n jobs; returns their tenants in order"""
+    order = []
+    for _ in range(n):
+        job = s.next_job(now=now)
+        if job is None:
+            break
+        order.append(job.tenant_id)
+        s.complete(job)
+    return order
+
+
+def test_flooding_tenant_does_not_starve_newcomer():
+    s = scheduler()
+    for i in range(5000):
+        s.submit(Job(f"e{i}", "big", tier="enterprise"), now=0.0)
+    drain(s, 10)
+    s.submit(Job("f1", "small", tier="free"), now=1.0)
+    assert "small" in drain(s, 2, now=1.0)
+
+
+def test_backlogged_tenants_share_by_tier_weight():
+    s = scheduler()
+    for i in range(200):
+        s.submit(Job(f"p{i}", "pro-t", tier="pro"), now=0.0)
+        s.submit(Job(f"f{i}", "free-t", tier="free"), now=0.0)
+    order = drain(s, 100)
+    assert order.count("pro-t") == 80 and order.count("free-t") == 20
+
+
+def test_tenant_and_source_caps_park_and_resume():
+    s = scheduler(tenant_concurrency={"free": 2}, source_concurrency={"linkedin": 1}, interactive_reserve=0)
+    for i in range(3):
+        s.submit(Job(f"a{i}", "a", source="yelp"), now=0.0)
+    s.submit(Job("b0", "b", source="linkedin"), now=0.0)
+    s.submit(Job("b1", "b", source="linkedin"), now=0.0)
+    running = [s.next_job(now=0.0) for _ in range(4)]
+    assert [j.job_id for j in running[:3]] == ["a0", "b0", "a1"] and running[3] is None
+    assert len(s) == 2
+    s.complete(running[1])  # frees the linkedin slot
+    assert s.next_job(now=0.0).job_id == "b1"
+    s.complete(running[0])  # frees a slot of tenant a
+    assert s.next_job(now=0.0).job_id == "a2"
+
+
+def test_batch_leaves_reserved_source_slots_to_interactive():
+    s = scheduler(source_concurrency={"linkedin": 2})
+    for i in range(3):
+        s.submit(Job(f"b{i}", "big", tier="enterprise", source="linkedin"), now=0.0)
+    assert s.next_job(now=0.0).job_id == "b0"
+    assert s.next_job(now=0.0) is None
+    s.submit(Job("i0", "small", source="linkedin", kind=INTERACTIVE), now=1.0)
+    assert s.next_job(now=1.0).job_id == "i0"
+
+
+def test_interactive_jobs_keep_their_own_clock_and_deadline():
+    s = scheduler(tenant_concurrency={"free": 100, "pro": 1})
+    for i in range(50):
+        s.submit(Job(f"b{i}", "t", tier="pro", kind=BATCH), now=0.0)
+    s.submit(Job("i0", "t", tier="pro", kind=INTERACTIVE), now=0.0)
+    order = []
+    for _ in range(3):
+        job = s.next_job(now=0.0)
+        order.append(job.job_id)
+        s.complete(job)
+    assert order == ["b0", "i0", "b1"]  # not queued behind its own tenant's batch backlog
+
+    s = scheduler()
+    s.submit(Job("fill", "other", tier="free"), now=0.0)
+    urgent = s.submit(Job("i1", "late", tier="free", kind=INTERACTIVE), now=0.0)
+    s.submit(Job("x", "zz", tier="free"), now=0.0)
+    assert urgent.deadline == 30.0
+    # Within urgent_slack of its deadline, the interactive job runs ahead of fair order
+    assert s.next_job(now=26.0).job_id == "i1"
+    assert len(s) == 2
+
+
+def test_recipe_queue_serves_worker_threads_until_closed():
+    queue = RecipeQueue(scheduler(tenant_concurrency={"free": 1}))
+    done, lock = [], threading.Lock()
+
+    def work():
+        while (job := queue.get(timeout=5)) is not None:
+            with lock:
+                done.append(job.job_id)
+            queue.done(job)
+
+    threads = [threading.Thread(target=work) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for i in range(20):
+        queue.put(Job(str(i), f"t{i % 4}"))
+    queue.close()
+    for t in threads:
+        t.join(5)
+    assert sorted(done, key=int) == [str(i) for i in range(20)]
@@ -0,0 +1,213 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from app.components import call_component, component_key
+from app.executor import SingleFlight, make_key, recipe_key
+
+
+def test_make_key_is_order_independent_for_dicts():
+    assert make_key({"a": 1, "b": 2}) == make_key({"b": 2, "a": 1})
+    assert make_key("x", 1) != make_key("x", 2)
+
+
+def test_recipe_key_scoped_by_tenant():
+    inputs = {"query": "dentist pune"}
+    assert recipe_key("t1", "hunt", inputs) != recipe_key("t2", "hunt", inputs)
+    assert recipe_key("t1", "hunt", inputs, "job-1") != recipe_key("t1", "hunt", inputs, "job-2")
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def work():
+        calls.append(1)
+        release.wait(2)
+        return "leads"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", work))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ["leads"] * 8
+    assert flight.in_flight() == 0
+
+
+def test_errors_fan_out_and_are_not_cached():
+    flight = SingleFlight()
+
+    def boom():
+        raise RuntimeError("groq down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.do("k", lambda: 42) == 42
+
+
+def test_async_waiters_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return [1, 2, 3]
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async("k", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == [[1, 2, 3]] * 5
+    assert len(calls) == 1
+
+
+def test_async_flights_are_per_event_loop():
+    flight = SingleFlight()
+    started = threading.Barrier(2)
+
+    async def work():
+        started.wait(2)  # both loops are inside the flight at once
+        await asyncio.sleep(0.01)
+        return "leads"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(flight.do_async("k", work))))
+               for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["leads"] * 2
+    assert flight.in_flight() == 0
+
+
+def test_call_component_keys_on_config():
+    assert component_key("t", "expander", {"temperature": 0.7}, "q") != \
+        component_key("t", "expander", {"temperature": 0.2}, "q")
+    assert call_component("t", "expander", {}, "q", lambda: ["q1", "q2"]) == ["q1", "q2"]
+
+
+# ============= STEP CACHE & CHECKPOINTS =============
+
+from app.executor import Step, StepCache, run_steps
+
+
+def _counting_steps(calls, fail_at=None, scale=2):
+    def step(name, fn, **kw):
+        def run(value):
+            calls.append(name)
+            if name == fail_at:
+                raise RuntimeError(f"{name} failed")
+            return fn(value)
+        return Step(name, name, kw.pop("config", {}), run, **kw)
+
+    return [
+        step("expand", lambda q: [q, q + "!"]),
+        step("discover", lambda qs: [len(q) for q in qs], cacheable=False),
+        step("score", lambda xs: [x * scale for x in xs], config={"scale": scale}),
+    ]
+
+
+def test_retried_run_resumes_after_last_completed_step(tmp_path):
+    cache, calls = StepCache(str(tmp_path)), []
+    with pytest.raises(RuntimeError):
+        run_steps("t", "job-1", _counting_steps(calls, fail_at="score"), "abc", cache)
+    calls.clear()
+    result = run_steps("t", "job-1", _counting_steps(calls), "abc", cache)
+    assert result.output == [6, 8]
+    assert calls == ["score"]
+    assert result.resumed == ["expand", "discover"] and result.executed == ["score"]
+
+
+def test_unchanged_rerun_is_served_from_cache(tmp_path):
+    cache, calls = StepCache(str(tmp_path)), []
+    run_steps("t", "job-1", _counting_steps(calls), "abc", cache)
+    calls.clear()
+    # A new run: non-cacheable discovery re-runs, but returns the same output, so scoring is a hit
+    result = run_steps("t", "job-2", _counting_steps(calls), "abc", cache)
+    assert result.output == [6, 8]
+    assert calls == ["discover"]
+    assert result.cached == ["expand", "score"]
+    # Same run again: everything is checkpointed
+    calls.clear()
+    assert run_steps("t", "job-2", _counting_steps(calls), "abc", cache).resumed == ["expand", "discover", "score"]
+    assert calls == []
+
+
+def test_config_and_tenant_change_the_key(tmp_path):
+    cache, calls = StepCache(str(tmp_path)), []
+    run_steps("t", "job-1", _counting_steps(calls), "abc", cache)
+    calls.clear()
+    assert run_steps("t", "job-1", _counting_steps(calls, scale=3), "abc", cache).output == [9, 12]
+    assert calls == ["score"]
+    calls.clear()
+    run_steps("other", "job-9", _counting_steps(calls), "abc", cache)
+    assert calls == ["expand", "discover", "score"]
+
+
+def test_expired_entries_are_misses_and_pruned(tmp_path):
+    cache, calls = StepCache(str(tmp_path), ttl_seconds=-1), []
+    run_steps("t", "job-1", _counting_steps(calls), "abc", cache)
+    assert cache.prune() > 0
+    assert not os.listdir(tmp_path / "runs")  # the run's checkpoint expires with its outputs
+    calls.clear()
+    run_steps("t", "job-2", _counting_steps(calls), "abc", cache)
+    assert calls == ["expand", "discover", "score"]
+
+
+def test_lead_hunt_resumes_without_repeating_discovery(tmp_path):
+    from app.recipes import expand_queries, lead_hunt_steps
+    from tests.test_components import FakeClient
+
+    assert expand_queries({"query": "dentist", "locations": ["Pune", "Pune", "Mumbai"]}) == \
+        ["dentist in Pune", "dentist in Mumbai"]
+
+    clients = []
+
+    def client_factory():
+        clients.append(FakeClient())
+        return clients[-1]
+
+    cache = StepCache(str(tmp_path))
+    inputs = {"query": "dentist", "locations": ["Pune"], "per_query": 2}
+    steps = lead_hunt_steps("t", inputs, client_factory)[:4]  # without the DB store step
+    broken = steps[:3] + [steps[3]._replace(fn=lambda leads: 1 / 0)]
+    with pytest.raises(ZeroDivisionError):
+        run_steps("t", "hunt-1", broken, inputs, cache)
+    result = run_steps("t", "hunt-1", steps, inputs, cache)
+    assert len(clients) == 1
+    assert result.executed == ["score"] and len(result.output) == 2
+
+
+def test_concurrent_lead_hunts_share_one_discovery_call(tmp_path):
+    from app.recipes import lead_hunt_steps
+    from tests.test_components import FakeClient
+
+    clients = []
+
+    def client_factory():
+        clients.append(FakeClient())
+        time.sleep(0.2)  # discovery still in flight when the other run gets there
+        return clients[-1]
+
+    inputs = {"query": "dentist", "locations": ["Pune"], "per_query": 2}
+    steps = lead_hunt_steps("t", inputs, client_factory)[:2]
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(
+        run_steps("t", f"hunt-{i}", steps, inputs, StepCache(str(tmp_path / str(i)))))) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(clients) == 1
+    assert [r.executed for r in results] == [["expand", "discover"]] * 2
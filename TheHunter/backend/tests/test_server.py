@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+from service_kit.server import Master, available_cpus, bind, memory_kb
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="fork + /proc/<pid>/smaps_rollup")
+
+
+def test_memory_kb_reads_own_process():
+    usage = memory_kb(os.getpid())
+    assert usage["rss"] > 0
+    assert usage["shared"] + usage["private"] == usage["rss"]
+    assert memory_kb(2 ** 22 + 1) is None  # no such pid
+
+
+def test_dead_worker_is_restarted(monkeypatch):
+    sock = bind("127.0.0.1", 0)
+    master = Master(config=None, sock=sock, workers=1)
+    monkeypatch.setattr("service_kit.server._serve", lambda config, sock, ready_fd: os._exit(3))
+    master.spawn(0)
+    [first] = master.workers
+    while first in master.workers:
+        master._reap()  # the first worker exits with 3 and is replaced
+    [second] = master.workers
+    assert second != first and master.workers[second] == 0
+    master.stopping = True  # don't restart the replacement when it exits too
+    while master.workers:
+        master._reap()
+    sock.close()
+
+
+def test_available_cpus_honours_cgroup_quota(tmp_path):
+    affinity = len(os.sched_getaffinity(0))
+    (tmp_path / "cpu.max").write_text("150000 100000\n")  # 1.5 CPUs
+    assert available_cpus(str(tmp_path)) == min(affinity, 2)
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert available_cpus(str(tmp_path)) == affinity
+    (tmp_path / "cpu.max").unlink()
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("50000\n")  # cgroup v1
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert available_cpus(str(tmp_path)) == 1
+
+
+def test_shutdown_tolerates_workers_that_are_already_gone():
+    sock = bind("127.0.0.1", 0)
+    master = Master(config=None, sock=sock, workers=1)
+    master.workers[2 ** 22 + 1] = 0  # no such process
+    master.shutdown(timeout=0)
+    assert master.workers == {}
+    sock.close()
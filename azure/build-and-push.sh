@@ -52,7 +52,7 @@ log_info "Building backend image..."
 docker build -t "$REGISTRY_URL/the-hunter-api:latest" \
     --build-arg BUILDKIT_INLINE_CACHE=1 \
     -f TheHunter/backend/Dockerfile \
-    TheHunter/backend || {
+    . || {
     log_error "Failed to build backend image"
     exit 1
 }
@@ -84,8 +84,8 @@ echo "  [OK] Frontend image pushed"
 # Step 5: Build and push backend
 echo ""
 echo "Step 5: Building and pushing backend..."
-cd "$REPO_ROOT/TheHunter/backend"
-docker build -t $REGISTRY_URL/the-hunter-backend:latest . > /dev/null 2>&1
+cd "$REPO_ROOT"
+docker build -t $REGISTRY_URL/the-hunter-backend:latest -f TheHunter/backend/Dockerfile . > /dev/null 2>&1
 docker push $REGISTRY_URL/the-hunter-backend:latest > /dev/null 2>&1
 echo "  [OK] Backend image pushed"
 
@@ -111,7 +111,7 @@ build_and_push_images() {
     log_info "Building backend image..."
     docker build -t "$REGISTRY_URL/the-hunter-api:latest" \
         -f TheHunter/backend/Dockerfile \
-        TheHunter/backend
+        .
     
     log_info "Pushing backend image..."
     docker push "$REGISTRY_URL/the-hunter-api:latest"
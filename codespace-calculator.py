@@ -5,40 +5,96 @@ Runs on port 3000 - no Docker or database needed
 Access via Codespace forwarded port URL
 """
 
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import HTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+import gzip
+import hashlib
 import json
+import os
+import sys
+import threading
 
 PORT = 3000
-HISTORY = []
+HISTORY_LIMIT = int(os.environ.get('CALC_HISTORY_LIMIT', '1000'))
+
+# Ring buffer: oldest calculations fall off once HISTORY_LIMIT is reached
+HISTORY = deque(maxlen=HISTORY_LIMIT)
+HISTORY_LOCK = threading.Lock()
+_history_snapshot = None  # Cached JSON of the full buffer, rebuilt after each append
+
+
+def add_history(record):
+    global _history_snapshot
+    with HISTORY_LOCK:
+        HISTORY.append(record)
+        _history_snapshot = None
+
+
+def history_json(offset=None, limit=None):
+    """Serialized history; the unpaginated view is cached until the next append"""
+    global _history_snapshot
+    with HISTORY_LOCK:
+        if offset is None and limit is None:
+            if _history_snapshot is None:
+                _history_snapshot = json.dumps(list(HISTORY)).encode()
+            return _history_snapshot
+        start = offset or 0
+        stop = len(HISTORY) if limit is None else start + limit
+        page = [HISTORY[i] for i in range(start, min(stop, len(HISTORY)))]
+    return json.dumps(page).encode()
+
 
 class CalculatorHandler(SimpleHTTPRequestHandler):
+    def _send_body(self, status, content_type, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, body):
+        self._send_body(status, 'application/json', body)
+
     def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            self.wfile.write(HTML_PAGE.encode())
-        elif self.path == '/api/health':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "ok"}).encode())
-        elif self.path == '/api/history':
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps(HISTORY).encode())
+        url = urlsplit(self.path)
+        if url.path == '/':
+            if HTML_ETAG in self.headers.get('If-None-Match', ''):
+                self.send_response(304)
+                self.send_header('ETag', HTML_ETAG)
+                self.end_headers()
+            elif 'gzip' in self.headers.get('Accept-Encoding', ''):
+                self._send_body(200, 'text/html', HTML_GZIP,
+                                {'Content-Encoding': 'gzip', 'ETag': HTML_ETAG, 'Vary': 'Accept-Encoding'})
+            else:
+                self._send_body(200, 'text/html', HTML_BYTES, {'ETag': HTML_ETAG, 'Vary': 'Accept-Encoding'})
+        elif url.path == '/api/health':
+            self._send_json(200, b'{"status": "ok"}')
+        elif url.path == '/api/history':
+            query = parse_qs(url.query)
+            try:
+                offset = int(query['offset'][0]) if 'offset' in query else None
+                limit = int(query['limit'][0]) if 'limit' in query else None
+                if (offset or 0) < 0 or (limit or 0) < 0:
+                    raise ValueError("offset and limit must be non-negative")
+            except ValueError as e:
+                self._send_json(400, json.dumps({"error": str(e)}).encode())
+                return
+            self._send_json(200, history_json(offset, limit))
         else:
             self.send_response(404)
+            self.send_header('Content-Length', '0')
             self.end_headers()
 
     def do_POST(self):
         if self.path == '/api/calculate':
             content_length = int(self.headers['Content-Length'])
             body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
             
             try:
+                data = json.loads(body.decode())
                 operand1 = float(data['operand1'])
                 operand2 = float(data['operand2'])
                 operation = data['operation']
@@ -62,19 +118,14 @@ class CalculatorHandler(SimpleHTTPRequestHandler):
                     "operand2": operand2,
                     "result": result
                 }
-                HISTORY.append(record)
+                add_history(record)
                 
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps(record).encode())
+                self._send_json(200, json.dumps(record).encode())
             except Exception as e:
-                self.send_response(400)
-                self.send_header('Content-type', 'application/json')
-                self.end_headers()
-                self.wfile.write(json.dumps({"error": str(e)}).encode())
+                self._send_json(400, json.dumps({"error": str(e)}).encode())
         else:
             self.send_response(404)
+            self.send_header('Content-Length', '0')
             self.end_headers()
 
     def log_message(self, format, *args):
@@ -340,8 +391,16 @@ HTML_PAGE = '''<!DOCTYPE html>
 </html>
 '''
 
+# Served pre-encoded; the page never changes while the server runs
+HTML_BYTES = HTML_PAGE.encode()
+HTML_GZIP = gzip.compress(HTML_BYTES, 9)
+HTML_ETAG = '"' + hashlib.sha256(HTML_BYTES).hexdigest()[:16] + '"'
+
 if __name__ == '__main__':
+    # One thread per connection so a slow client cannot block others;
+    # pass --single-thread for the old sequential server
+    server_class = HTTPServer if '--single-thread' in sys.argv else ThreadingHTTPServer
     print(f">> The Hunter Calculator running on http://localhost:{PORT}")
     print(f">> Access via Codespace forwarded URL")
-    server = HTTPServer(('0.0.0.0', PORT), CalculatorHandler)
+    server = server_class(('0.0.0.0', PORT), CalculatorHandler)
     server.serve_forever()
@@ -78,7 +78,7 @@ get_watch_paths() {
     # Simplified: hard-coded paths (in production would parse YAML)
     case $service in
         backend)
-            echo "TheHunter/backend/app TheHunter/backend/requirements.txt TheHunter/backend/Dockerfile"
+            echo "TheHunter/backend/app TheHunter/backend/requirements.txt TheHunter/backend/Dockerfile common/service_kit common/pyproject.toml"
             ;;
         frontend)
             echo "TheHunter/frontend/src TheHunter/frontend/package.json TheHunter/frontend/Dockerfile"
@@ -139,8 +139,8 @@ build_service() {
     local context dockerfile
     case $service in
         backend)
-            context="TheHunter/backend"
-            dockerfile="Dockerfile"
+            context="."  # repository root, for common/service_kit
+            dockerfile="TheHunter/backend/Dockerfile"
             image_name="the-hunter-api:latest"
             ;;
         frontend)
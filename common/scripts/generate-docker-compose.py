@@ -2,12 +2,23 @@
 # generate-docker-compose.py
 # Generates docker-compose.yml from devconfig.yaml
 # Maintains single source of truth while supporting multiple environments
+#
+# Usage: generate-docker-compose.py [environment | --all] [--force]
+# Outputs whose config subtree hash (and this script) are unchanged are skipped,
+# and files are only rewritten (atomically) when their content actually changes.
+# --force regenerates every output but still records it in the cache.
 
+import hashlib
+import json
+import tempfile
 import yaml
 import sys
 import os
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+# Part of every config hash: editing the generator invalidates what it generated before
+SCRIPT_HASH = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
 
 class DockerComposeGenerator:
     def __init__(self, devconfig_path: str):
@@ -67,7 +78,8 @@ class DockerComposeGenerator:
                 service['image'] = image_config.get('local', image_config['name'])
             else:
                 registry = self.config['environments'][environment]['registry']
-                service['image'] = f"{registry}/{image_config['registry']}:{image_config['tags'][0]}"
+                tag = image_config['tags'][0] if image_config.get('tags') else image_config.get('version', 'latest')
+                service['image'] = f"{registry}/{image_config['registry']}:{tag}"
         
         # Handle ports
         if 'ports' in config:
@@ -131,33 +143,150 @@ class DockerComposeGenerator:
             'cache_from': build_config.get('cache_from', [])
         }
     
-    def save_compose_file(self, compose_config: Dict, output_path: str):
-        """Save generated compose config to file"""
-        with open(output_path, 'w') as f:
-            yaml.dump(compose_config, f, default_flow_style=False, sort_keys=False)
+    def save_compose_file(self, compose_config: Dict, output_path: str) -> bool:
+        """Save generated compose config to file; returns False if it was already up to date"""
+        content = render_compose(compose_config)
+        if not write_if_changed(output_path, content):
+            print(f"Unchanged: {output_path}")
+            return False
         print(f"Generated: {output_path}")
+        return True
+    
+    def config_hash(self, environment: str) -> str:
+        """Hash of every devconfig subtree that feeds this environment's compose file"""
+        services = {
+            name: self.service_hash(name, environment)
+            for name, config in self.config.get('services', {}).items()
+            if config.get('enabled', True)
+        }
+        return _digest({
+            'generator': SCRIPT_HASH,
+            'services': services,
+            'volumes': self.config.get('volumes'),
+            'networks': self.config.get('networks'),
+        })
+    
+    def service_hash(self, name: str, environment: str) -> str:
+        """Hash of the config one service's compose entry is built from"""
+        return _digest({
+            'service': self.config['services'][name],
+            'environment': self.config.get('environments', {}).get(environment),
+            'network': self.config.get('global', {}).get('docker_network'),
+        })
+    
+    def environments(self) -> List[str]:
+        return list(self.config.get('environments', {}) or {'local': {}})
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def render_compose(compose_config: Dict) -> str:
+    return yaml.dump(compose_config, default_flow_style=False, sort_keys=False)
+
+def write_if_changed(output_path: str, content: str) -> bool:
+    """Atomically replace output_path with content unless it already matches"""
+    try:
+        with open(output_path, 'r') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(os.path.abspath(output_path))
+    try:
+        mode = os.stat(output_path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.compose-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+class GenerationCache:
+    """Config hash and content hash of each generated file from the previous run"""
+    
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self.entries = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+        self.dirty = False
+    
+    def is_fresh(self, output_path: Path, config_hash: str) -> bool:
+        entry = self.entries.get(str(output_path))
+        if not entry or entry.get('config_hash') != config_hash:
+            return False
+        try:
+            content = output_path.read_bytes()
+        except FileNotFoundError:
+            return False
+        # A hand-edited output is regenerated even if the config did not change
+        return hashlib.sha256(content).hexdigest() == entry.get('content_hash')
+    
+    def record(self, output_path: Path, config_hash: str):
+        self.entries[str(output_path)] = {
+            'config_hash': config_hash,
+            'content_hash': hashlib.sha256(output_path.read_bytes()).hexdigest(),
+        }
+        self.dirty = True
+    
+    def save(self):
+        if self.dirty:
+            write_if_changed(str(self.path), json.dumps(self.entries, indent=2, sort_keys=True) + '\n')
+
+def output_path_for(project_root: Path, environment: str) -> Path:
+    if environment == 'local':
+        return project_root / 'TheHunter' / 'docker-compose.yml'
+    return project_root / f'docker-compose.{environment}.yml'
+
+def generate(generator: DockerComposeGenerator, project_root: Path, environment: str,
+             cache: Optional[GenerationCache] = None, force: bool = False) -> bool:
+    """Generate one environment's compose file; returns True if it was written"""
+    output_path = output_path_for(project_root, environment)
+    config_hash = generator.config_hash(environment)
+    if not force and cache is not None and cache.is_fresh(output_path, config_hash):
+        print(f"Up to date: {output_path}")
+        return False
+    compose_config = generator.generate_compose(environment)
+    written = generator.save_compose_file(compose_config, str(output_path))
+    if cache is not None:
+        cache.record(output_path, config_hash)
+    return written
 
 def main():
     script_dir = Path(__file__).parent.parent
-    devconfig_path = script_dir.parent / 'devconfig.yaml'
+    project_root = script_dir.parent
+    devconfig_path = project_root / 'devconfig.yaml'
     
     if not devconfig_path.exists():
         print(f"Error: devconfig.yaml not found at {devconfig_path}", file=sys.stderr)
         sys.exit(1)
     
-    environment = sys.argv[1] if len(sys.argv) > 1 else 'local'
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
     
+    # Parse devconfig.yaml once, however many environments are generated
     generator = DockerComposeGenerator(str(devconfig_path))
-    compose_config = generator.generate_compose(environment)
+    environments = generator.environments() if '--all' in flags else [args[0] if args else 'local']
+    cache = GenerationCache(project_root / '.compose-cache.json')
     
-    # Save to appropriate location
-    if environment == 'local':
-        output_path = script_dir.parent / 'TheHunter' / 'docker-compose.yml'
-    else:
-        output_path = script_dir.parent / f'docker-compose.{environment}.yml'
+    written = 0
+    for environment in environments:
+        if generate(generator, project_root, environment, cache, force='--force' in flags):
+            written += 1
+        print(f"✓ Docker Compose file ready for environment: {environment}")
     
-    generator.save_compose_file(compose_config, str(output_path))
-    print(f"✓ Docker Compose file generated for environment: {environment}")
+    cache.save()
+    print(f"{written} of {len(environments)} compose file(s) rewritten")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+# loadgen.py
+# Async HTTP load generator for the AgentsHome and The Hunter APIs.
+# Reports throughput and p50/p95/p99 per scenario and compares runs against
+# JSON baselines with regression thresholds.
+#
+# Usage:
+#   python common/scripts/loadgen.py --app agentshome --serve --duration 10 --save-baseline
+#   python common/scripts/loadgen.py --app agentshome --serve --duration 10 --compare
+#   python common/scripts/loadgen.py --app hunter --base-url http://localhost:8000
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BASELINE_DIR = PROJECT_ROOT / 'common' / 'benchmarks'
+APP_DIRS = {
+    'agentshome': PROJECT_ROOT / 'AgentsHome' / 'backend',
+    'hunter': PROJECT_ROOT / 'TheHunter' / 'backend',
+}
+HEALTH_PATHS = {'agentshome': '/health', 'hunter': '/api/health'}
+DEFAULT_THRESHOLDS = {
+    'max_throughput_drop': 0.20,   # fail if throughput falls more than 20%
+    'max_p99_increase': 0.30,      # fail if p99 latency grows more than 30%
+}
+
+Scenario = Callable[[httpx.AsyncClient, dict], Awaitable[None]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _check(response: httpx.Response):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{response.request.method} {response.request.url.path} -> {response.status_code}")
+
+
+# ============= AGENTSHOME SCENARIOS =============
+
+async def agentshome_setup(client: httpx.AsyncClient) -> dict:
+    email = f"load-{uuid.uuid4().hex[:8]}@agentshome.com"
+    password = 'LoadTest123'
+    response = await client.post('/api/auth/signup', json={'email': email, 'password': password, 'name': 'Load'})
+    _check(response)
+    auth = {'authorization': f"Bearer {response.json()['token']}"}
+    _check(await client.post('/api/subscriptions/', params=auth, json={'agent_id': 'hunter', 'plan_tier': 'pro'}))
+    for i in range(5):
+        _check(await client.post('/api/api-keys/', params=auth, json={'agent_id': 'hunter', 'name': f'key-{i}'}))
+    return {'email': email, 'password': password, 'auth': auth}
+
+
+async def login(client, ctx):
+    _check(await client.post('/api/auth/login', json={'email': ctx['email'], 'password': ctx['password']}))
+
+
+async def list_subscriptions(client, ctx):
+    _check(await client.get('/api/subscriptions/', params=ctx['auth']))
+
+
+async def account_context(client, ctx):
+    _check(await client.get('/api/account/context', params=ctx['auth']))
+
+
+async def api_key_crud(client, ctx):
+    response = await client.post('/api/api-keys/', params=ctx['auth'], json={'agent_id': 'hunter', 'name': 'crud'})
+    _check(response)
+    key_id = response.json()['id']
+    _check(await client.get('/api/api-keys/', params=ctx['auth']))
+    _check(await client.put(f'/api/api-keys/{key_id}/revoke', params=ctx['auth']))
+    _check(await client.delete(f'/api/api-keys/{key_id}', params=ctx['auth']))
+
+
+# ============= THE HUNTER SCENARIOS =============
+
+async def hunter_setup(client: httpx.AsyncClient) -> dict:
+    for i in range(20):
+        await calculate(client, {'i': i})
+    return {}
+
+
+async def calculate(client, ctx):
+    _check(await client.post('/api/v1/calculator/calculate',
+                             json={'operation': 'multiply', 'operand1': 6, 'operand2': 7}))
+
+
+async def calculation_history(client, ctx):
+    _check(await client.get('/api/v1/calculator/history'))
+
+
+SCENARIOS: Dict[str, Dict[str, Scenario]] = {
+    'agentshome': {
+        'login': login,
+        'list_subscriptions': list_subscriptions,
+        'account_context': account_context,
+        'api_key_crud': api_key_crud,
+    },
+    'hunter': {
+        'calculate': calculate,
+        'calculation_history': calculation_history,
+    },
+}
+SETUP = {'agentshome': agentshome_setup, 'hunter': hunter_setup}
+
+
+# ============= RUNNER =============
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, ctx: dict,
+                       concurrency: int, duration: float) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                await scenario(client, ctx)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 2),
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+    }
+
+
+async def run(app: str, base_url: str, scenarios: List[str], concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        ctx = await SETUP[app](client)
+        results = {}
+        for name in scenarios:
+            results[name] = await run_scenario(client, SCENARIOS[app][name], ctx, concurrency, duration)
+            print(f"{name:<22} {json.dumps(results[name])}")
+        return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(app: str, workdir: str, extra_env: Optional[Dict[str, str]] = None) -> (subprocess.Popen, str):
+    """Start the app under uvicorn against a throwaway SQLite database"""
+    port = _free_port()
+    # Rate limiting would cap a single load-test user long before the server saturates, and load
+    # shedding would turn a saturated run's slow requests into errors (overload.py turns it back on)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir}/loadgen.db", RATE_LIMIT_ENABLED="false",
+               LOAD_SHEDDING_ENABLED="false")
+    # service_kit straight from the checkout, installed or not
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(PROJECT_ROOT / 'common'), env.get('PYTHONPATH')]))
+    env.update(extra_env or {})
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'app.main:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning'],
+        cwd=APP_DIRS[app], env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + HEALTH_PATHS[app], timeout=1).status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{app} did not become healthy on {base_url}")
+
+
+def compare(results: dict, baseline: dict) -> List[str]:
+    """Regressions of this run against a stored baseline"""
+    thresholds = {**DEFAULT_THRESHOLDS, **baseline.get('thresholds', {})}
+    failures = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        floor = previous['throughput_rps'] * (1 - thresholds['max_throughput_drop'])
+        if current['throughput_rps'] < floor:
+            failures.append(f"{name}: throughput {current['throughput_rps']} rps < {floor:.2f} rps")
+        ceiling = previous['p99_ms'] * (1 + thresholds['max_p99_increase'])
+        if current['p99_ms'] > ceiling:
+            failures.append(f"{name}: p99 {current['p99_ms']} ms > {ceiling:.2f} ms")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Async HTTP load generator')
+    parser.add_argument('--app', choices=sorted(SCENARIOS), required=True)
+    parser.add_argument('--base-url', help='target a running server instead of --serve')
+    parser.add_argument('--serve', action='store_true', help='start the app locally on SQLite')
+    parser.add_argument('--scenario', action='append', help='scenario to run (default: all)')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per scenario')
+    parser.add_argument('--baseline', help='baseline JSON file (default: common/benchmarks/loadgen-<app>.json)')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--compare', action='store_true', help='exit 1 on regression against the baseline')
+    args = parser.parse_args()
+
+    if not args.base_url and not args.serve:
+        parser.error('pass --base-url or --serve')
+    scenarios = args.scenario or list(SCENARIOS[args.app])
+    baseline_path = Path(args.baseline or BASELINE_DIR / f'loadgen-{args.app}.json')
+
+    process: Optional[subprocess.Popen] = None
+    with tempfile.TemporaryDirectory() as workdir:
+        base_url = args.base_url
+        if args.serve:
+            process, base_url = serve(args.app, workdir)
+        try:
+            results = asyncio.run(run(args.app, base_url, scenarios, args.concurrency, args.duration))
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+
+    report = {
+        'app': args.app,
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'thresholds': DEFAULT_THRESHOLDS,
+        'results': results,
+    }
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        if baseline_path.exists():
+            report['thresholds'] = json.loads(baseline_path.read_text()).get('thresholds', DEFAULT_THRESHOLDS)
+        baseline_path.write_text(json.dumps(report, indent=2) + '\n')
+        print(f"Saved baseline: {baseline_path}")
+    if args.compare:
+        if not baseline_path.exists():
+            print(f"No baseline at {baseline_path}", file=sys.stderr)
+            return 1
+        failures = compare(results, json.loads(baseline_path.read_text()))
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            return 1
+        print('No regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# overload.py
+# Overload test for load shedding (service_kit.load_shedding, used by both backends).
+# Floods the app with low-priority and normal requests from many closed-loop
+# clients while a separate process probes its protected routes (critical:
+# health; auth: login) at a fixed rate, then reports latency and 503s per
+# priority class. With --compare-off the same run is repeated with shedding
+# disabled.
+#
+# Usage:
+#   python common/scripts/overload.py --app hunter --serve --compare-off
+#   python common/scripts/overload.py --app agentshome --serve --clients 100 --max-critical-p99-ms 1000
+#   python common/scripts/overload.py --app hunter --base-url http://localhost:8000
+
+import argparse
+import asyncio
+import multiprocessing
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import httpx
+
+from loadgen import agentshome_setup, calculate, percentile, serve
+
+Request = Dict[str, object]  # keyword arguments of httpx.AsyncClient.request
+
+
+# ============= TRAFFIC MIX =============
+
+async def hunter_setup(client: httpx.AsyncClient) -> dict:
+    for _ in range(500):  # a heavy history page
+        await calculate(client, {})
+    return {}
+
+
+def hunter_traffic(ctx: dict) -> Dict[str, List[Request]]:
+    return {
+        'critical': [{'method': 'GET', 'url': '/api/health'}],
+        'auth': [{'method': 'POST', 'url': '/api/auth/login',
+                  'json': {'email': 'test@agentshome.com', 'password': 'TestPassword123'}}],
+        'normal': [{'method': 'POST', 'url': '/api/v1/calculator/calculate',
+                    'json': {'operation': 'multiply', 'operand1': 6, 'operand2': 7}}],
+        'low': [{'method': 'GET', 'url': '/api/v1/calculator/history', 'params': {'limit': 500}}],
+    }
+
+
+def agentshome_traffic(ctx: dict) -> Dict[str, List[Request]]:
+    return {
+        'critical': [{'method': 'GET', 'url': '/health'}],
+        'auth': [{'method': 'POST', 'url': '/api/auth/login',
+                  'json': {'email': ctx['email'], 'password': ctx['password']}}],
+        'normal': [{'method': 'GET', 'url': '/api/subscriptions/', 'params': ctx['auth']},
+                   {'method': 'GET', 'url': '/api/account/context', 'params': ctx['auth']}],
+        'low': [{'method': 'POST', 'url': '/api/api-keys/bulk', 'params': ctx['auth'],
+                 'json': {'keys': [{'agent_id': 'hunter', 'name': f'bulk-{i}'} for i in range(10)]}}],
+    }
+
+
+OVERLOAD_SETUP = {'hunter': hunter_setup, 'agentshome': agentshome_setup}
+TRAFFIC = {'hunter': hunter_traffic, 'agentshome': agentshome_traffic}
+PROTECTED = ('critical', 'auth')  # probed at a fixed rate, never flooded
+
+
+# ============= RUNNER =============
+
+class Tally:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.shed = 0
+        self.errors = 0
+
+    async def send(self, client: httpx.AsyncClient, request: Request):
+        start = time.perf_counter()
+        try:
+            response = await client.request(**request)
+        except httpx.HTTPError:
+            self.errors += 1
+            return
+        if response.status_code == 503:
+            self.shed += 1
+        elif response.status_code >= 400:
+            self.errors += 1
+        else:
+            self.latencies.append((time.perf_counter() - start) * 1000)
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+        return {'ok': len(ordered), 'shed': self.shed, 'errors': self.errors,
+                'p50_ms': round(percentile(ordered, 50), 1), 'p99_ms': round(percentile(ordered, 99), 1)}
+
+
+async def _probe(base_url: str, traffic: Dict[str, List[Request]], rate: float,
+                 duration: float) -> Dict[str, dict]:
+    tallies = {name: Tally() for name in traffic}
+    schedule = [(name, request) for name, requests in traffic.items() for request in requests]
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        probes, deadline, i = [], time.perf_counter() + duration, 0
+        while time.perf_counter() < deadline:
+            name, request = schedule[i % len(schedule)]
+            probes.append(asyncio.ensure_future(tallies[name].send(client, request)))
+            i += 1
+            await asyncio.sleep(1 / rate)
+        await asyncio.gather(*probes)
+    return {name: tally.summary() for name, tally in tallies.items()}
+
+
+def probe(base_url: str, traffic: Dict[str, List[Request]], rate: float, duration: float) -> Dict[str, dict]:
+    """
+    Open-loop protected requests, in their own process: they keep their schedule however
+    slow the server gets, and never queue behind the flood in this process's event loop
+    """
+    return asyncio.run(_probe(base_url, traffic, rate, duration))
+
+
+async def run(app: str, base_url: str, clients: int, low_share: float, probe_rate: float,
+              duration: float) -> Dict[str, dict]:
+    tallies = {name: Tally() for name in ('normal', 'low')}
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        traffic = TRAFFIC[app](await OVERLOAD_SETUP[app](client))
+        deadline = time.perf_counter() + duration
+
+        async def flood(index: int):
+            # Ignores Retry-After, like a client retrying in a tight loop: the worst case
+            name = 'low' if index < clients * low_share else 'normal'
+            requests = traffic[name]
+            i = index
+            while time.perf_counter() < deadline:
+                await tallies[name].send(client, requests[i % len(requests)])
+                i += 1
+
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            protected = asyncio.get_running_loop().run_in_executor(
+                pool, probe, base_url, {name: traffic[name] for name in PROTECTED}, probe_rate, duration)
+            await asyncio.gather(*(flood(i) for i in range(clients)))
+            return {**await protected, **{name: tally.summary() for name, tally in tallies.items()}}
+
+
+def report(label: str, results: Dict[str, dict]):
+    print(f"\n{label}")
+    print(f"  {'class':<9} {'ok':>7} {'shed':>7} {'errors':>7} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, r in results.items():
+        print(f"  {name:<9} {r['ok']:>7} {r['shed']:>7} {r['errors']:>7} {r['p50_ms']:>9} {r['p99_ms']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Overload test: critical-route latency under a flood')
+    parser.add_argument('--app', choices=sorted(TRAFFIC), required=True)
+    parser.add_argument('--base-url', help='target a running server instead of --serve')
+    parser.add_argument('--serve', action='store_true', help='start the app locally on SQLite')
+    parser.add_argument('--compare-off', action='store_true', help='with --serve: also run with shedding off')
+    parser.add_argument('--clients', type=int, default=200, help='concurrent flooding clients')
+    parser.add_argument('--low-share', type=float, default=0.5, help='share of clients on low-priority routes')
+    parser.add_argument('--probe-rate', type=float, default=20.0, help='critical + auth requests per second')
+    parser.add_argument('--duration', type=float, default=15.0)
+    parser.add_argument('--max-critical-p99-ms', type=float,
+                        help='exit 1 if the critical or auth p99 (shedding on) exceeds')
+    args = parser.parse_args()
+
+    if not args.base_url and not args.serve:
+        parser.error('pass --base-url or --serve')
+    options = (args.clients, args.low_share, args.probe_rate, args.duration)
+    runs = [('shedding on', 'true')] + ([('shedding off', 'false')] if args.serve and args.compare_off else [])
+
+    results: Dict[str, Dict[str, dict]] = {}
+    for label, enabled in runs:
+        process = None
+        with tempfile.TemporaryDirectory() as workdir:
+            base_url = args.base_url
+            if args.serve:
+                process, base_url = serve(args.app, workdir, {'LOAD_SHEDDING_ENABLED': enabled})
+            else:
+                label = base_url
+            try:
+                results[label] = asyncio.run(run(args.app, base_url, *options))
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait()
+        report(label, results[label])
+
+    first = next(iter(results.values()))
+    for name in PROTECTED:
+        p99 = first[name]['p99_ms']
+        if args.max_critical_p99_ms is not None and p99 > args.max_critical_p99_ms:
+            print(f"\nFAIL {name} p99 {p99} ms > {args.max_critical_p99_ms} ms", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""
+Infrastructure shared by the TheHunter and AgentsHome backends: compression,
+request instrumentation and /metrics, the sampling profiler and its admin
+routes, load shedding, HTTP cache helpers and the pre-fork server.
+
+Nothing in here reads either app's settings; each backend passes its own
+configuration in.
+"""
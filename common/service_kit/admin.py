@@ -0,0 +1,42 @@
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from typing import Callable, Optional
+from service_kit.profiler import MAX_PROFILE_SECONDS, dump_asyncio_tasks, dump_thread_stacks, profile_for_async
+
+
+def admin_router(admin_token: Callable[[], Optional[str]]) -> APIRouter:
+    """
+    Profiling endpoints under /api/admin. They only exist while admin_token()
+    returns a token, and need it in X-Admin-Token.
+    """
+    def require_admin(x_admin_token: Optional[str] = Header(None)):
+        token = admin_token()
+        if not token:
+            raise HTTPException(status_code=404, detail="Not Found")
+        if not x_admin_token or not hmac.compare_digest(x_admin_token, token):
+            raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+    @router.get("/profile", response_class=PlainTextResponse)
+    async def profile(seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+                      interval_ms: float = Query(5, ge=1, le=1000)):
+        """Sample this worker for `seconds` and return collapsed stacks (flamegraph.pl / speedscope input)"""
+        try:
+            collapsed = await profile_for_async(seconds, interval_ms / 1000)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        return PlainTextResponse(collapsed, headers={"Content-Disposition": "attachment; filename=profile.folded"})
+
+    @router.get("/stacks", response_class=PlainTextResponse)
+    async def thread_stacks():
+        """Current stack of every thread in this worker"""
+        return dump_thread_stacks()
+
+    @router.get("/tasks", response_class=PlainTextResponse)
+    async def asyncio_tasks():
+        """Stack of every pending asyncio task on this worker's event loop"""
+        return dump_asyncio_tasks()
+
+    return router
@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Query
+
+
+def weak_etag(rows: Iterable[Any], fields: Sequence[str]) -> str:
+    """Weak ETag over the version-bearing columns of a result set"""
+    digest = hashlib.blake2b(digest_size=12)
+    for row in rows:
+        digest.update(repr(tuple(getattr(row, f) for f in fields)).encode())
+        digest.update(b"\x1e")
+    return f'W/"{digest.hexdigest()}"'
+
+
+def version_etag(query: Query, entity: Any, fields: Sequence[str]) -> str:
+    """
+    weak_etag of a query's rows, reading only their version columns: a cheap
+    revalidation that sees every committed write, whichever worker made it
+    """
+    return weak_etag(query.with_entities(*(getattr(entity, f) for f in fields)), fields)
+
+
+def if_none_match(request: Request, etag: Optional[str]) -> bool:
+    """True when the client's cached copy matches (weak comparison)"""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+class ETagCache:
+    """
+    Last ETag served per (owner, resource), so a conditional GET can answer 304
+    without touching the database.
+
+    Callers invalidate the owner when they write. Until ttl_seconds expire,
+    a client still holding an ETag from before an unseen write (say, in
+    another process) can be told 304, so keep the TTL to what a stale page
+    may cost. At most `max_entries` are kept, least recently used evicted
+    first, however many owners and pages (resource names carry query
+    parameters) there are.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float]]" = OrderedDict()
+        self._resources: Dict[str, Set[str]] = {}  # owner -> cached resource names, for invalidate()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, owner: str, resource: str) -> Optional[str]:
+        key = (owner, resource)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, owner: str, resource: str, etag: str):
+        key = (owner, resource)
+        with self._lock:
+            self._entries[key] = (etag, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            self._resources.setdefault(owner, set()).add(resource)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, owner: str, prefix: str = ""):
+        """Forget cached ETags of an owner whose resource name starts with prefix"""
+        with self._lock:
+            for resource in [r for r in self._resources.get(owner, ()) if r.startswith(prefix)]:
+                self._remove((owner, resource))
+
+    def _remove(self, key: Tuple[str, str]):
+        del self._entries[key]
+        owner, resource = key
+        resources = self._resources[owner]
+        resources.discard(resource)
+        if not resources:
+            del self._resources[owner]
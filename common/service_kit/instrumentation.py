@@ -0,0 +1,233 @@
+import hmac
+import json
+import logging
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger("app.requests")
+
+# Prometheus-style latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NUMBERS = re.compile(r"\b\d+\b")
+
+
+class RequestStats:
+    """Timings and DB activity collected while one sampled request is handled"""
+
+    __slots__ = ("db_queries", "db_time", "statements", "phases")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+        self.phases: Dict[str, float] = {}
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str):
+    """Record a named phase (e.g. "jwt", "user_lookup") in the Server-Timing header"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.phases[phase] = stats.phases.get(phase, 0.0) + time.perf_counter() - start
+
+
+# ============= SQLALCHEMY HOOKS =============
+
+def install_db_hooks(engine):
+    """Count queries and DB time for the request being handled (sampled requests only)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            context._instrumentation_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _current.get()
+        start = getattr(context, "_instrumentation_start", None)
+        if stats is None or start is None:
+            return
+        stats.db_queries += 1
+        stats.db_time += time.perf_counter() - start
+        stats.statements[_NUMBERS.sub("?", statement)] += 1
+
+
+# ============= METRICS =============
+
+class _Histogram:
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """Per-route latency histograms and request counters, exported in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latency: Dict[Tuple[str, str], _Histogram] = {}
+        self._requests: Counter = Counter()
+        self._db_queries: Counter = Counter()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, db_queries: Optional[int] = None):
+        with self._lock:
+            hist = self._latency.get((method, route))
+            if hist is None:
+                hist = self._latency[(method, route)] = _Histogram()
+            hist.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            hist.total += seconds
+            hist.count += 1
+            self._requests[(method, route, status)] += 1
+            if db_queries is not None:
+                self._db_queries[(method, route)] += db_queries
+
+    def render(self) -> str:
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Request latency by route",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        with self._lock:
+            for (method, route), hist in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{route}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, hist.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {hist.total:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {hist.count}")
+            lines += ["# HELP http_requests_total Requests by route and status",
+                      "# TYPE http_requests_total counter"]
+            for (method, route, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+            lines += ["# HELP http_request_db_queries_total DB queries issued by sampled requests",
+                      "# TYPE http_request_db_queries_total counter"]
+            for (method, route), count in sorted(self._db_queries.items()):
+                lines.append(f'http_request_db_queries_total{{method="{method}",route="{route}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+
+def metrics_endpoint(token: Optional[str] = None):
+    """
+    The /metrics route. With a token, scrapers must send `Authorization: Bearer
+    <token>`; without one, only loopback clients (a sidecar, a port-forward) are
+    answered and everyone else gets 404.
+    """
+
+    def endpoint(request):
+        if token:
+            scheme, _, supplied = request.headers.get("authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(supplied.strip(), token):
+                return PlainTextResponse("Invalid metrics token", status_code=403)
+        elif request.client is None or request.client.host not in LOOPBACK_HOSTS:
+            return PlainTextResponse("Not Found", status_code=404)
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    return endpoint
+
+
+# ============= MIDDLEWARE =============
+
+class InstrumentationMiddleware:
+    """
+    Time every request into the per-route histograms. A sampled fraction of
+    requests additionally counts DB queries, gets a `Server-Timing` header and
+    emits one structured log line, flagging statements repeated often enough
+    to look like an N+1 pattern.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1.0, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        stats = RequestStats() if sampled else None
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if stats is not None:
+                    headers = MutableHeaders(raw=message["headers"])
+                    headers.append("Server-Timing", _server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            elapsed = time.perf_counter() - start
+            route = getattr(scope.get("route"), "path", "unmatched")
+            metrics.observe(scope["method"], route, status, elapsed,
+                            stats.db_queries if stats is not None else None)
+            if stats is not None:
+                self._log(scope, route, status, elapsed, stats)
+
+    def _log(self, scope: Scope, route: str, status: int, elapsed: float, stats: RequestStats):
+        repeated = [s for s, n in stats.statements.items() if n >= self.n_plus_one_threshold]
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "db_queries": stats.db_queries,
+            "db_ms": round(stats.db_time * 1000, 2),
+            "phases_ms": {k: round(v * 1000, 2) for k, v in stats.phases.items()},
+        }
+        if repeated:
+            record["n_plus_one"] = [s[:200] for s in repeated]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+
+
+def _server_timing(stats: RequestStats, elapsed: float) -> str:
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in stats.phases.items()]
+    parts.append(f'db;dur={stats.db_time * 1000:.2f};desc="{stats.db_queries} queries"')
+    parts.append(f"app;dur={elapsed * 1000:.2f}")
+    return ", ".join(parts)
@@ -0,0 +1,151 @@
+"""
+Adaptive load shedding.
+
+Uvicorn accepts every connection and the app queues every request (sync
+endpoints wait for a threadpool thread), so under overload latency climbs
+on every route until clients time out. LoadSheddingMiddleware turns the
+excess away at the door, by route priority:
+- critical (health checks, metrics): always admitted
+- auth (login, signup): admitted up to a concurrency cap of their own,
+  whatever the load on other routes. They neither queue behind nor get shed
+  with the rest of the traffic, and the cap keeps a login flood (one bcrypt
+  hash per request) from taking over the process
+- low (history exports, analytics, bulk jobs): shed as soon as the process
+  shows pressure, or once in-flight requests pass a share of the limit
+- normal (everything else): shed once in-flight requests reach the limit
+
+Pressure is event-loop lag (how late a short timer fires) and threadpool
+saturation (calls waiting for a worker thread). The concurrency limit
+adapts AIMD-style on every tick: it starts at min_in_flight, grows by one
+while it is in use, and under pressure drops to `backoff` times the requests
+in flight, never past max_in_flight. Shed requests get 503 with Retry-After.
+"""
+import asyncio
+import time
+from typing import Iterable, Optional
+
+from anyio import to_thread
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+CRITICAL, AUTH, NORMAL, LOW = "critical", "auth", "normal", "low"
+
+LAG_DECAY = 0.8  # per tick: lag spikes register at once and fade over about a second
+
+
+class LoadShedder:
+    """Load signals of one process (one event loop) and the admission decision"""
+
+    def __init__(self, critical_paths: Iterable[str] = (), low_priority_paths: Iterable[str] = (),
+                 target_lag: float = 0.05, max_in_flight: int = 200, min_in_flight: int = 8,
+                 low_priority_share: float = 0.5, backoff: float = 0.9, tick: float = 0.05,
+                 auth_paths: Iterable[str] = (), auth_max_in_flight: int = 4):
+        self.critical_paths = tuple(critical_paths)
+        self.auth_paths = tuple(auth_paths)
+        self.low_priority_paths = tuple(low_priority_paths)
+        self.auth_max_in_flight = auth_max_in_flight
+        self.target_lag = target_lag
+        self.max_in_flight, self.min_in_flight = max_in_flight, min_in_flight
+        self.low_priority_share = low_priority_share
+        self.backoff = backoff
+        self.tick = tick
+        self.limit = float(min_in_flight)  # slow start: a cold burst can't all get in
+        self.in_flight = 0
+        self.auth_in_flight = 0  # counted apart: auth has its own cap and doesn't move the adaptive limit
+        self.lag = 0.0
+        self.threads_waiting = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._last_tick: Optional[float] = None
+
+    def priority(self, path: str) -> str:
+        if path.startswith(self.critical_paths):
+            return CRITICAL
+        if path.startswith(self.auth_paths):
+            return AUTH
+        if path.startswith(self.low_priority_paths):
+            return LOW
+        return NORMAL
+
+    # ---- signals ----
+
+    def current_lag(self) -> float:
+        """Smoothed loop lag; a monitor tick that is overdue counts as lag already"""
+        if self._last_tick is None:
+            return self.lag
+        return max(self.lag, time.monotonic() - self._last_tick - self.tick)
+
+    def overloaded(self) -> bool:
+        return self.current_lag() > self.target_lag or self.threads_waiting > 0
+
+    def observe(self, lag: float, threads_waiting: int):
+        """One tick's samples: update the signals and adapt the limit"""
+        self.lag = max(lag, self.lag * LAG_DECAY)
+        self.threads_waiting = threads_waiting
+        if self.overloaded():
+            # Back off from what is actually in flight: a tick that comes late under heavy lag
+            # brings the limit below the current load at once, not one step at a time
+            self.limit = max(self.min_in_flight, min(self.limit, self.in_flight) * self.backoff)
+        elif self.in_flight * 2 >= self.limit:  # only grow a limit that is in use, so idle can't inflate it
+            self.limit = min(self.max_in_flight, self.limit + 1)
+
+    def ensure_monitor(self):
+        """Start the lag monitor on the running loop (again, if the app moved to a new loop)"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._last_tick = time.monotonic()
+            self._monitor = loop.create_task(self._run_monitor())
+
+    async def _run_monitor(self):
+        limiter = to_thread.current_default_thread_limiter()  # the pool sync endpoints run in
+        while True:
+            await asyncio.sleep(self.tick)
+            now = time.monotonic()
+            lag = max(0.0, now - self._last_tick - self.tick)
+            self._last_tick = now
+            self.observe(lag, limiter.statistics().tasks_waiting)
+
+    # ---- admission ----
+
+    def admit(self, priority: str) -> bool:
+        if priority == CRITICAL:
+            return True
+        if priority == AUTH:
+            return self.auth_in_flight < self.auth_max_in_flight
+        if priority == LOW:
+            return not self.overloaded() and self.in_flight < self.limit * self.low_priority_share
+        return self.in_flight < self.limit
+
+
+class LoadSheddingMiddleware:
+    """
+    Admit or shed each HTTP request with a LoadShedder. Admitted requests
+    count as in flight until their response body has been sent.
+    """
+
+    def __init__(self, app: ASGIApp, retry_after: int = 1, **options):
+        self.app = app
+        self.retry_after = retry_after
+        self.shedder = LoadShedder(**options)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        shedder = self.shedder
+        shedder.ensure_monitor()
+        priority = shedder.priority(scope["path"])
+        if not shedder.admit(priority):
+            response = JSONResponse({"detail": "Server overloaded, retry later"}, status_code=503,
+                                    headers={"Retry-After": str(self.retry_after)})
+            await response(scope, receive, send)
+            return
+
+        counter = "auth_in_flight" if priority == AUTH else "in_flight"
+        setattr(shedder, counter, getattr(shedder, counter) + 1)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            setattr(shedder, counter, getattr(shedder, counter) - 1)
@@ -0,0 +1,150 @@
+import gzip
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip covers every client
+    brotli = None
+
+
+def accepted_encodings(header: str) -> Dict[str, float]:
+    """
+    Quality value of each coding in an Accept-Encoding header, e.g.
+    "gzip, br;q=0.5" -> {"gzip": 1.0, "br": 0.5}. q=0 means "not acceptable".
+    """
+    qualities = {}
+    for item in header.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[coding] = q
+    return qualities
+
+
+def choose_encoding(header: str, available=("br", "gzip")) -> Optional[str]:
+    """Best coding the client accepts, in `available` order on a tie; None to send identity"""
+    qualities = accepted_encodings(header)
+    wildcard = qualities.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = qualities.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, whichever the client accepts
+    with the higher q-value (brotli on a tie), once the body reaches
+    `minimum_size` bytes.
+
+    Streamed responses are compressed chunk by chunk and flushed after each
+    chunk so NDJSON/CSV exports still reach the client incrementally.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        encoding = choose_encoding(accept, ("br", "gzip") if brotli is not None else ("gzip",))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size,
+                                          self.gzip_level, self.brotli_quality)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, gzip_level: int, brotli_quality: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    def _new_compressor(self):
+        if self.encoding == "br":
+            return brotli.Compressor(quality=self.brotli_quality)
+        # wbits=31 produces a gzip container
+        return zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+
+    def _compress(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, self.gzip_level)
+
+    def _chunk(self, body: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self.compressor.process(body)
+            return out + (self.compressor.finish() if final else self.compressor.flush())
+        out = self.compressor.compress(body)
+        return out + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            if self.start_message is not None:
+                await self._send(self.start_message)
+                self.start_message = None
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start = self.start_message
+            self.start_message = None
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                body = self._compress(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            self.compressor = self._new_compressor()
+            await self._send(start)
+
+        await self._send({
+            "type": "http.response.body",
+            "body": self._chunk(body, final=not more_body),
+            "more_body": more_body,
+        })
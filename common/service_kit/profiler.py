@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 60
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Stdlib-only sampling profiler.
+
+    A daemon thread snapshots every other thread's stack with
+    sys._current_frames() at a fixed interval and aggregates them as
+    collapsed stacks ("thread;outer;...;inner count"), the input format of
+    flamegraph.pl, speedscope and similar tools. Overhead is one stack walk per
+    thread per interval, so the default 5ms interval stays cheap.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[";".join(reversed(stack))] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_for(seconds: float, interval: float = 0.005) -> str:
+    """Profile the whole process for `seconds` (blocking) and return collapsed stacks"""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running")
+    try:
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        time.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        profiler.stop()
+        return profiler.collapsed()
+    finally:
+        _profile_lock.release()
+
+
+async def profile_for_async(seconds: float, interval: float = 0.005) -> str:
+    """Same as profile_for, but waits on the event loop so the loop keeps serving (and gets sampled)"""
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running")
+    try:
+        profiler = SamplingProfiler(interval)
+        profiler.start()
+        await asyncio.sleep(min(seconds, MAX_PROFILE_SECONDS))
+        profiler.stop()
+        return profiler.collapsed()
+    finally:
+        _profile_lock.release()
+
+
+def dump_thread_stacks() -> str:
+    """Current stack of every thread in the process"""
+    names = {t.ident: t for t in threading.enumerate()}
+    out = []
+    for thread_id, frame in sys._current_frames().items():
+        thread = names.get(thread_id)
+        label = f"{thread.name} (daemon)" if thread is not None and thread.daemon else \
+            (thread.name if thread is not None else "unknown")
+        out.append(f"--- Thread {label} [{thread_id}] ---\n")
+        out.extend(traceback.format_stack(frame))
+    return "".join(out)
+
+
+def dump_asyncio_tasks(loop: Optional[asyncio.AbstractEventLoop] = None) -> str:
+    """Stack of every pending task on the running (or given) event loop"""
+    out = []
+    for task in asyncio.all_tasks(loop):
+        out.append(f"--- Task {task.get_name()}: {task.get_coro()!r} ---\n")
+        for frame in task.get_stack():
+            out.extend(traceback.format_stack(frame, limit=1))
+    return "".join(out)
+
+
+def install_signal_handlers(profile_seconds: float = 30, directory: str = "/tmp"):
+    """
+    For processes without an HTTP surface (e.g. the recipe worker):
+    SIGUSR1 writes all thread stacks to stderr; SIGUSR2 profiles for
+    `profile_seconds` and writes <directory>/profile-<pid>-<time>.folded.
+    """
+
+    def _dump(signum, frame):
+        sys.stderr.write(dump_thread_stacks())
+        sys.stderr.flush()
+
+    def _profile(signum, frame):
+        def run():
+            try:
+                collapsed = profile_for(profile_seconds)
+            except RuntimeError as e:
+                logger.warning("SIGUSR2 profile skipped: %s", e)
+                return
+            path = os.path.join(directory, f"profile-{os.getpid()}-{int(time.time())}.folded")
+            with open(path, "w") as f:
+                f.write(collapsed)
+            logger.info("Wrote %s", path)
+
+        threading.Thread(target=run, name="signal-profiler", daemon=True).start()
+
+    signal.signal(signal.SIGUSR1, _dump)
+    signal.signal(signal.SIGUSR2, _profile)
@@ -0,0 +1,237 @@
+"""
+Pre-fork server shared by both backends (each app's app/server.py supplies
+its preload and command line).
+
+The master process imports the app and loads its heavy read-only state
+once, then forks the workers, which share those pages copy-on-write:
+- the cycle collector is off while the state is built, and gc.freeze()
+  moves it to a permanent generation before forking; collections in a
+  worker never write to those objects, so their pages stay shared
+- spawning a worker is a fork, not a re-import, so a restart is ready in
+  milliseconds
+- the listening socket is bound once in the master and inherited; DB pools
+  are disposed before forking so no worker reuses the master's connections
+
+The master restarts workers that die, turns SIGTERM/SIGINT into a graceful
+shutdown, and logs each worker's memory every `memory_report_seconds`:
+RSS, the part still shared with the master, and PSS (RSS with shared pages
+split between the processes mapping them; the sum of PSS is the real total).
+Each worker gets its index in `worker_index_env`, so process-wide jobs can
+run in worker 0 only.
+"""
+import gc
+import logging
+import math
+import os
+import select
+import signal
+import socket
+import time
+from typing import Any, Callable, Dict, Optional
+
+GRACEFUL_TIMEOUT = 30.0  # seconds workers get to finish in-flight requests on shutdown
+RESPAWN_BACKOFF = 1.0  # a worker that dies this soon after starting is restarted after this delay
+
+logger = logging.getLogger(__name__)
+
+
+def memory_kb(pid: int) -> Optional[Dict[str, int]]:
+    """rss, pss, shared and private kB of a process (Linux smaps_rollup); None when unavailable"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            fields = {k: int(v.split()[0]) for k, v in (line.split(":", 1) for line in f if ":" in line)
+                      if v.strip().endswith("kB")}
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0), "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def available_cpus(cgroup_root: str = "/sys/fs/cgroup") -> int:
+    """
+    CPUs this process may actually use: its affinity mask, capped by the
+    cgroup CPU quota (cpu.max, or cfs_quota_us/cfs_period_us on cgroup v1).
+    os.cpu_count() reports the host's CPUs inside a container.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        cpus = os.cpu_count() or 1
+    for quota_file, period_file in (("cpu.max", None), ("cpu/cpu.cfs_quota_us", "cpu/cpu.cfs_period_us")):
+        try:
+            with open(os.path.join(cgroup_root, quota_file)) as f:
+                values = f.read().split()
+            if period_file:
+                with open(os.path.join(cgroup_root, period_file)) as f:
+                    values.append(f.read().strip())
+            quota, period = values[0], values[1]
+        except (OSError, IndexError):
+            continue
+        if quota not in ("max", "-1"):
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+        break
+    return max(1, cpus)
+
+
+def server_config(app, log_level: str = "info"):
+    """uvicorn config loaded in the master, so protocol and event loop modules are imported once"""
+    import uvicorn
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    config.load()
+    config.setup_event_loop()
+    return config
+
+
+def _serve(config, sock: socket.socket, ready_fd: int):
+    """Worker body, run in the forked child"""
+    import uvicorn
+
+    gc.enable()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, signal.SIG_DFL)  # uvicorn installs its own graceful handlers
+    os.write(ready_fd, f"{os.getpid()}\n".encode())
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    def __init__(self, config, sock: socket.socket, workers: int, memory_report_seconds: float = 60.0,
+                 worker_index_env: str = "SERVER_WORKER_INDEX"):
+        self.config, self.sock = config, sock
+        self.n_workers = workers
+        self.memory_report_seconds = memory_report_seconds
+        self.worker_index_env = worker_index_env
+        self.workers: Dict[int, int] = {}  # pid -> worker index
+        self.spawned_at: Dict[int, float] = {}
+        self.stopping = False
+        self._ready_r, self._ready_w = os.pipe()
+
+    def spawn(self, index: int):
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                os.close(self._ready_r)
+                os.environ[self.worker_index_env] = str(index)
+                _serve(self.config, self.sock, self._ready_w)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = index
+        self.spawned_at[pid] = started
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _read_ready(self, timeout: float):
+        if not select.select([self._ready_r], [], [], timeout)[0]:
+            return
+        for line in os.read(self._ready_r, 4096).decode().split():
+            pid = int(line)
+            if pid in self.spawned_at:
+                logger.info("worker %d (pid %d) ready in %.0f ms", self.workers[pid], pid,
+                            (time.perf_counter() - self.spawned_at[pid]) * 1000)
+
+    def _reap(self):
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            index = self.workers.pop(pid, None)
+            lived = time.perf_counter() - self.spawned_at.pop(pid, 0.0)
+            if index is None or self.stopping:
+                continue
+            logger.warning("worker %d (pid %d) exited with status %d, restarting",
+                           index, pid, os.waitstatus_to_exitcode(status))
+            if lived < RESPAWN_BACKOFF:
+                time.sleep(RESPAWN_BACKOFF)  # crashing at startup: don't spin
+            self.spawn(index)
+
+    def report_memory(self):
+        master = memory_kb(os.getpid())
+        if master is None:
+            return
+        lines = [f"memory: master rss {master['rss'] / 1024:.1f} MB"]
+        total_pss = master["pss"]
+        for pid, index in sorted(self.workers.items(), key=lambda item: item[1]):
+            usage = memory_kb(pid)
+            if usage is None:
+                continue
+            total_pss += usage["pss"]
+            lines.append(f"  worker {index} (pid {pid}): rss {usage['rss'] / 1024:.1f} MB, "
+                         f"shared {usage['shared'] / 1024:.1f} MB, private {usage['private'] / 1024:.1f} MB, "
+                         f"pss {usage['pss'] / 1024:.1f} MB")
+        lines.append(f"  total pss {total_pss / 1024:.1f} MB")
+        logger.info("\n".join(lines))
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for index in range(self.n_workers):
+            self.spawn(index)
+        next_report = time.monotonic() + 2.0  # first report once the workers are up
+        while not self.stopping:
+            self._read_ready(0.5)
+            self._reap()
+            if next_report and time.monotonic() >= next_report:
+                self.report_memory()
+                next_report = (time.monotonic() + self.memory_report_seconds
+                               if self.memory_report_seconds > 0 else 0)
+        self.shutdown()
+
+    def shutdown(self, timeout: float = GRACEFUL_TIMEOUT):
+        logger.info("stopping %d workers", len(self.workers))
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        while self.workers and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.workers.pop(pid, None)
+            else:
+                time.sleep(0.05)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):  # already exited and reaped
+                pass
+            self.workers.pop(pid)
+
+
+def bind(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def serve(preload: Callable[[], Any], host: str, port: int, workers: int, log_level: str = "info",
+          memory_report_seconds: float = 60.0, worker_index_env: str = "SERVER_WORKER_INDEX"):
+    """
+    Preload the app (preload() imports it and builds the shared state with the
+    cycle collector off, and returns the ASGI app), freeze the heap, bind, and
+    run `workers` forked workers until SIGTERM/SIGINT
+    """
+    logging.basicConfig(level=log_level.upper(), format="%(asctime)s [%(process)d] %(name)s: %(message)s")
+    started = time.perf_counter()
+    gc.disable()  # no collections while the shared heap is built
+    config = server_config(preload(), log_level)
+    gc.freeze()
+    logger.info("preloaded in %.2fs, %d objects frozen", time.perf_counter() - started, gc.get_freeze_count())
+    sock = bind(host, port)
+    logger.info("listening on %s:%d with %d workers", host, port, workers)
+    Master(config, sock, workers, memory_report_seconds, worker_index_env).run()
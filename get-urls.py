@@ -1,44 +1,125 @@
 #!/usr/bin/env python3
-import subprocess
+"""
+Print public URLs of the Azure container groups once they have an FQDN.
+
+All container groups are queried in parallel; pending ones are re-polled with
+exponential backoff until every FQDN is ready or the timeout expires.
+Services come from deployment.aci in devconfig.yaml. Set AZ_CLI (or put a fake
+`az` first on PATH) to test without Azure.
+"""
+import argparse
 import json
+import os
+import subprocess
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import yaml
+
+DEVCONFIG = Path(__file__).parent / 'devconfig.yaml'
+DEFAULT_ACI = {
+    'resource_group': 'yashus-rg',
+    'container_prefix': 'yashus-',
+    'services': {'frontend': {}, 'backend': {}},
+}
+
 
-def get_azure_resource(rg, name):
-    cmd = f"az container show --resource-group {rg} --name {name} --query '{{fqdn: ipAddress.fqdn, status: instanceView.state}}' -o json"
+def load_aci_config(path):
+    """deployment.aci from devconfig.yaml, falling back to the original two containers"""
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=5)
+        with open(path) as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return DEFAULT_ACI
+    return config.get('deployment', {}).get('aci') or DEFAULT_ACI
+
+
+def get_azure_resource(rg, name, az='az', timeout=5):
+    cmd = [az, 'container', 'show', '--resource-group', rg, '--name', name,
+           '--query', '{fqdn: ipAddress.fqdn, status: instanceView.state}', '-o', 'json']
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         return json.loads(result.stdout) if result.stdout else None
-    except:
+    except (OSError, subprocess.TimeoutExpired, ValueError):
         return None
 
-rg = "yashus-rg"
 
-print("\n╔════════════════════════════════════════════════════════════════╗")
-print("║       🎉 YASHUS CALCULATOR DEPLOYED ON AZURE! 🎉            ║")
-print("╚════════════════════════════════════════════════════════════════╝\n")
+def poll_until_ready(rg, names, az='az', timeout=60, initial_delay=1.0, max_delay=16.0, on_round=None):
+    """
+    Query every container group concurrently until all report an FQDN.
 
-for i in range(6):
-    frontend = get_azure_resource(rg, "yashus-frontend")
-    backend = get_azure_resource(rg, "yashus-backend")
-    
-    if frontend and frontend.get('fqdn') and backend and backend.get('fqdn'):
-        print("📊 CALCULATOR FRONTEND:")
-        print(f"   http://{frontend['fqdn']}")
-        print()
-        print("🔧 BACKEND API:")
-        print(f"   http://{backend['fqdn']}:8000")
-        print()
-        print("📚 SWAGGER API DOCS:")
-        print(f"   http://{backend['fqdn']}:8000/docs")
-        print()
-        print("✅ Both containers are RUNNING on Azure (westus2)")
+    Returns {name: last `az container show` result (or None)}.
+    """
+    state = {name: None for name in names}
+    pending = list(names)
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempt = 0
+    with ThreadPoolExecutor(max_workers=max(1, len(names))) as pool:
+        while pending:
+            attempt += 1
+            results = pool.map(lambda n: get_azure_resource(rg, n, az), pending)
+            for name, info in zip(pending, results):
+                state[name] = info
+            pending = [n for n in pending if not (state[n] and state[n].get('fqdn'))]
+            if on_round:
+                on_round(attempt, state, pending)
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--config', default=str(DEVCONFIG), help='path to devconfig.yaml')
+    parser.add_argument('--timeout', type=float, default=60, help='give up after this many seconds')
+    parser.add_argument('--az', default=os.environ.get('AZ_CLI', 'az'), help='az executable')
+    args = parser.parse_args()
+
+    aci = load_aci_config(args.config)
+    rg = aci.get('resource_group', DEFAULT_ACI['resource_group'])
+    prefix = aci.get('container_prefix', '')
+    services = aci.get('services') or {}
+    containers = {f"{prefix}{name}": name for name in services}
+
+    print("\n╔════════════════════════════════════════════════════════════════╗")
+    print("║       🎉 YASHUS CALCULATOR DEPLOYED ON AZURE! 🎉            ║")
+    print("╚════════════════════════════════════════════════════════════════╝\n")
+
+    def report(attempt, state, pending):
+        if not pending:
+            return
+        print(f"⏳ Waiting for public IPs... (attempt {attempt})")
+        for container in pending:
+            info = state[container]
+            print(f"   {containers[container]}: {(info or {}).get('status') or 'provisioning'}")
+
+    state = poll_until_ready(rg, list(containers), az=args.az, timeout=args.timeout, on_round=report)
+
+    ready = True
+    for container, name in containers.items():
+        info = state[container]
+        service = services[name] or {}
+        if not (info and info.get('fqdn')):
+            print(f"❌ {name}: no public FQDN yet")
+            ready = False
+            continue
+        print(f"📊 {service.get('label', name.upper())}:")
+        print(f"   {service.get('url', 'http://{fqdn}').format(fqdn=info['fqdn'])}")
+        if service.get('docs'):
+            print(f"   docs: {service['docs'].format(fqdn=info['fqdn'])}")
         print()
-        break
-    else:
-        print(f"⏳ Waiting for public IPs... ({i+1}/6)")
-        if frontend: print(f"   Frontend: {frontend.get('status', 'provisioning')}")
-        if backend: print(f"   Backend: {backend.get('status', 'provisioning')}")
-        if i < 5:
-            time.sleep(5)
-
-print()
+
+    if ready:
+        print(f"✅ All {len(containers)} containers are RUNNING on Azure")
+    print()
+    return 0 if ready else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())